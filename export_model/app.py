@@ -5,17 +5,43 @@ Deployed on Render as a web service.
 Exposes POST /predict endpoint for XGBoost price predictions.
 """
 
+import hmac
 import os
-import json
 import logging
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, g, request, jsonify, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from predictor import NexYpherPredictor
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+from prediction import encode_batch, encode_result
+from request_profiler import HEADER as PROFILE_HEADER, RequestProfiler
+from score_universe import DEFAULT_SNAPSHOT, SnapshotReader
+import json_codec
+import metrics
+import wire_format
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+
+class CodecJSONProvider(JSONProvider):
+    """``jsonify`` and ``request.get_json`` through json_codec (orjson when installed)."""
+
+    def dumps(self, obj, **kwargs):
+        return json_codec.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_codec.dumps(obj), mimetype="application/json")
+
+
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 
 # Allow requests from the Vercel frontend and localhost
 CORS(app, origins=[
@@ -24,20 +50,110 @@ CORS(app, origins=[
     "http://localhost:4173",
 ])
 
-# Load the ML models once at startup
+# Load the ML models once at startup; later versions are swapped in by
+# POST /models/reload or the file watcher (see model_registry.py)
 logger.info("Loading ML models...")
-predictor = NexYpherPredictor()
+# PREDICTION_CACHE_SIZE=0 disables the result cache, FEATURE_CACHE_SIZE=0
+# the incremental feature cache (see feature_cache.py)
+registry = ModelRegistry(
+    models_dir=os.environ.get("MODELS_DIR"),
+    keep=int(os.environ.get("MODEL_KEEP", 2)),
+    model_format=os.environ.get("MODEL_FORMAT", "auto"),
+    cache_size=int(os.environ.get("PREDICTION_CACHE_SIZE", 1024)),
+    cache_ttl=float(os.environ.get("PREDICTION_CACHE_TTL", 900)),
+    feature_cache_size=int(os.environ.get("FEATURE_CACHE_SIZE", 1024)),
+    feature_cache_ttl=float(os.environ.get("FEATURE_CACHE_TTL", 86400)),
+)
 logger.info("ML models loaded successfully.")
 
+# Seconds between model_metadata.json checks; 0 disables the watcher
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+MODEL_ADMIN_KEY = os.environ.get("MODEL_ADMIN_KEY")
+
+# Upper bound on series per /predict/batch request; streamed (NDJSON)
+# requests are scored STREAM_CHUNK_SIZE series at a time, so they may be larger
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 500))
+MAX_STREAM_BATCH_SIZE = int(os.environ.get("MAX_STREAM_BATCH_SIZE", 20000))
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 256))
+
+# Server-side bar history (enabled by HISTORY_DIR); see history_store.py
+history = HistoryStore(os.environ["HISTORY_DIR"]) if os.environ.get("HISTORY_DIR") else None
+HISTORY_WINDOW = int(os.environ.get("HISTORY_WINDOW", 365))
+HISTORY_API_KEY = os.environ.get("HISTORY_API_KEY")
+
+# Snapshot written by score_universe.py
+leaderboard = SnapshotReader(os.environ.get("LEADERBOARD_PATH", DEFAULT_SNAPSHOT))
+
+# Opt-in cProfile capture (PROFILE_SAMPLE_RATE / PROFILE_TOKEN); see request_profiler.py
+profiler = RequestProfiler.from_env()
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.before_request
+def _start_profile():
+    if profiler is None or request.path.startswith("/debug/"):
+        return
+    if profiler.wants(request.headers.get(PROFILE_HEADER)):
+        g.profile = profiler.start()
+        g.profile_started = time.perf_counter()
+
+
+@app.after_request
+def _save_profile(response):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        name = profiler.finish(profile, route, time.perf_counter() - g.profile_started)
+        response.headers["X-Profile-Name"] = name
+    return response
+
+
+@app.teardown_request
+def _drop_profile(exc):
+    # Unhandled errors skip after_request; never leave a profiler running
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile.disable()
+
+
+@app.after_request
+def _count_request(response):
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.REQUESTS.inc(route=route, status=response.status_code)
+    started = g.get("request_started")
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+    return response
+
 
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint."""
-    info = predictor.info()
+    info = registry.active.info()
     return jsonify({"status": "ok", "model": info})
 
 
-@app.route("/predict", methods=["POST"])
+def _api_key_matches(expected):
+    """Whether the X-API-Key header equals ``expected`` (never when it is unset)."""
+    given = request.headers.get("X-API-Key")
+    if not expected or given is None:
+        return False
+    return hmac.compare_digest(given.encode(), expected.encode())
+
+
+def _requested_version(data):
+    """model_version from the query string or the JSON body, if any."""
+    version = request.args.get("model_version")
+    if version is None and isinstance(data, dict):
+        version = data.get("model_version")
+    return version
+
+
+@app.route("/predict", methods=["GET", "POST"])
 def predict():
     """
     Run XGBoost prediction.
@@ -51,27 +167,70 @@ def predict():
         volume_mcap_ratio: float? - optional
         ath_change_pct: float?    - optional
         fear_greed_value: float?  - optional (default 50)
+        model_version: str?       - optional, any loaded version (also
+                                    accepted as ?model_version=)
+
+    Also accepts a one-series binary body (Content-Type
+    application/x-quantara-series, see wire_format.py).
+
+    With ?token=<id> (GET or POST) the closes/volumes come from the
+    server's history store instead: the last ?bars=N bars (default
+    HISTORY_WINDOW). A POST body may still carry the optional fields.
 
     Response JSON:
         verdict, direction, prob_up_24h, prob_up_7d, confidence,
         direction_probs, model_version
     """
-    try:
-        data = request.get_json(force=True)
-    except Exception:
-        return jsonify({"error": "Invalid JSON body"}), 400
+    started = time.perf_counter()
+    token = request.args.get("token")
+    if token is not None:
+        if history is None:
+            return jsonify({"error": "History store not configured"}), 503
+        try:
+            bars = int(request.args.get("bars", HISTORY_WINDOW))
+        except ValueError:
+            return jsonify({"error": "Invalid 'bars' parameter"}), 400
+        try:
+            window = history.window(token, bars)
+        except KeyError:
+            return jsonify({"error": f"Unknown token: {token}"}), 404
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON body"}), 400
+        closes = window["close"]
+        volumes = window["volume"]
+    elif request.method == "GET":
+        return jsonify({"error": "Missing 'token' query parameter"}), 400
+    elif request.mimetype == wire_format.CONTENT_TYPE:
+        try:
+            items = wire_format.decode_series(request.get_data())
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if len(items) != 1:
+            return jsonify({"error": f"Expected 1 series in binary body, got {len(items)}"}), 400
+        data = items[0]
+        closes = data["closes"]
+        volumes = data["volumes"]
+    else:
+        try:
+            data = request.get_json(force=True)
+        except Exception:
+            return jsonify({"error": "Invalid JSON body"}), 400
 
-    closes = data.get("closes")
-    volumes = data.get("volumes")
+        closes = data.get("closes")
+        volumes = data.get("volumes")
+
+        if not closes or not isinstance(closes, list):
+            return jsonify({"error": "Missing or invalid 'closes' array"}), 400
+        if not volumes or not isinstance(volumes, list):
+            return jsonify({"error": "Missing or invalid 'volumes' array"}), 400
 
-    if not closes or not isinstance(closes, list):
-        return jsonify({"error": "Missing or invalid 'closes' array"}), 400
-    if not volumes or not isinstance(volumes, list):
-        return jsonify({"error": "Missing or invalid 'volumes' array"}), 400
     if len(closes) < 50:
         return jsonify({"error": f"Need at least 50 close prices, got {len(closes)}"}), 400
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="parse")
 
     try:
+        predictor = registry.get(_requested_version(data))
         result = predictor.predict(
             closes=closes,
             volumes=volumes,
@@ -81,18 +240,12 @@ def predict():
             volume_mcap_ratio=data.get("volume_mcap_ratio"),
             ath_change_pct=data.get("ath_change_pct"),
             fear_greed_value=data.get("fear_greed_value", 50.0),
+            features=False,
         )
 
-        # Return only the fields the frontend needs (exclude raw features)
-        return jsonify({
-            "verdict": result["verdict"],
-            "direction": result["direction"],
-            "prob_up_24h": result["prob_up_24h"],
-            "prob_up_7d": result["prob_up_7d"],
-            "confidence": result["confidence"],
-            "direction_probs": result["direction_probs"],
-            "model_version": result["model_version"],
-        })
+        # Only the fields the frontend needs; the raw features are left out
+        with metrics.timer(metrics.STAGE_SECONDS, stage="serialize"):
+            return app.response_class(result.to_json(), mimetype="application/json")
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -100,6 +253,288 @@ def predict():
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Run XGBoost predictions for many series in one model call.
+
+    Request JSON:
+        series: list[object]      - each object takes the same fields as /predict
+        model_version: str?       - optional, any loaded version (also
+                                    accepted as ?model_version=)
+
+    Or a binary body holding any number of series (Content-Type
+    application/x-quantara-series, see wire_format.py).
+
+    Response JSON:
+        results: list[object]     - aligned with `series`; each entry is either
+                                    a /predict response or {"error": str}
+        model_version: str
+
+    With ``Accept: application/x-ndjson`` the response streams instead: one
+    line per series, in order, each a /predict response or {"error": str}.
+    Series are scored STREAM_CHUNK_SIZE at a time and each chunk is sent as
+    soon as it is ready. If scoring fails part-way the stream ends with
+    {"error": str, "fatal": true}.
+    """
+    started = time.perf_counter()
+    data = None
+    if request.mimetype == wire_format.CONTENT_TYPE:
+        try:
+            series = wire_format.decode_series(request.get_data())
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    else:
+        try:
+            data = request.get_json(force=True)
+        except Exception:
+            return jsonify({"error": "Invalid JSON body"}), 400
+        series = data.get("series") if isinstance(data, dict) else None
+
+    stream = _wants_ndjson()
+    max_size = MAX_STREAM_BATCH_SIZE if stream else MAX_BATCH_SIZE
+    if not isinstance(series, list):
+        return jsonify({"error": "Missing or invalid 'series' array"}), 400
+    if len(series) > max_size:
+        return jsonify({
+            "error": f"Batch too large: {len(series)} series (max {max_size})"
+        }), 400
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="parse")
+
+    try:
+        predictor = registry.get(_requested_version(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return app.response_class(
+            _stream_batch(predictor, series), mimetype=json_codec.NDJSON_CONTENT_TYPE,
+        )
+
+    try:
+        results = predictor.predict_batch(series, features=False)
+    except Exception as e:
+        logger.exception("Batch prediction failed")
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+    with metrics.timer(metrics.STAGE_SECONDS, stage="serialize"):
+        body = encode_batch(results, str(predictor.metadata.get("version", "unknown")))
+        return app.response_class(body, mimetype="application/json")
+
+
+def _wants_ndjson() -> bool:
+    best = request.accept_mimetypes.best_match(["application/json", json_codec.NDJSON_CONTENT_TYPE])
+    return best == json_codec.NDJSON_CONTENT_TYPE
+
+
+def _stream_batch(predictor, series):
+    """NDJSON lines for ``series``, scored and sent one chunk at a time."""
+    for start in range(0, len(series), STREAM_CHUNK_SIZE):
+        try:
+            results = predictor.predict_batch(series[start: start + STREAM_CHUNK_SIZE], features=False)
+        except Exception as e:
+            logger.exception("Batch prediction failed")
+            yield json_codec.dumps({"error": f"Prediction failed: {str(e)}", "fatal": True}) + b"\n"
+            return
+        with metrics.timer(metrics.STAGE_SECONDS, stage="serialize"):
+            chunk = b"".join(json_codec.ndjson_lines(results, encode_result))
+        yield chunk
+
+
+@app.route("/models", methods=["GET"])
+def models():
+    """
+    Model versions in this worker.
+
+    Response JSON:
+        active: str, loaded: list[str], available: list[str],
+        last_reload: {version, seconds, at, error} | null, watching: bool
+    """
+    return jsonify(registry.info())
+
+
+@app.route("/models/reload", methods=["POST"])
+def models_reload():
+    """
+    Load a model version in the background, warm it and swap it in.
+
+    Request JSON (all optional):
+        version: str              - a set under models/; default the top-level set
+        activate: bool            - default true; false keeps it on standby
+        wait: bool                - default false; true returns after the swap
+
+    Requires the X-API-Key header to match MODEL_ADMIN_KEY; refused when it
+    is unset. Reaches only the worker serving the request; use
+    MODEL_WATCH_INTERVAL to reload all.
+    """
+    if not _api_key_matches(MODEL_ADMIN_KEY):
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+    version = data.get("version")
+    activate = bool(data.get("activate", True))
+    try:
+        if not data.get("wait"):
+            registry.reload_async(version, activate)
+            return jsonify({"status": "reloading", "version": version}), 202
+        loaded = registry.reload(version, activate)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Model reload failed")
+        return jsonify({"error": f"Reload failed: {str(e)}"}), 500
+    return jsonify({"status": "ok", "version": loaded, "models": registry.info()})
+
+
+@app.route("/models/activate", methods=["POST"])
+def models_activate():
+    """
+    Switch the active version to another loaded one (rollback).
+
+    Request JSON:
+        version: str
+
+    Requires the X-API-Key header to match MODEL_ADMIN_KEY; refused when it
+    is unset.
+    """
+    if not _api_key_matches(MODEL_ADMIN_KEY):
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get("version"):
+        return jsonify({"error": "Missing 'version'"}), 400
+    try:
+        registry.activate(str(data["version"]))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"status": "ok", "models": registry.info()})
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_text():
+    """
+    Prometheus text exposition of this worker's counters and histograms:
+    per-stage latency, requests by route/status, input length, model info.
+    """
+    return app.response_class(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/debug/profiles", methods=["GET"])
+def debug_profiles():
+    """
+    List captured request profiles, newest first.
+
+    Response JSON:
+        profiles: list of {name, created, pid, duration_ms, route, bytes}
+        sample_rate: float
+    """
+    if profiler is None:
+        return jsonify({"error": "Profiling not enabled"}), 404
+    if not profiler.authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({"profiles": profiler.ring.list(), "sample_rate": profiler.sample_rate})
+
+
+@app.route("/debug/profiles/<name>", methods=["GET"])
+def debug_profile(name):
+    """
+    Download one profile as a pstats file, or with ?format=text the top
+    functions as text (?sort=cumulative|tottime|calls, ?limit=N).
+    """
+    if profiler is None:
+        return jsonify({"error": "Profiling not enabled"}), 404
+    if not profiler.authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": "Unauthorized"}), 401
+    path = profiler.ring.path(name)
+    if path is None:
+        return jsonify({"error": f"Unknown profile: {name}"}), 404
+
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", "cumulative")
+        if sort not in ("cumulative", "tottime", "calls"):
+            return jsonify({"error": f"Invalid sort key: {sort}"}), 400
+        try:
+            limit = int(request.args.get("limit", 40))
+        except ValueError:
+            return jsonify({"error": "Invalid 'limit' parameter"}), 400
+        text = profiler.ring.stats_text(name, sort=sort, limit=limit)
+        return app.response_class(text, mimetype="text/plain")
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+
+@app.route("/leaderboard", methods=["GET"])
+def leaderboard_snapshot():
+    """
+    Serve the latest ranked snapshot from score_universe.py.
+
+    Response JSON:
+        generated_at: int, model_version: str, count: int,
+        entries: list of {rank, token, prob_up_24h, prob_up_7d, verdict,
+                          confidence, direction}, best first
+        errors: list of {token, error}
+    """
+    body = leaderboard.body()
+    if body is None:
+        return jsonify({"error": "No leaderboard snapshot yet"}), 404
+    return app.response_class(body, mimetype="application/json")
+
+
+@app.route("/history", methods=["GET"])
+def history_tokens():
+    """List stored tokens and their bar counts."""
+    if history is None:
+        return jsonify({"error": "History store not configured"}), 503
+    return jsonify({"tokens": {token: history.length(token) for token in history.tokens()}})
+
+
+@app.route("/history/<token>", methods=["POST"])
+def history_append(token):
+    """
+    Append daily bars for a token.
+
+    Request JSON (columnar, oldest -> newest):
+        timestamp: list[int]      - bar open time, epoch seconds
+        close: list[float]
+        volume: list[float]?      - default 0
+        open/high/low: list[float]? - default close
+
+    A bar with the same timestamp as the stored last bar replaces it.
+    Requires the X-API-Key header to match HISTORY_API_KEY; refused when it
+    is unset.
+
+    Response JSON:
+        token: str, bars: int     - stored bar count after the append
+    """
+    if history is None:
+        return jsonify({"error": "History store not configured"}), 503
+    if not _api_key_matches(HISTORY_API_KEY):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON body"}), 400
+    if not isinstance(data.get("timestamp"), list) or not isinstance(data.get("close"), list):
+        return jsonify({"error": "Missing 'timestamp' or 'close' array"}), 400
+
+    try:
+        length = history.append(
+            token,
+            data["timestamp"],
+            data["close"],
+            volume=data.get("volume"),
+            open=data.get("open"),
+            high=data.get("high"),
+            low=data.get("low"),
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"token": token, "bars": length})
+
+
 if __name__ == "__main__":
+    if MODEL_WATCH_INTERVAL > 0:
+        registry.watch(MODEL_WATCH_INTERVAL)
     port = int(os.environ.get("PORT", 10000))
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,316 @@
+"""
+Quantara ML Prediction API (ASGI, micro-batched)
+=================================================
+Async serving mode next to the Flask ``app.py`` for the prediction routes
+(/health, /predict, /predict/batch), with the same request and response
+bodies. Concurrent ``/predict`` calls are pooled by a ``MicroBatcher`` and
+scored with one ``predict_batch`` call per model version, so a burst of
+feed refreshes costs one model call per model instead of one per request.
+
+Models come from a ``ModelRegistry``: ``model_version`` (body or query
+string) picks any loaded version, as in app.py. There are no /models
+admin routes here; set MODEL_WATCH_INTERVAL to pick up new model files.
+
+Run: uvicorn asgi_app:app --host 0.0.0.0 --port 10000   (pip install uvicorn)
+
+Tuning (environment):
+    MICRO_BATCH_MAX_SIZE    - items per batch (default 64)
+    MICRO_BATCH_MAX_WAIT_MS - latency cap while a batch fills (default 5)
+    MICRO_BATCH_WORKERS     - scoring threads / concurrent batches (default 2)
+    MODEL_WATCH_INTERVAL    - seconds between model checks (default 0, off)
+    MAX_STREAM_BATCH_SIZE   - series per streamed batch (default 20000)
+    STREAM_CHUNK_SIZE       - series scored per streamed chunk (default 256)
+
+Both POST routes also take the binary series format (wire_format.py), and
+/predict/batch streams NDJSON for ``Accept: application/x-ndjson``, as in
+app.py. JSON goes through json_codec (orjson when installed). GET /health
+adds a "batcher" section with batch-size and queue-depth histograms.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry
+from prediction import encode_batch, encode_result
+import json_codec
+import wire_format
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_ORIGINS = (
+    "https://quantara-app.vercel.app",
+    "http://localhost:5173",
+    "http://localhost:4173",
+)
+
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 500))
+MAX_STREAM_BATCH_SIZE = int(os.environ.get("MAX_STREAM_BATCH_SIZE", 20000))
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 256))
+
+logger.info("Loading ML models...")
+registry = ModelRegistry(
+    models_dir=os.environ.get("MODELS_DIR"),
+    keep=int(os.environ.get("MODEL_KEEP", 2)),
+    model_format=os.environ.get("MODEL_FORMAT", "auto"),
+    cache_size=int(os.environ.get("PREDICTION_CACHE_SIZE", 1024)),
+    cache_ttl=float(os.environ.get("PREDICTION_CACHE_TTL", 900)),
+    feature_cache_size=int(os.environ.get("FEATURE_CACHE_SIZE", 1024)),
+    feature_cache_ttl=float(os.environ.get("FEATURE_CACHE_TTL", 86400)),
+)
+
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+
+_workers = int(os.environ.get("MICRO_BATCH_WORKERS", 2))
+executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="predict")
+
+
+def _score_pooled(items):
+    """
+    Batcher function: ``items`` are ``(predictor, series)`` pairs.
+
+    Pooled requests may pin different versions, so each version gets one
+    ``predict_batch`` call. Responses carry only the public fields, so the
+    features are left out of the results.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for idx, (predictor, data) in enumerate(items):
+        groups.setdefault(id(predictor), (predictor, []))[1].append(idx)
+    for predictor, indices in groups.values():
+        scored = predictor.predict_batch([items[i][1] for i in indices], features=False)
+        for i, result in zip(indices, scored):
+            results[i] = result
+    return results
+
+
+batcher = MicroBatcher(
+    _score_pooled,
+    executor,
+    max_batch=int(os.environ.get("MICRO_BATCH_MAX_SIZE", 64)),
+    max_wait_ms=float(os.environ.get("MICRO_BATCH_MAX_WAIT_MS", 5)),
+    max_inflight=_workers,
+)
+
+
+# ── HTTP helpers ────────────────────────────────────────────────
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _cors_headers(scope):
+    for name, value in scope["headers"]:
+        if name == b"origin" and value.decode("latin-1") in ALLOWED_ORIGINS:
+            return [
+                (b"access-control-allow-origin", value),
+                (b"vary", b"Origin"),
+            ]
+    return []
+
+
+def _wants_ndjson(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"accept":
+            types = [part.split(b";")[0].strip() for part in value.split(b",")]
+            return json_codec.NDJSON_CONTENT_TYPE.encode() in types
+    return False
+
+
+def _requested_version(scope, data):
+    """model_version from the query string or the JSON body, if any."""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    version = query.get("model_version", [None])[0]
+    if version is None and isinstance(data, dict):
+        version = data.get("model_version")
+    return version
+
+
+def _is_binary(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            return value.split(b";")[0].strip().decode("latin-1") == wire_format.CONTENT_TYPE
+    return False
+
+
+async def _send_json(send, scope, status, payload):
+    """``payload`` is an object to encode, or JSON bytes already encoded."""
+    body = payload if isinstance(payload, bytes) else json_codec.dumps(payload)
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ] + _cors_headers(scope)
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_ndjson(send, scope, status, chunks):
+    """Stream an async iterator of NDJSON byte chunks."""
+    headers = [(b"content-type", json_codec.NDJSON_CONTENT_TYPE.encode())] + _cors_headers(scope)
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    async for chunk in chunks:
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _preflight(send, scope):
+    headers = _cors_headers(scope) + [
+        (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+        (b"access-control-allow-headers", b"Content-Type"),
+    ]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": b""})
+
+
+# ── Routes ──────────────────────────────────────────────────────
+
+async def health(scope, body):
+    return 200, {"status": "ok", "model": registry.active.info(), "batcher": batcher.stats()}
+
+
+async def predict(scope, body):
+    """Single prediction; same request/response as the Flask /predict."""
+    if _is_binary(scope):
+        try:
+            items = wire_format.decode_series(body)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        if len(items) != 1:
+            return 400, {"error": f"Expected 1 series in binary body, got {len(items)}"}
+        data = items[0]
+    else:
+        try:
+            data = json_codec.loads(body)
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+        if not isinstance(data, dict):
+            return 400, {"error": "Invalid JSON body"}
+
+    try:
+        predictor = registry.get(_requested_version(scope, data))
+    except ValueError as e:
+        return 400, {"error": str(e)}
+
+    try:
+        result = await batcher.submit((predictor, data))
+    except Exception as e:
+        logger.exception("Prediction failed")
+        return 500, {"error": f"Prediction failed: {str(e)}"}
+
+    if "error" in result:
+        return 400, {"error": result["error"]}
+    return 200, result.to_json()
+
+
+async def predict_batch(scope, body):
+    """Explicit batch; same request/response as the Flask /predict/batch."""
+    data = None
+    if _is_binary(scope):
+        try:
+            series = wire_format.decode_series(body)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+    else:
+        try:
+            data = json_codec.loads(body)
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+        series = data.get("series") if isinstance(data, dict) else None
+
+    stream = _wants_ndjson(scope)
+    max_size = MAX_STREAM_BATCH_SIZE if stream else MAX_BATCH_SIZE
+    if not isinstance(series, list):
+        return 400, {"error": "Missing or invalid 'series' array"}
+    if len(series) > max_size:
+        return 400, {"error": f"Batch too large: {len(series)} series (max {max_size})"}
+
+    try:
+        predictor = registry.get(_requested_version(scope, data))
+    except ValueError as e:
+        return 400, {"error": str(e)}
+
+    if stream:
+        return 200, _stream_batch(predictor, series)
+
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(
+            executor, _predict_unpooled, predictor, series,
+        )
+    except Exception as e:
+        logger.exception("Batch prediction failed")
+        return 500, {"error": f"Prediction failed: {str(e)}"}
+
+    return 200, encode_batch(results, str(predictor.metadata.get("version", "unknown")))
+
+
+def _predict_unpooled(predictor, series):
+    return predictor.predict_batch(series, features=False)
+
+
+async def _stream_batch(predictor, series):
+    """NDJSON lines for ``series``, scored and sent one chunk at a time."""
+    loop = asyncio.get_running_loop()
+    for start in range(0, len(series), STREAM_CHUNK_SIZE):
+        try:
+            results = await loop.run_in_executor(
+                executor, _predict_unpooled, predictor, series[start: start + STREAM_CHUNK_SIZE],
+            )
+        except Exception as e:
+            logger.exception("Batch prediction failed")
+            yield json_codec.dumps({"error": f"Prediction failed: {str(e)}", "fatal": True}) + b"\n"
+            return
+        yield b"".join(json_codec.ndjson_lines(results, encode_result))
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("POST", "/predict"): predict,
+    ("POST", "/predict/batch"): predict_batch,
+}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                batcher.start()
+                if MODEL_WATCH_INTERVAL > 0:
+                    registry.watch(MODEL_WATCH_INTERVAL)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                registry.stop()
+                await batcher.stop()
+                # Waiting for the pool blocks, so do it off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+    if method == "OPTIONS":
+        await _preflight(send, scope)
+        return
+
+    handler = ROUTES.get((method, path))
+    body = await _read_body(receive)
+    if handler is None:
+        await _send_json(send, scope, 404, {"error": "Not found"})
+        return
+
+    status, payload = await handler(scope, body)
+    if inspect.isasyncgen(payload):
+        await _send_ndjson(send, scope, status, payload)
+    else:
+        await _send_json(send, scope, status, payload)
@@ -0,0 +1,468 @@
+"""
+Walk-Forward Backtest
+======================
+Replays the pretrained models over historical daily bars and measures what
+the ``predict`` verdicts would have earned.
+
+For every token the whole history is featurized at once
+(``compute_feature_matrix``) and scored in one batched model call, so each
+bar gets the prediction a live call would have made with the bars up to it.
+The verdict and confidence rules are the ones ``predict`` uses.
+
+Reported per horizon (24h = next bar, 7d = seven bars ahead):
+  - per-verdict count, hit rate and mean forward return
+    (a hit is a rise for STRONG BUY/BUY and a fall for SELL/AVOID)
+  - calibration: predicted up-probability deciles vs. observed up rate,
+    plus the Brier score
+
+And one simulated strategy: long the next bar after STRONG BUY/BUY (at or
+above ``--min-confidence``), optionally short after SELL/AVOID, flat
+otherwise, paying ``--fee-bps`` per unit of position change. Buy-and-hold
+over the same bars is the benchmark.
+
+Input is a ``HistoryStore`` directory, or a directory of per-token
+``<token>.csv`` (``close`` and ``volume`` columns) or ``<token>.json``
+(``{"closes": [...], "volumes": [...]}``) files.
+
+Tokens are spread over a process pool and stream through it: each worker
+loads, scores and summarizes one token at a time and returns a few
+counters, so memory stays flat however many tokens there are.
+
+Run:
+    python backtest.py --data ./history [--workers 8] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import feature_engine
+from predictor import NexYpherPredictor, confidence_for, verdict_for
+
+logger = logging.getLogger(__name__)
+
+HORIZONS = {"24h": 1, "7d": 7}
+VERDICTS = ("STRONG BUY", "BUY", "NEUTRAL", "AVOID", "SELL")
+LONG_VERDICTS = ("STRONG BUY", "BUY")
+SHORT_VERDICTS = ("SELL", "AVOID")
+CALIBRATION_BINS = 10
+
+# Annualization for daily bars (crypto trades every day)
+BARS_PER_YEAR = 365
+
+# Cost in basis points per unit of position change (CLI and API alike)
+DEFAULT_FEE_BPS = 10.0
+
+
+# ── Data sources ────────────────────────────────────────────────
+
+def list_tokens(data_dir: Path) -> List[str]:
+    """Token ids available in ``data_dir``."""
+    data_dir = Path(data_dir)
+    if (data_dir / "index.json").exists():
+        from history_store import HistoryStore
+
+        return HistoryStore(data_dir).tokens()
+    return sorted(
+        p.stem for p in data_dir.iterdir() if p.suffix in (".csv", ".json") and p.is_file()
+    )
+
+
+def load_series(data_dir: Path, token: str, store=None) -> Tuple[np.ndarray, np.ndarray]:
+    """``(closes, volumes)`` for one token, oldest first."""
+    data_dir = Path(data_dir)
+    if store is not None:
+        window = store.window(token)
+        return window["close"], window["volume"]
+
+    csv_path = data_dir / f"{token}.csv"
+    if csv_path.exists():
+        closes, volumes = [], []
+        with open(csv_path, newline="") as f:
+            for row in csv.DictReader(f):
+                row = {key.strip().lower(): value for key, value in row.items() if key}
+                closes.append(float(row["close"]))
+                volumes.append(float(row.get("volume") or 0.0))
+        return np.asarray(closes), np.asarray(volumes)
+
+    with open(data_dir / f"{token}.json") as f:
+        data = json.load(f)
+    closes = data.get("closes", data.get("close"))
+    volumes = data.get("volumes", data.get("volume", []))
+    if not isinstance(closes, list):
+        raise ValueError(f"{token}.json: missing 'closes' array")
+    return np.asarray(closes, dtype=np.float64), np.asarray(volumes, dtype=np.float64)
+
+
+# ── Per-token evaluation ────────────────────────────────────────
+
+def empty_stats() -> Dict[str, Any]:
+    """Counters every token adds into; merged with ``merge_stats``."""
+    return {
+        "tokens": 0,
+        "skipped": 0,
+        "bars": 0,
+        "horizons": {
+            name: {
+                "verdicts": {v: {"n": 0, "hits": 0, "return_sum": 0.0} for v in VERDICTS},
+                "calibration": {
+                    "n": [0] * CALIBRATION_BINS,
+                    "prob_sum": [0.0] * CALIBRATION_BINS,
+                    "up": [0] * CALIBRATION_BINS,
+                },
+                "brier_sum": 0.0,
+                "n": 0,
+            }
+            for name in HORIZONS
+        },
+        "strategy": {
+            "bars": 0,
+            "return_sum": 0.0,
+            "return_sq_sum": 0.0,
+            "exposure": 0.0,
+            "trades": 0,
+            "token_returns": [],
+            "hold_returns": [],
+        },
+    }
+
+
+def _forward_returns(prices: np.ndarray, steps: int) -> np.ndarray:
+    """Return from each bar to the bar ``steps`` later (0 after a zero price)."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return np.where(prices[:-steps] > 0, prices[steps:] / prices[:-steps] - 1.0, 0.0)
+
+
+def evaluate_token(
+    predictor: NexYpherPredictor,
+    closes,
+    volumes,
+    min_confidence: float = 0.0,
+    fee_bps: float = DEFAULT_FEE_BPS,
+    allow_short: bool = False,
+) -> Dict[str, Any]:
+    """
+    Backtest one series; returns ``empty_stats()``-shaped counters.
+
+    Raises ``ValueError`` when the series holds values ``prepare_series``
+    rejects or its forward returns are not finite; one such token would
+    otherwise swamp the combined report.
+    """
+    stats = empty_stats()
+    closes = np.asarray(closes, dtype=np.float64)
+    n = len(closes)
+    start = feature_engine.MIN_HISTORY - 1
+    if n <= start + 1:
+        stats["skipped"] = 1
+        return stats
+
+    closes, volumes = feature_engine.prepare_series(closes, volumes)
+    prices = closes[start:]
+    m = len(prices)
+    returns = {
+        steps: _forward_returns(prices, steps)
+        for steps in {1, *HORIZONS.values()} if m > steps
+    }
+    if not all(np.isfinite(r).all() for r in returns.values()):
+        raise ValueError("Forward returns are not finite")
+
+    matrix = feature_engine.compute_feature_matrix(
+        closes, volumes, columns=predictor.feature_columns,
+    )[start:]
+    probs_24h, probs_7d, _ = predictor.score_matrix(matrix)
+    probs_24h = np.asarray(probs_24h, dtype=np.float64)
+    probs_7d = np.asarray(probs_7d, dtype=np.float64)
+    verdicts = np.array([verdict_for(a, b) for a, b in zip(probs_24h.tolist(), probs_7d.tolist())])
+    confidence = np.array([confidence_for(a, b) for a, b in zip(probs_24h.tolist(), probs_7d.tolist())])
+
+    stats["tokens"] = 1
+    stats["bars"] = m
+
+    for name, steps in HORIZONS.items():
+        if m <= steps:
+            continue
+        h = stats["horizons"][name]
+        forward = returns[steps]
+        probs = (probs_24h if name == "24h" else probs_7d)[: m - steps]
+        v = verdicts[: m - steps]
+        up = forward > 0
+
+        for verdict in VERDICTS:
+            mask = v == verdict
+            count = int(mask.sum())
+            if not count:
+                continue
+            entry = h["verdicts"][verdict]
+            entry["n"] += count
+            entry["return_sum"] += float(forward[mask].sum())
+            if verdict in LONG_VERDICTS:
+                entry["hits"] += int(up[mask].sum())
+            elif verdict in SHORT_VERDICTS:
+                entry["hits"] += int((forward[mask] < 0).sum())
+
+        bins = np.minimum((probs * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+        cal = h["calibration"]
+        cal["n"] = np.bincount(bins, minlength=CALIBRATION_BINS).tolist()
+        cal["prob_sum"] = np.bincount(bins, weights=probs, minlength=CALIBRATION_BINS).tolist()
+        cal["up"] = np.bincount(bins, weights=up, minlength=CALIBRATION_BINS).astype(int).tolist()
+        h["brier_sum"] = float(((probs - up) ** 2).sum())
+        h["n"] = len(probs)
+
+    # Strategy: position set at bar t's close, earns bar t+1's return
+    position = np.where(
+        np.isin(verdicts, LONG_VERDICTS) & (confidence >= min_confidence), 1.0, 0.0,
+    )
+    if allow_short:
+        position = np.where(
+            np.isin(verdicts, SHORT_VERDICTS) & (confidence >= min_confidence), -1.0, position,
+        )
+    position = position[:-1]
+    next_return = returns[1]
+    turnover = np.abs(np.diff(np.concatenate(([0.0], position))))
+    daily = position * next_return - turnover * fee_bps / 1e4
+
+    strategy = stats["strategy"]
+    strategy["bars"] = len(daily)
+    strategy["return_sum"] = float(daily.sum())
+    strategy["return_sq_sum"] = float((daily ** 2).sum())
+    strategy["exposure"] = float(np.abs(position).sum())
+    strategy["trades"] = int((turnover > 0).sum())
+    strategy["token_returns"] = [float(np.prod(1.0 + daily) - 1.0)]
+    strategy["hold_returns"] = [float(prices[-1] / prices[0] - 1.0) if prices[0] > 0 else 0.0]
+    return stats
+
+
+def merge_stats(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """Add ``part``'s counters into ``total`` (in place) and return it."""
+    for key in ("tokens", "skipped", "bars"):
+        total[key] += part[key]
+    for name in HORIZONS:
+        t, p = total["horizons"][name], part["horizons"][name]
+        for verdict in VERDICTS:
+            for key in ("n", "hits", "return_sum"):
+                t["verdicts"][verdict][key] += p["verdicts"][verdict][key]
+        for key in ("n", "prob_sum", "up"):
+            t["calibration"][key] = [a + b for a, b in zip(t["calibration"][key], p["calibration"][key])]
+        t["brier_sum"] += p["brier_sum"]
+        t["n"] += p["n"]
+    t, p = total["strategy"], part["strategy"]
+    for key in ("bars", "return_sum", "return_sq_sum", "exposure", "trades"):
+        t[key] += p[key]
+    t["token_returns"].extend(p["token_returns"])
+    t["hold_returns"].extend(p["hold_returns"])
+    return total
+
+
+def summarize(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn merged counters into the report."""
+    report: Dict[str, Any] = {
+        "tokens": stats["tokens"],
+        "skipped": stats["skipped"],
+        "bars": stats["bars"],
+        "horizons": {},
+    }
+    for name in HORIZONS:
+        h = stats["horizons"][name]
+        verdicts = {}
+        for verdict in VERDICTS:
+            entry = h["verdicts"][verdict]
+            count = entry["n"]
+            verdicts[verdict] = {
+                "n": count,
+                "hit_rate": entry["hits"] / count if count and verdict != "NEUTRAL" else None,
+                "mean_return_pct": entry["return_sum"] / count * 100 if count else None,
+            }
+        cal = h["calibration"]
+        calibration = [
+            {
+                "bin": [k / CALIBRATION_BINS, (k + 1) / CALIBRATION_BINS],
+                "n": cal["n"][k],
+                "mean_prob": cal["prob_sum"][k] / cal["n"][k] if cal["n"][k] else None,
+                "up_rate": cal["up"][k] / cal["n"][k] if cal["n"][k] else None,
+            }
+            for k in range(CALIBRATION_BINS)
+        ]
+        report["horizons"][name] = {
+            "n": h["n"],
+            "verdicts": verdicts,
+            "calibration": calibration,
+            "brier": h["brier_sum"] / h["n"] if h["n"] else None,
+        }
+
+    s = stats["strategy"]
+    bars = s["bars"]
+    mean = s["return_sum"] / bars if bars else 0.0
+    var = s["return_sq_sum"] / bars - mean * mean if bars else 0.0
+    std = var ** 0.5 if var > 0 else 0.0
+    token_returns = np.asarray(s["token_returns"])
+    hold_returns = np.asarray(s["hold_returns"])
+    report["strategy"] = {
+        "bars": bars,
+        "trades": s["trades"],
+        "exposure": s["exposure"] / bars if bars else 0.0,
+        "mean_daily_return_pct": mean * 100,
+        "sharpe": mean / std * BARS_PER_YEAR ** 0.5 if std else None,
+        "mean_token_return_pct": float(token_returns.mean() * 100) if len(token_returns) else None,
+        "median_token_return_pct": float(np.median(token_returns) * 100) if len(token_returns) else None,
+        "mean_hold_return_pct": float(hold_returns.mean() * 100) if len(hold_returns) else None,
+        "tokens_beating_hold": int((token_returns > hold_returns).sum()),
+    }
+    return report
+
+
+# ── Runner ──────────────────────────────────────────────────────
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(models_dir, model_format, data_dir, options) -> None:
+    predictor = NexYpherPredictor(models_dir, model_format=model_format)
+    predictor.set_nthread(1)  # parallelism comes from the processes
+    store = None
+    if (Path(data_dir) / "index.json").exists():
+        from history_store import HistoryStore
+
+        store = HistoryStore(data_dir)
+    _worker.update(predictor=predictor, data_dir=Path(data_dir), store=store, options=options)
+
+
+def _run_token(token: str) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    try:
+        closes, volumes = load_series(_worker["data_dir"], token, _worker["store"])
+        stats = evaluate_token(_worker["predictor"], closes, volumes, **_worker["options"])
+        return token, stats, None
+    except (ValueError, KeyError, OSError) as e:
+        stats = empty_stats()
+        stats["skipped"] = 1
+        return token, stats, str(e)
+
+
+def run_backtest(
+    data_dir,
+    models_dir=None,
+    model_format: str = "auto",
+    workers: Optional[int] = None,
+    min_confidence: float = 0.0,
+    fee_bps: float = DEFAULT_FEE_BPS,
+    allow_short: bool = False,
+    tokens: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest every token in ``data_dir`` and return the report.
+
+    ``workers`` defaults to the available cores; 1 runs in-process. At most
+    two tokens per worker are in flight at a time.
+    """
+    data_dir = Path(data_dir)
+    tokens = list_tokens(data_dir) if tokens is None else tokens
+    options = {"min_confidence": min_confidence, "fee_bps": fee_bps, "allow_short": allow_short}
+    if workers is None:
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+    total = empty_stats()
+    errors: Dict[str, str] = {}
+
+    def collect(result):
+        token, stats, error = result
+        merge_stats(total, stats)
+        if error:
+            errors[token] = error
+
+    if workers <= 1:
+        _init_worker(models_dir, model_format, data_dir, options)
+        for token in tokens:
+            collect(_run_token(token))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(models_dir, model_format, str(data_dir), options),
+        ) as pool:
+            pending = set()
+            for token in tokens:
+                pending.add(pool.submit(_run_token, token))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+            for future in pending:
+                collect(future.result())
+
+    report = summarize(total)
+    report["errors"] = errors
+    report["settings"] = dict(options, workers=workers)
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"Tokens: {report['tokens']} ({report['skipped']} skipped), bars scored: {report['bars']}")
+    for name, h in report["horizons"].items():
+        brier = f"{h['brier']:.4f}" if h["brier"] is not None else "-"
+        print(f"\n[{name}] brier={brier}")
+        print(f"  {'verdict':<12} {'n':>9} {'hit rate':>9} {'mean ret %':>11}")
+        for verdict, entry in h["verdicts"].items():
+            hit = f"{entry['hit_rate']:.3f}" if entry["hit_rate"] is not None else "-"
+            ret = f"{entry['mean_return_pct']:.3f}" if entry["mean_return_pct"] is not None else "-"
+            print(f"  {verdict:<12} {entry['n']:>9} {hit:>9} {ret:>11}")
+        print(f"  {'prob bin':<12} {'n':>9} {'mean p':>9} {'up rate':>11}")
+        for row in h["calibration"]:
+            if not row["n"]:
+                continue
+            label = f"{row['bin'][0]:.1f}-{row['bin'][1]:.1f}"
+            print(f"  {label:<12} {row['n']:>9} {row['mean_prob']:>9.3f} {row['up_rate']:>11.3f}")
+
+    s = report["strategy"]
+    if not report["tokens"]:
+        print("\nStrategy: no tokens scored")
+        return
+    sharpe = f"{s['sharpe']:.2f}" if s["sharpe"] is not None else "-"
+    print(
+        f"\nStrategy: {s['trades']} trades, exposure {s['exposure']:.1%}, sharpe {sharpe}, "
+        f"mean token return {s['mean_token_return_pct']:.1f}% "
+        f"vs hold {s['mean_hold_return_pct']:.1f}% "
+        f"({s['tokens_beating_hold']}/{report['tokens']} beat hold)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the model verdicts")
+    parser.add_argument("--data", required=True, help="HistoryStore dir or dir of <token>.csv/.json")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--model-format", default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--fee-bps", type=float, default=DEFAULT_FEE_BPS,
+                        help="cost per unit of position change")
+    parser.add_argument("--short", action="store_true", help="short after SELL/AVOID")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    t0 = time.perf_counter()
+    report = run_backtest(
+        args.data, args.models_dir, args.model_format, args.workers,
+        args.min_confidence, args.fee_bps, args.short,
+    )
+    elapsed = time.perf_counter() - t0
+
+    _print_report(report)
+    print(f"\n{report['bars']} bars in {elapsed:.1f}s ({report['bars'] / max(elapsed, 1e-9):.0f} bars/s)")
+    if report["errors"]:
+        print(f"{len(report['errors'])} token(s) failed, see the report's 'errors'")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: frontend/dev_server.py single-threaded vs threaded
+=============================================================
+Starts the dev server in each ``ML_SERVER_MODE`` and drives
+``/api/predict`` from concurrent clients for a fixed duration, twice:
+  clean      - every client sends its request at full speed
+  slow peer  - one extra client trickles its body in over several seconds,
+               the way a slow mobile connection does
+
+The single-threaded server cannot accept anyone else while the slow peer is
+uploading; the threaded one keeps serving.
+
+Run: python benchmarks/bench_dev_server.py [--models-dir ./models] [--clients 8]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+EXPORT_MODEL_DIR = Path(__file__).resolve().parent.parent
+DEV_SERVER = EXPORT_MODEL_DIR.parent / "frontend" / "dev_server.py"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_features import synthetic_series
+from bench_workers import free_port, wait_ready
+
+
+def slow_peer(port, body, stop_at):
+    """Send one request, a few bytes per 100 ms, until the run ends."""
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        head = (
+            "POST /api/predict HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        sock.sendall(head)
+        sent = 0
+        while time.monotonic() < stop_at and sent < len(body) - 1:
+            sock.sendall(body[sent: sent + 8])
+            sent += 8
+            time.sleep(0.1)
+        sock.sendall(body[sent:])
+        sock.recv(65536)
+
+
+def drive(port, bodies, duration, clients, with_slow_peer):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        i = offset
+        local = []
+        while time.monotonic() < stop_at:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            t0 = time.perf_counter()
+            conn.request("POST", "/api/predict", bodies[i % len(bodies)],
+                         {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            conn.close()
+            if resp.status != 200:
+                raise RuntimeError(f"/api/predict returned {resp.status}")
+            local.append(time.perf_counter() - t0)
+            i += clients
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(clients)]
+    if with_slow_peer:
+        threads.append(threading.Thread(target=slow_peer, args=(port, bodies[0], stop_at)))
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dev server concurrency benchmark")
+    parser.add_argument("--models-dir", default=str(EXPORT_MODEL_DIR / "models"))
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--nthread", type=int, default=1, help="ML_NTHREAD for the server")
+    args = parser.parse_args()
+
+    bodies = []
+    for seed in range(64):
+        closes, volumes = synthetic_series(200, seed=seed)
+        bodies.append(json.dumps({"closes": closes, "volumes": volumes}).encode())
+
+    print(f"{args.clients} clients, {args.duration:.0f} s per run")
+    print(f"{'mode':<9} {'scenario':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("single", "threaded"):
+        port = free_port()
+        env = dict(
+            os.environ, ML_PORT=str(port), ML_SERVER_MODE=mode,
+            ML_NTHREAD=str(args.nthread), MODELS_DIR=args.models_dir,
+        )
+        server = subprocess.Popen(
+            [sys.executable, str(DEV_SERVER)], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(port, "OPTIONS", "/api/predict")
+            for scenario, slow in (("clean", False), ("slow peer", True)):
+                latencies, elapsed = drive(port, bodies, args.duration, args.clients, slow)
+                latencies.sort()
+                rps = len(latencies) / elapsed
+                p50 = statistics.median(latencies) * 1e3 if latencies else float("nan")
+                p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1e3 if latencies else float("nan")
+                print(f"{mode:<9} {scenario:<10} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f}")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: feature computation
+====================================
+Compares the series-based ``compute_features(mode="full")`` path with the
+single-pass kernel behind the default ``mode="tail"``.
+
+Run: python benchmarks/bench_features.py [--lengths 200 1000 5000]
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# Allow running from anywhere inside the repo
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from predictor import NexYpherPredictor
+import ta_utils
+
+
+def synthetic_series(n, seed=42):
+    """Random-walk closes/volumes, same shape as example.py's demo data."""
+    rng = random.Random(seed)
+    base_price = 50000
+    closes = []
+    volumes = []
+    for _ in range(n):
+        base_price *= (1 + rng.uniform(-0.03, 0.03))
+        closes.append(base_price)
+        volumes.append(rng.uniform(1e9, 5e9))
+    return closes, volumes
+
+
+def best_of(fn, number, repeat=5):
+    """Best per-call time in microseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 200, 1000, 5000])
+    args = parser.parse_args()
+
+    # Feature computation needs no models
+    predictor = NexYpherPredictor.__new__(NexYpherPredictor)
+
+    print(f"ta_utils backend: {ta_utils.BACKEND}")
+    print(f"{'bars':>7} {'full (us)':>12} {'kernel (us)':>12} {'speedup':>8}")
+    for n in args.lengths:
+        closes, volumes = synthetic_series(n)
+        number = max(1, 20000 // n)
+        full = best_of(lambda: predictor.compute_features(closes, volumes, mode="full"), number)
+        kernel = best_of(lambda: predictor.compute_features(closes, volumes), number)
+        print(f"{n:>7} {full:>12.1f} {kernel:>12.1f} {full / kernel:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
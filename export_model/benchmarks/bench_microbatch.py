@@ -0,0 +1,93 @@
+"""
+Benchmark: micro-batching vs per-request inference
+==================================================
+Simulates bursty feed refreshes in-process (no HTTP): ``--clients``
+coroutines each issue ``--requests`` predictions back to back. Compares
+  per-request - one ``predict()`` per request in the thread pool
+  batched     - requests pooled by ``MicroBatcher`` into ``predict_batch()``
+and reports throughput and p50/p99 latency.
+
+Run: python benchmarks/bench_microbatch.py [--models-dir ./models] [--clients 64]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_features import synthetic_series
+from micro_batcher import MicroBatcher
+from predictor import NexYpherPredictor
+
+
+async def drive(call, items, clients, requests):
+    latencies = []
+
+    async def client(k):
+        for i in range(requests):
+            item = items[(k * requests + i) % len(items)]
+            t0 = time.perf_counter()
+            await call(item)
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, elapsed):
+    latencies.sort()
+    print(
+        f"{label:<12} {len(latencies) / elapsed:>9.1f} "
+        f"{statistics.median(latencies) * 1e3:>9.1f} "
+        f"{latencies[int(len(latencies) * 0.99) - 1] * 1e3:>9.1f}"
+    )
+
+
+async def main_async(args):
+    predictor = NexYpherPredictor(args.models_dir)
+    items = []
+    for seed in range(512):
+        closes, volumes = synthetic_series(args.bars, seed=seed)
+        items.append({"closes": closes, "volumes": volumes})
+
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    loop = asyncio.get_running_loop()
+
+    async def per_request(item):
+        return await loop.run_in_executor(executor, lambda: predictor.predict(**item))
+
+    batcher = MicroBatcher(
+        predictor.predict_batch, executor,
+        max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, max_inflight=args.workers,
+    )
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.workers} scoring threads")
+    print(f"{'mode':<12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    report("per-request", *await drive(per_request, items, args.clients, args.requests))
+    report("batched", *await drive(batcher.submit, items, args.clients, args.requests))
+    stats = batcher.stats()
+    print(f"mean batch size {stats['batch_size']['mean']:.1f} over {stats['batches']} batches")
+    await batcher.stop()
+    executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching benchmark")
+    parser.add_argument("--models-dir", default=str(Path(__file__).resolve().parent.parent / "models"))
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--bars", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
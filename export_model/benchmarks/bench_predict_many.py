@@ -0,0 +1,64 @@
+"""
+Scaling benchmark: predict_many across worker counts
+====================================================
+Scores ``--series`` random-walk series with ``predict_batch`` (one process)
+and with ``predict_many(workers=N)`` for each N, reporting wall time,
+series/second and speedup over ``predict_batch``. The first call for each
+N starts its pool and is not timed.
+
+Scaling is bounded by the cores available (printed first); on a box with
+fewer cores than N the extra workers only add overhead.
+
+Run: python benchmarks/bench_predict_many.py [--models-dir ./models] [--workers 1 2 4 8 16]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_features import synthetic_series
+from predictor import NexYpherPredictor
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="predict_many scaling benchmark")
+    parser.add_argument("--models-dir", default=str(Path(__file__).resolve().parent.parent / "models"))
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--bars", type=int, default=365)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    predictor = NexYpherPredictor(args.models_dir)
+    series = []
+    for seed in range(args.series):
+        closes, volumes = synthetic_series(args.bars, seed=seed)
+        series.append({"closes": closes, "volumes": volumes})
+
+    print(f"cores available: {len(os.sched_getaffinity(0))}; {args.series} series x {args.bars} bars")
+    print(f"{'mode':<16} {'seconds':>9} {'series/s':>10} {'speedup':>8}")
+    base = timed(lambda: predictor.predict_batch(series), args.repeat)
+    print(f"{'predict_batch':<16} {base:>9.3f} {args.series / base:>10.0f} {1.0:>7.2f}x")
+
+    for n in args.workers:
+        predictor.predict_many(series[: 2 * n], workers=n)  # start the pool
+        elapsed = timed(lambda: predictor.predict_many(series, workers=n), args.repeat)
+        print(f"{f'workers={n}':<16} {elapsed:>9.3f} {args.series / elapsed:>10.0f} {base / elapsed:>7.2f}x")
+    predictor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup benchmark: pickle vs native vs compiled model loading
+==============================================================
+Starts a fresh interpreter per run and reports, for each loading path:
+  import   - importing the libraries that path needs
+  load     - NexYpherPredictor(...) construction (metadata + models)
+  first    - latency of the first predict() call
+  total    - interpreter start to first result
+
+"native (no sklearn)" hides scikit-learn/joblib from the child, which is
+what a serverless bundle built without them looks like (xgboost otherwise
+imports scikit-learn on its own when it is installed). "compiled" also hides
+xgboost: the NumPy tree evaluator is all it needs.
+
+Run: python benchmarks/bench_startup.py [--models-dir ./models] [--runs 5]
+Export first with: python native_models.py && python tree_ensemble.py
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+EXPORT_MODEL_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in {hidden!r}:
+    sys.modules[name] = None
+sys.path[:0] = [{export_dir!r}, {bench_dir!r}]
+{imports}
+t1 = time.perf_counter()
+from predictor import NexYpherPredictor
+from bench_features import synthetic_series
+p = NexYpherPredictor({models_dir!r}, model_format={fmt!r})
+t2 = time.perf_counter()
+closes, volumes = synthetic_series(200)
+p.predict(closes, volumes)
+t3 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "load": t2 - t1, "first": t3 - t2, "total": t3 - t0}}))
+"""
+
+PATHS = [
+    ("pickle", "pickle", "import joblib, sklearn, xgboost", ()),
+    ("native", "native", "import xgboost", ()),
+    ("native (no sklearn)", "native", "import xgboost", ("sklearn", "joblib")),
+    ("compiled", "compiled", "import numpy", ("sklearn", "joblib", "xgboost")),
+]
+
+
+def run_child(models_dir, fmt, imports, hidden):
+    code = CHILD.format(
+        hidden=hidden,
+        export_dir=str(EXPORT_MODEL_DIR),
+        bench_dir=str(Path(__file__).resolve().parent),
+        imports=imports,
+        models_dir=str(models_dir),
+        fmt=fmt,
+    )
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for model loading")
+    parser.add_argument("--models-dir", default=str(EXPORT_MODEL_DIR / "models"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'path':<22} {'import':>9} {'load':>9} {'first':>9} {'total':>9}   (median ms)")
+    for label, fmt, imports, hidden in PATHS:
+        runs = [run_child(args.models_dir, fmt, imports, hidden) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs) * 1e3 for k in runs[0]}
+        print(
+            f"{label:<22} {med['import']:>9.1f} {med['load']:>9.1f} "
+            f"{med['first']:>9.1f} {med['total']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: JSON vs binary request bodies
+==============================================
+Parses a ``/predict/batch`` body of ``--series`` series x ``--bars`` bars
+both ways and, separately, parses and computes features for every series,
+which is the work the server does before the model call.
+
+Run: python benchmarks/bench_wire_format.py [--series 500] [--bars 200]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_features import synthetic_series
+import feature_engine
+import wire_format
+
+
+def best_of(fn, repeat=5):
+    """Best single-call time in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=200)
+    args = parser.parse_args()
+
+    series = []
+    for seed in range(args.series):
+        closes, volumes = synthetic_series(args.bars, seed=seed)
+        series.append({"closes": closes, "volumes": volumes, "fear_greed_value": 40.0})
+
+    json_body = json.dumps({"series": series}).encode()
+    binary_body = wire_format.encode_series(series)
+
+    def parse_json():
+        return json.loads(json_body)["series"]
+
+    def parse_binary():
+        return wire_format.decode_series(binary_body)
+
+    def features(parse):
+        for item in parse():
+            feature_engine.compute_features(item["closes"], item["volumes"])
+
+    print(f"{args.series} series x {args.bars} bars")
+    print(f"{'format':<8} {'body KB':>9} {'parse ms':>9} {'parse+features ms':>18}")
+    for label, body, parse in (("json", json_body, parse_json), ("binary", binary_body, parse_binary)):
+        print(
+            f"{label:<8} {len(body) / 1024:>9.1f} {best_of(parse):>9.2f} "
+            f"{best_of(lambda: features(parse), repeat=3):>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Load test: gunicorn worker scaling
+==================================
+Starts ``gunicorn -c gunicorn.conf.py app:app`` once per worker count and
+drives ``/predict`` from concurrent client threads for a fixed duration.
+Reports, per worker count:
+  req/s    - completed requests per second
+  p50/p99  - request latency (ms)
+  RSS      - mean resident memory per worker (MB)
+  PSS      - mean proportional share per worker (MB); pages shared
+             copy-on-write with the master are split between processes,
+             so PSS well below RSS means the preloaded models are shared
+
+The result cache is disabled and every request uses a distinct series, so
+each request runs a full inference. Memory figures come from /proc (Linux).
+
+Run: python benchmarks/bench_workers.py [--models-dir ./models] [--workers 1 2 4 8]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+EXPORT_MODEL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_features import synthetic_series
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, method="GET", path="/health", timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request(method, path)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+def child_pids(parent):
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return pids
+
+
+def memory_mb(pid):
+    """(rss, pss) in MB from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values["Rss:"], values["Pss:"]
+
+
+def drive(port, bodies, duration, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        i = offset
+        local = []
+        while time.monotonic() < stop_at:
+            body = bodies[i % len(bodies)]
+            i += concurrency
+            t0 = time.perf_counter()
+            conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"/predict returned {resp.status}")
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.monotonic() - start
+
+
+def run(n_workers, args, bodies):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(n_workers),
+        PREDICTION_CACHE_SIZE="0",
+        MODELS_DIR=args.models_dir,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=EXPORT_MODEL_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        # Warm every worker before measuring
+        drive(port, bodies, 1.0, n_workers * 2)
+        latencies, elapsed = drive(port, bodies, args.duration, args.concurrency or n_workers * 2)
+        mem = [memory_mb(pid) for pid in child_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        "workers": n_workers,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1e3,
+        "rss_mb": statistics.mean(m[0] for m in mem),
+        "pss_mb": statistics.mean(m[1] for m in mem),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test across gunicorn worker counts")
+    parser.add_argument("--models-dir", default=str(EXPORT_MODEL_DIR / "models"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="client threads (default: 2 per worker)")
+    parser.add_argument("--bars", type=int, default=200)
+    args = parser.parse_args()
+
+    bodies = []
+    for seed in range(256):
+        closes, volumes = synthetic_series(args.bars, seed=seed)
+        bodies.append(json.dumps({"closes": closes, "volumes": volumes}))
+
+    print(f"cores available: {len(os.sched_getaffinity(0))}")
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'PSS MB':>8}")
+    for n in args.workers:
+        r = run(n, args, bodies)
+        print(
+            f"{r['workers']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+            f"{r['rss_mb']:>8.1f} {r['pss_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Benchmark suite: indicators, features and end-to-end prediction
+===============================================================
+One runner for the hot paths, with results saved as JSON so two commits
+can be compared:
+
+  ta.*          every ta_utils indicator, at each history length
+  features.*    compute_features (tail kernel and full series),
+                compute_feature_matrix, FeatureState.from_history and a
+                last-bar update through FeatureStateCache, at each
+                history length
+  predict.*     single predict(), predict_batch() of 100 series,
+                predict_series() over three years of bars
+  flask.*       POST /predict through the Flask test client
+  load.*        model load in-process and cold start in a fresh interpreter
+
+Data comes from ``synthetic_series`` (the random walk from example.py).
+Every case reports the best per-call time over ``--repeat`` rounds, each
+round running enough calls to last ``--min-time`` seconds.
+
+Run:
+    python benchmarks/suite.py --output before.json
+    ... change code ...
+    python benchmarks/suite.py --output after.json --compare before.json
+
+``--compare`` prints the ratio per case and exits non-zero when any case
+is slower than the baseline by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+EXPORT_MODEL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(EXPORT_MODEL_DIR))
+
+from bench_features import synthetic_series
+import feature_engine
+from feature_cache import FeatureStateCache
+import ta_utils
+
+DEFAULT_LENGTHS = [50, 200, 1000, 10000, 100000]
+
+
+def measure(fn, min_time, repeat):
+    """Best per-call seconds: ``repeat`` rounds of at least ``min_time``."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best, number
+
+
+# ── Cases ───────────────────────────────────────────────────────
+
+def indicator_cases(lengths):
+    for n in lengths:
+        closes, volumes = synthetic_series(n)
+        yield f"ta.ema[{n}]", lambda c=closes: ta_utils.ema(c, 21)
+        yield f"ta.ema_series[{n}]", lambda c=closes: ta_utils.ema_series(c, 21)
+        yield f"ta.rsi[{n}]", lambda c=closes: ta_utils.rsi(c, 14)
+        yield f"ta.rsi_series[{n}]", lambda c=closes: ta_utils.rsi_series(c, 14)
+        yield f"ta.macd[{n}]", lambda c=closes: ta_utils.macd(c)
+        yield f"ta.macd_series[{n}]", lambda c=closes: ta_utils.macd_series(c)
+        yield f"ta.macd_tail[{n}]", lambda c=closes: ta_utils.macd_tail(c)
+        yield f"ta.bollinger_series[{n}]", lambda c=closes: ta_utils.bollinger_series(c)
+        yield f"ta.bollinger_last[{n}]", lambda c=closes: ta_utils.bollinger_last(c)
+        yield f"ta.bollinger_position[{n}]", lambda c=closes: ta_utils.bollinger_position(c)
+
+
+def feature_cases(lengths):
+    for n in lengths:
+        closes, volumes = synthetic_series(n)
+        if n >= feature_engine.MIN_HISTORY:
+            yield f"features.tail[{n}]", lambda c=closes, v=volumes: feature_engine.compute_features(c, v)
+            yield (
+                f"features.full[{n}]",
+                lambda c=closes, v=volumes: feature_engine.compute_features(c, v, mode="full"),
+            )
+            yield (
+                f"features.matrix[{n}]",
+                lambda c=closes, v=volumes: feature_engine.compute_feature_matrix(c, v),
+            )
+            cache = FeatureStateCache()
+            cache.compute(closes, volumes)  # records the prefix
+            cache.compute(closes, volumes)  # builds its state
+            yield (
+                f"features.incremental[{n}]",
+                lambda c=closes, v=volumes, cache=cache: cache.compute(c, v),
+            )
+        yield (
+            f"features.state_from_history[{n}]",
+            lambda c=closes, v=volumes: ta_utils.FeatureState.from_history(c, v),
+        )
+
+
+def predictor_cases(models_dir):
+    from predictor import NexYpherPredictor
+
+    predictor = NexYpherPredictor(models_dir)
+    closes, volumes = synthetic_series(200)
+    batch = []
+    for seed in range(100):
+        c, v = synthetic_series(200, seed=seed)
+        batch.append({"closes": c, "volumes": v})
+
+    yield "predict.single[200]", lambda: predictor.predict(closes, volumes)
+    yield "predict.batch[100x200]", lambda: predictor.predict_batch(batch)
+    history, history_volumes = synthetic_series(1095)
+    yield "predict.series[1095]", lambda: predictor.predict_series(history, history_volumes)
+    yield "load.in_process", lambda: NexYpherPredictor(models_dir)
+
+
+def flask_cases(models_dir):
+    os.environ["MODELS_DIR"] = str(models_dir)
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    os.environ["FEATURE_CACHE_SIZE"] = "0"
+    import logging
+
+    logging.disable(logging.INFO)
+    import app as app_module
+
+    client = app_module.app.test_client()
+    closes, volumes = synthetic_series(200)
+    body = {"closes": closes, "volumes": volumes}
+    yield "flask.predict[200]", lambda: client.post("/predict", json=body)
+
+
+def cold_start_case(models_dir):
+    """Interpreter start to first prediction, via bench_startup's child."""
+    from bench_startup import run_child
+
+    def cold():
+        run_child(models_dir, "auto", "", ())
+
+    yield "load.cold_start", cold
+
+
+# ── Runner ──────────────────────────────────────────────────────
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=EXPORT_MODEL_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "commit": commit,
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy_version,
+        "ta_backend": ta_utils.BACKEND,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'case':<40} {'base us':>12} {'now us':>12} {'ratio':>7}")
+    regressions = 0
+    for name, entry in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["us_per_call"]
+        now = entry["us_per_call"]
+        ratio = now / base if base else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<40} {base:>12.1f} {now:>12.1f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    parser.add_argument("--models-dir", default=str(EXPORT_MODEL_DIR / "models"))
+    parser.add_argument("--lengths", type=int, nargs="+", default=DEFAULT_LENGTHS)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    groups = [indicator_cases(args.lengths), feature_cases(args.lengths)]
+    if (Path(args.models_dir) / "model_metadata.json").exists():
+        groups += [predictor_cases(args.models_dir), flask_cases(args.models_dir),
+                   cold_start_case(args.models_dir)]
+    else:
+        print(f"No models in {args.models_dir}: skipping predict/flask/load cases")
+
+    results = {}
+    print(f"{'case':<40} {'us/call':>12} {'calls':>8}")
+    for group in groups:
+        for name, fn in group:
+            if args.filter not in name:
+                continue
+            seconds, number = measure(fn, args.min_time, args.repeat)
+            results[name] = {"us_per_call": seconds * 1e6, "number": number, "repeat": args.repeat}
+            print(f"{name:<40} {seconds * 1e6:>12.1f} {number:>8}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{regressions} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Incremental Feature Cache
+==========================
+Feed clients poll the same token every few minutes with a history that is
+identical except for the last bar, whose close moves intraday. Recomputing
+every indicator from the full array on each poll repeats the same work.
+
+This cache keeps a ``ta_utils.FeatureState`` (EMA seeds, Wilder averages,
+rolling windows) for the history *before* the last bar. The key is a
+fingerprint of ``closes[:-1]`` and ``volumes[:-1]``. When a request's prefix
+is cached, the state is copied, fed the final bar and read out. Only the
+fingerprint scales with the history length, and it is hashed in C.
+
+A prefix is only recorded the first time it is seen. The state is built
+(one O(n) streaming pass) the second time, so one-off requests such as
+universe scans and backtests never pay for state nobody reuses. Seen-once
+prefixes live in their own LRU, so a burst of one-off series cannot
+evict the states of tokens that are being polled.
+
+Cached states are never mutated and the counters are locked, so the cache
+is safe to share between threads. Features from a cached state match
+``compute_features`` exactly except for the rolling mean/std features
+(Bollinger, volatility, volume ratio). Those use sliding sums and agree to
+about 1e-12 relative; see ta_utils.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import feature_engine
+from prediction_cache import PredictionCache, fingerprint
+from ta_utils import FeatureState
+
+
+class FeatureStateCache:
+    """
+    LRU/TTL cache of prefix ``FeatureState`` objects.
+
+    Parameters
+    ----------
+    max_size : int
+        Built states kept; the least recently used is evicted first. The
+        same number of seen-once prefixes is tracked separately.
+    ttl : float
+        Seconds an entry stays valid. A prefix only changes when a new bar
+        closes, so this can be long (default one day).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 86400.0):
+        self._states = PredictionCache(max_size, ttl)
+        self._seen = PredictionCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.incremental = 0
+
+    def compute(
+        self,
+        closes: Sequence[float],
+        volumes: Sequence[float],
+        price_change_24h: Optional[float] = None,
+        price_change_7d: Optional[float] = None,
+        price_change_30d: Optional[float] = None,
+        volume_mcap_ratio: Optional[float] = None,
+        ath_change_pct: Optional[float] = None,
+        fear_greed_value: float = 50.0,
+    ) -> Dict[str, float]:
+        """
+        ``feature_engine.compute_features`` through the prefix cache.
+
+        ``closes``/``volumes`` must already have passed
+        ``feature_engine.prepare_series``.
+        """
+        n = len(closes)
+        prefix_closes = closes[: n - 1]
+        prefix_volumes = volumes[: n - 1]
+        key = fingerprint(prefix_closes, prefix_volumes, (), "")
+
+        state = self._states.get(key)
+        if state is None:
+            if self._seen.get(key) is None:
+                self._seen.put(key, True)
+                return feature_engine.compute_features(
+                    closes, volumes,
+                    price_change_24h, price_change_7d, price_change_30d,
+                    volume_mcap_ratio, ath_change_pct, fear_greed_value,
+                )
+            state = FeatureState.from_history(
+                [float(c) for c in prefix_closes], [float(v) for v in prefix_volumes],
+            )
+            self._states.put(key, state)
+            with self._lock:
+                self.built += 1
+        else:
+            with self._lock:
+                self.incremental += 1
+
+        state = state.copy()
+        state.update(float(closes[n - 1]), float(volumes[n - 1]))
+        return state.features(
+            price_change_24h, price_change_7d, price_change_30d,
+            volume_mcap_ratio, ath_change_pct, fear_greed_value,
+        )
+
+    def clear(self) -> None:
+        self._states.clear()
+        self._seen.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for /health; ``hits``/``misses`` count built-state lookups."""
+        stats = self._states.stats()
+        stats["seen_once"] = self._seen.stats()["size"]
+        with self._lock:
+            stats["built"] = self.built
+            stats["incremental"] = self.incremental
+        return stats
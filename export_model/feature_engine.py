@@ -0,0 +1,728 @@
+"""
+Feature Engine (Standalone)
+============================
+Computes the 38 model features from daily closes + volumes. Shared by the
+Flask service (``predictor.py``) and the Vercel function
+(``frontend/api/predict.py``) so both score exactly the same inputs.
+
+Only depends on ``ta_utils`` (NumPy optional, via its backend selection).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ta_utils import (
+    assemble_features,
+    ema_series,
+    rsi_series,
+    macd_series,
+    bollinger_series,
+)
+
+MIN_HISTORY = 50
+
+# Far beyond any real price or volume, and small enough that the squared
+# deviations in the volatility and Bollinger passes stay in float range
+MAX_ABS_VALUE = 1e100
+
+# Column order the pretrained models expect (mirrors model_metadata.json)
+FEATURE_COLUMNS = [
+    "rsi_7", "rsi_14", "rsi_21",
+    "macd_line", "macd_signal", "macd_histogram", "macd_crossover",
+    "bb_width", "bb_position",
+    "ema_9_21_cross", "ema_50_200_cross", "price_above_ema200",
+    "volume_ratio", "volume_spike",
+    "price_momentum_5d", "price_momentum_10d", "price_momentum_30d",
+    "rate_of_change_14",
+    "atr_14", "volatility_10d", "volatility_30d",
+    "dist_to_support_pct", "dist_to_resist_pct",
+    "price_change_24h", "price_change_7d", "price_change_30d",
+    "volume_mcap_ratio", "ath_change_pct",
+    "rsi_14_ma_diff", "rsi_oversold", "rsi_overbought",
+    "price_vs_sma20_pct", "price_vs_ema50_pct", "price_vs_ema200_pct",
+    "vol_ratio_10_30", "momentum_accel",
+    "fear_greed_value", "trend_encoded",
+]
+
+
+# ── Series helpers ──────────────────────────────────────────────
+
+
+def _sma_series(values: List[float], period: int) -> List[float]:
+    n = len(values)
+    result = list(values)
+    for i in range(period - 1, n):
+        result[i] = sum(values[i - period + 1: i + 1]) / period
+    return result
+
+
+def _atr_series(closes: List[float], period: int = 14) -> List[float]:
+    n = len(closes)
+    tr = [0.0] * n
+    for i in range(1, n):
+        tr[i] = abs(closes[i] - closes[i - 1])
+    atr = [0.0] * n
+    if n > period:
+        atr[period] = sum(tr[1:period + 1]) / period
+        for i in range(period + 1, n):
+            atr[i] = (atr[i - 1] * (period - 1) + tr[i]) / period
+    return atr
+
+
+def _returns_series(closes: List[float]) -> List[float]:
+    n = len(closes)
+    returns = [0.0] * n
+    for i in range(1, n):
+        if closes[i - 1] > 0:
+            returns[i] = (closes[i] - closes[i - 1]) / closes[i - 1]
+    return returns
+
+
+def _volatility_series(returns: List[float], period: int) -> List[float]:
+    n = len(returns)
+    vol = [0.0] * n
+    for i in range(period, n):
+        window = returns[i - period + 1: i + 1]
+        mean = sum(window) / len(window)
+        var = sum((r - mean) ** 2 for r in window) / len(window)
+        vol[i] = math.sqrt(var)
+    return vol
+
+
+def _momentum_series(closes: List[float], period: int) -> List[float]:
+    n = len(closes)
+    mom = [0.0] * n
+    for i in range(period, n):
+        if closes[i - period] > 0:
+            mom[i] = (closes[i] / closes[i - period] - 1.0) * 100.0
+    return mom
+
+
+def _volume_ratio_series(volumes: List[float], period: int = 20) -> List[float]:
+    n = len(volumes)
+    ratio = [1.0] * n
+    for i in range(period, n):
+        ma = sum(volumes[i - period: i]) / period
+        ratio[i] = volumes[i] / ma if ma > 0 else 1.0
+    return ratio
+
+
+def _support_resistance(closes: List[float], window: int = 20):
+    n = len(closes)
+    support = list(closes)
+    resist = list(closes)
+    for i in range(window, n):
+        w = closes[i - window: i]
+        support[i] = min(w)
+        resist[i] = max(w)
+    return support, resist
+
+
+# ── Indicator passes ────────────────────────────────────────────
+
+
+def _full_indicators(closes: List[float], volumes: List[float]) -> Dict[str, float]:
+    """Build every indicator series and read the last bar."""
+    i = len(closes) - 1
+    close = closes[i]
+
+    macd_line, macd_signal, macd_hist = macd_series(closes, 12, 26, 9)
+    bb_upper, bb_mid, bb_lower = bollinger_series(closes, 20, 2.0)
+    band_width = bb_upper[i] - bb_lower[i]
+    vol_ratio = _volume_ratio_series(volumes, 20)
+    returns = _returns_series(closes)
+    support, resist = _support_resistance(closes, 20)
+
+    return {
+        "close": close,
+        "rsi_7": rsi_series(closes, 7)[i],
+        "rsi_14": rsi_series(closes, 14)[i],
+        "rsi_21": rsi_series(closes, 21)[i],
+        "macd_line": macd_line[i],
+        "macd_signal": macd_signal[i],
+        "macd_hist": macd_hist[i],
+        "macd_prev_hist": macd_hist[i - 1] if i >= 1 else 0.0,
+        "bb_upper": bb_upper[i],
+        "bb_mid": bb_mid[i],
+        "bb_lower": bb_lower[i],
+        "bb_pos": (close - bb_lower[i]) / band_width if band_width > 0 else 0.5,
+        "ema_9": ema_series(closes, 9)[i],
+        "ema_21": ema_series(closes, 21)[i],
+        "ema_50": ema_series(closes, 50)[i],
+        "ema_200": ema_series(closes, 200)[i],
+        "sma_20": _sma_series(closes, 20)[i],
+        "vol_ratio": vol_ratio[i],
+        "vol_spike": 1.0 if vol_ratio[i] > 2.0 else 0.0,
+        "mom_5": _momentum_series(closes, 5)[i],
+        "mom_7": _momentum_series(closes, 7)[i],
+        "mom_10": _momentum_series(closes, 10)[i],
+        "mom_30": _momentum_series(closes, 30)[i],
+        "roc_14": _momentum_series(closes, 14)[i],
+        "atr_14": _atr_series(closes, 14)[i],
+        "vol_10": _volatility_series(returns, 10)[i],
+        "vol_30": _volatility_series(returns, 30)[i],
+        "support": support[i],
+        "resist": resist[i],
+    }
+
+
+def _kernel_indicators(closes: List[float], volumes: List[float]) -> Dict[str, float]:
+    """
+    Single-pass feature kernel: every last-bar indicator value.
+
+    One loop over the history updates all recursive indicators together
+    (EMA 9/21/50/200, RSI 7/14/21, MACD and ATR), sharing each bar's
+    price delta. Windowed values (SMA/Bollinger, returns volatility,
+    momentum, volume ratio, support/resistance) then read only the
+    trailing window, each intermediate computed once. Results match the
+    list implementations in ``ta_utils`` exactly.
+    """
+    n = len(closes)
+    close = closes[-1]
+
+    # EMA seeds (``ema()`` semantics: period capped at history length)
+    p9, p21, p50, p200 = min(9, n), min(21, n), min(50, n), min(200, n)
+    e9 = sum(closes[:p9]) / p9
+    e21 = sum(closes[:p21]) / p21
+    e50 = sum(closes[:p50]) / p50
+    e200 = sum(closes[:p200]) / p200
+    k9, k21, k50, k200 = 2.0 / (p9 + 1), 2.0 / (p21 + 1), 2.0 / (p50 + 1), 2.0 / (p200 + 1)
+
+    # MACD 12/26/9; its EMAs hold the raw value before their seed index
+    k12, k26, k_sig = 2.0 / 13, 2.0 / 27, 2.0 / 10
+    sum12 = sum26 = sum_sig = 0.0
+    m12 = m26 = line = sig = hist = prev_hist = 0.0
+
+    g7 = l7 = g14 = l14 = g21 = l21 = atr = 0.0
+
+    # Warm-up: bars before every recursion is in its steady state
+    warm = min(n, 26)
+    for i in range(warm):
+        c = closes[i]
+        if i >= p9:
+            e9 = c * k9 + e9 * (1 - k9)
+        if i >= p21:
+            e21 = c * k21 + e21 * (1 - k21)
+
+        if i < 12:
+            sum12 += c
+            m12 = sum12 / 12 if i == 11 else c
+        else:
+            m12 = c * k12 + m12 * (1 - k12)
+        sum26 += c
+        m26 = sum26 / 26 if i == 25 else c
+        line = m12 - m26
+        if i < 9:
+            sum_sig += line
+            sig = sum_sig / 9 if i == 8 else line
+        else:
+            sig = line * k_sig + sig * (1 - k_sig)
+        prev_hist = hist
+        hist = line - sig
+
+        if i == 0:
+            continue
+        d = c - closes[i - 1]
+        gain = d if d > 0 else 0.0
+        loss = -d if d < 0 else 0.0
+        tr = abs(d)
+        if i <= 7:
+            g7 += gain
+            l7 += loss
+            if i == 7:
+                g7 /= 7
+                l7 /= 7
+        else:
+            g7 = (g7 * 6 + gain) / 7
+            l7 = (l7 * 6 + loss) / 7
+        if i <= 14:
+            g14 += gain
+            l14 += loss
+            atr += tr
+            if i == 14:
+                g14 /= 14
+                l14 /= 14
+                atr /= 14
+        else:
+            g14 = (g14 * 13 + gain) / 14
+            l14 = (l14 * 13 + loss) / 14
+            atr = (atr * 13 + tr) / 14
+        if i <= 21:
+            g21 += gain
+            l21 += loss
+            if i == 21:
+                g21 /= 21
+                l21 /= 21
+        else:
+            g21 = (g21 * 20 + gain) / 21
+            l21 = (l21 * 20 + loss) / 21
+
+    # Steady state: every recursion except EMA 50/200 seeding is live
+    prev = closes[warm - 1]
+    for i in range(warm, n):
+        c = closes[i]
+        e9 = c * k9 + e9 * (1 - k9)
+        e21 = c * k21 + e21 * (1 - k21)
+        if i >= p50:
+            e50 = c * k50 + e50 * (1 - k50)
+            if i >= p200:
+                e200 = c * k200 + e200 * (1 - k200)
+
+        m12 = c * k12 + m12 * (1 - k12)
+        m26 = c * k26 + m26 * (1 - k26)
+        line = m12 - m26
+        sig = line * k_sig + sig * (1 - k_sig)
+        prev_hist = hist
+        hist = line - sig
+
+        d = c - prev
+        prev = c
+        gain = d if d > 0 else 0.0
+        loss = -d if d < 0 else 0.0
+        g7 = (g7 * 6 + gain) / 7
+        l7 = (l7 * 6 + loss) / 7
+        g14 = (g14 * 13 + gain) / 14
+        l14 = (l14 * 13 + loss) / 14
+        g21 = (g21 * 20 + gain) / 21
+        l21 = (l21 * 20 + loss) / 21
+        atr = (atr * 13 + abs(d)) / 14
+
+    def _rsi(avg_gain: float, avg_loss: float, period: int) -> float:
+        if n < period + 1:
+            return 50.0
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+    if n < 26:
+        line = sig = hist = prev_hist = 0.0
+
+    # 20-bar window: SMA and Bollinger share one sum
+    if n >= 20:
+        window = closes[n - 20:]
+        sma_20 = sum(window) / 20
+        std = math.sqrt(sum((x - sma_20) ** 2 for x in window) / 20)
+        bb_upper = sma_20 + 2.0 * std
+        bb_lower = sma_20 - 2.0 * std
+    else:
+        sma_20 = bb_upper = bb_lower = close
+    band_width = bb_upper - bb_lower
+
+    # Daily returns over the last 30 bars, shared by both volatilities
+    i = n - 1
+    returns = [
+        (closes[j] - closes[j - 1]) / closes[j - 1] if closes[j - 1] > 0 else 0.0
+        for j in range(max(1, i - 29), i + 1)
+    ]
+
+    def _volatility(period: int) -> float:
+        if i < period:
+            return 0.0
+        window = returns[-period:]
+        mean = sum(window) / period
+        return math.sqrt(sum((r - mean) ** 2 for r in window) / period)
+
+    def _momentum(period: int) -> float:
+        if i < period or closes[i - period] <= 0:
+            return 0.0
+        return (close / closes[i - period] - 1.0) * 100.0
+
+    # Volume mean over the 20 bars before the last one, computed once
+    vol_ratio = 1.0
+    if i >= 20:
+        ma = sum(volumes[i - 20: i]) / 20
+        vol_ratio = volumes[i] / ma if ma > 0 else 1.0
+
+    if i >= 20:
+        prior = closes[i - 20: i]
+        support, resist = min(prior), max(prior)
+    else:
+        support = resist = close
+
+    return {
+        "close": close,
+        "rsi_7": _rsi(g7, l7, 7),
+        "rsi_14": _rsi(g14, l14, 14),
+        "rsi_21": _rsi(g21, l21, 21),
+        "macd_line": line,
+        "macd_signal": sig,
+        "macd_hist": hist,
+        "macd_prev_hist": prev_hist,
+        "bb_upper": bb_upper,
+        "bb_mid": sma_20,
+        "bb_lower": bb_lower,
+        "bb_pos": (close - bb_lower) / band_width if band_width > 0 else 0.5,
+        "ema_9": e9,
+        "ema_21": e21,
+        "ema_50": e50,
+        "ema_200": e200,
+        "sma_20": sma_20,
+        "vol_ratio": vol_ratio,
+        "vol_spike": 1.0 if vol_ratio > 2.0 else 0.0,
+        "mom_5": _momentum(5),
+        "mom_7": _momentum(7),
+        "mom_10": _momentum(10),
+        "mom_30": _momentum(30),
+        "roc_14": _momentum(14),
+        "atr_14": atr if n > 14 else 0.0,
+        "vol_10": _volatility(10),
+        "vol_30": _volatility(30),
+        "support": support,
+        "resist": resist,
+    }
+
+
+def _as_list(values: Sequence[float]) -> List[float]:
+    return values.tolist() if hasattr(values, "tolist") else values
+
+
+def _in_range(values: Sequence[float]) -> bool:
+    """True when every value is finite and within ``MAX_ABS_VALUE``."""
+    if hasattr(values, "dtype"):
+        import numpy as np
+
+        # NaN compares False, so it fails the check like inf does
+        return bool(np.all(np.abs(values) <= MAX_ABS_VALUE))
+    return all(abs(v) <= MAX_ABS_VALUE for v in values)
+
+
+# ── Public API ──────────────────────────────────────────────────
+
+def prepare_series(
+    closes: Sequence[float],
+    volumes: Sequence[float],
+) -> Tuple[Sequence[float], Sequence[float]]:
+    """
+    Validate a close/volume pair and pad volumes to the close length.
+
+    Accepts lists or 1-D float arrays; arrays pass through uncopied.
+    Raises ``ValueError`` for a short history, or for values that are not
+    finite or exceed ``MAX_ABS_VALUE``.
+    """
+    if len(closes) < MIN_HISTORY:
+        raise ValueError(f"Need at least {MIN_HISTORY} close prices, got {len(closes)}")
+    if not _in_range(closes):
+        raise ValueError(f"'closes' must be finite numbers within ±{MAX_ABS_VALUE:g}")
+    if not _in_range(volumes):
+        raise ValueError(f"'volumes' must be finite numbers within ±{MAX_ABS_VALUE:g}")
+
+    if len(volumes) < len(closes):
+        volumes = list(_as_list(volumes)) + [0.0] * (len(closes) - len(volumes))
+    return closes, volumes
+
+
+def compute_features(
+    closes: List[float],
+    volumes: List[float],
+    price_change_24h: Optional[float] = None,
+    price_change_7d: Optional[float] = None,
+    price_change_30d: Optional[float] = None,
+    volume_mcap_ratio: Optional[float] = None,
+    ath_change_pct: Optional[float] = None,
+    fear_greed_value: float = 50.0,
+    mode: str = "tail",
+) -> Dict[str, float]:
+    """
+    Compute all 38 features from price/volume history.
+
+    Parameters
+    ----------
+    closes : list of daily close prices (oldest -> newest, >=100 points recommended)
+    volumes : list of daily volumes (same length as closes)
+    price_change_24h : optional, % price change in last 24h (computed from closes if None)
+    price_change_7d : optional, % price change in last 7d (computed from closes if None)
+    price_change_30d : optional, % price change in last 30d (computed from closes if None)
+    volume_mcap_ratio : optional, 24h volume / market cap ratio
+    ath_change_pct : optional, % distance from all-time high
+    fear_greed_value : Fear & Greed index (0-100), default 50
+    mode : "tail" (default) runs the single-pass kernel that computes only
+        the last-bar values each feature needs; "full" builds every
+        indicator series first. Both return the same features.
+
+    Returns
+    -------
+    dict with 38 feature keys matching model's expected columns
+    """
+    # The indicator loops run fastest on Python floats; arrays (e.g. views
+    # from the binary wire format) are unpacked once, in C
+    closes = _as_list(closes)
+    volumes = _as_list(volumes)
+
+    if mode == "tail":
+        ind = _kernel_indicators(closes, volumes)
+    elif mode == "full":
+        ind = _full_indicators(closes, volumes)
+    else:
+        raise ValueError(f"Unknown feature mode: {mode!r}")
+
+    return assemble_features(
+        ind,
+        price_change_24h, price_change_7d, price_change_30d,
+        volume_mcap_ratio, ath_change_pct, fear_greed_value,
+    )
+
+
+def feature_row(features: Dict[str, float], columns: Sequence[str] = FEATURE_COLUMNS) -> List[float]:
+    """Order a feature dict into one model input row."""
+    return [features.get(col, 0.0) for col in columns]
+
+
+# ── Feature matrix (every bar at once) ──────────────────────────
+
+
+def compute_feature_matrix(
+    closes: Sequence[float],
+    volumes: Sequence[float],
+    price_change_24h=None,
+    price_change_7d=None,
+    price_change_30d=None,
+    volume_mcap_ratio=None,
+    ath_change_pct=None,
+    fear_greed_value=50.0,
+    columns: Sequence[str] = FEATURE_COLUMNS,
+):
+    """
+    Features for every bar of a history in one vectorized pass.
+
+    Row ``j`` equals ``feature_row(compute_features(closes[:j + 1],
+    volumes[:j + 1], ...), columns)``: each row sees only the bars up to
+    and including its own, exactly as a live call would have. Calling
+    ``compute_features`` on every prefix costs O(n^2); this is O(n).
+
+    Parameters
+    ----------
+    closes, volumes : lists or 1-D arrays, oldest -> newest. Volumes are
+        zero-padded (or truncated) to the close length.
+    price_change_24h, price_change_7d, price_change_30d, volume_mcap_ratio,
+    ath_change_pct, fear_greed_value : as in ``compute_features``; each may
+        also be a per-bar array. None keeps the per-bar fallback.
+    columns : output column order, default ``FEATURE_COLUMNS``
+
+    Returns
+    -------
+    numpy.ndarray of shape (n, len(columns)). Rows shorter than
+    ``MIN_HISTORY`` are included; callers that score only valid histories
+    should slice from ``MIN_HISTORY - 1``.
+
+    Requires NumPy. Recursive indicators come from ``ta_numpy`` and agree
+    with the kernel to about 1e-9 relative; windowed values are exact
+    two-pass computations.
+    """
+    import numpy as np
+
+    ind = _matrix_indicators(np.asarray(closes, dtype=np.float64), volumes)
+    n = len(ind["close"])
+
+    def context(value, fallback):
+        if value is None:
+            return fallback
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = _assemble_matrix(ind)
+    features["price_change_24h"] = context(price_change_24h, features["price_change_24h"])
+    features["price_change_7d"] = context(price_change_7d, features["price_change_7d"])
+    features["price_change_30d"] = context(price_change_30d, features["price_change_30d"])
+    features["volume_mcap_ratio"] = context(volume_mcap_ratio, features["volume_mcap_ratio"])
+    features["ath_change_pct"] = context(ath_change_pct, features["ath_change_pct"])
+    features["fear_greed_value"] = context(fear_greed_value, features["fear_greed_value"])
+
+    zeros = np.zeros(n)
+    return np.column_stack([features.get(col, zeros) for col in columns]) if n else np.empty((0, len(columns)))
+
+
+def _matrix_indicators(closes, volumes):
+    """Per-bar versions of the ``_kernel_indicators`` values, as arrays."""
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    import ta_numpy
+
+    n = len(closes)
+    vols = np.zeros(n)
+    given = np.asarray(volumes, dtype=np.float64)[:n]
+    vols[: len(given)] = given
+
+    def ema(period: int):
+        # A prefix shorter than the period seeds on all it has: the running mean
+        out = ta_numpy.ema_array(closes, period)
+        head = min(period, n)
+        out[:head] = np.cumsum(closes[:head]) / np.arange(1, head + 1)
+        return out
+
+    # MACD is all zeros until the prefix reaches the slow period (26 bars)
+    line, sig, hist = ta_numpy.macd_arrays(closes, 12, 26, 9)
+    line, sig, hist = line.copy(), sig.copy(), hist.copy()
+    prev_hist = np.concatenate(([0.0], hist[:-1])) if n else hist.copy()
+    for arr in (line, sig, hist, prev_hist):
+        arr[:25] = 0.0
+
+    # ATR: Wilder average of |delta|, seeded at bar 14, zero before it
+    atr = np.zeros(n)
+    if n > 14:
+        tr = np.abs(np.diff(closes))
+        seed = float(tr[:14].sum()) / 14
+        atr[14] = seed
+        atr[15:] = ta_numpy._linear_filter(tr[14:], 13.0 / 14, 1.0 / 14, seed)
+
+    # 20-bar SMA/Bollinger (population std), the close itself before bar 19
+    sma_20 = closes.copy()
+    bb_upper = closes.copy()
+    bb_lower = closes.copy()
+    if n >= 20:
+        windows = sliding_window_view(closes, 20)
+        mean = windows.mean(axis=1)
+        std = np.sqrt(((windows - mean[:, None]) ** 2).mean(axis=1))
+        sma_20[19:] = mean
+        bb_upper[19:] = mean + 2.0 * std
+        bb_lower[19:] = mean - 2.0 * std
+    band_width = bb_upper - bb_lower
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bb_pos = np.where(band_width > 0, (closes - bb_lower) / band_width, 0.5)
+
+    returns = np.zeros(n)
+    if n > 1:
+        prev = closes[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[1:] = np.where(prev > 0, (closes[1:] - prev) / prev, 0.0)
+
+    def volatility(period: int):
+        out = np.zeros(n)
+        if n > period:
+            windows = sliding_window_view(returns, period)[1:]
+            mean = windows.mean(axis=1)
+            out[period:] = np.sqrt(((windows - mean[:, None]) ** 2).mean(axis=1))
+        return out
+
+    def momentum(period: int):
+        out = np.zeros(n)
+        if n > period:
+            base = closes[:-period]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[period:] = np.where(base > 0, (closes[period:] / base - 1.0) * 100.0, 0.0)
+        return out
+
+    # Volume over the 20 bars before each bar; support/resistance likewise
+    vol_ratio = np.ones(n)
+    support = closes.copy()
+    resist = closes.copy()
+    if n > 20:
+        ma = sliding_window_view(vols[:-1], 20).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vol_ratio[20:] = np.where(ma > 0, vols[20:] / ma, 1.0)
+        prior = sliding_window_view(closes[:-1], 20)
+        support[20:] = prior.min(axis=1)
+        resist[20:] = prior.max(axis=1)
+
+    return {
+        "close": closes,
+        "rsi_7": ta_numpy.rsi_array(closes, 7),
+        "rsi_14": ta_numpy.rsi_array(closes, 14),
+        "rsi_21": ta_numpy.rsi_array(closes, 21),
+        "macd_line": line,
+        "macd_signal": sig,
+        "macd_hist": hist,
+        "macd_prev_hist": prev_hist,
+        "bb_upper": bb_upper,
+        "bb_mid": sma_20,
+        "bb_lower": bb_lower,
+        "bb_pos": bb_pos,
+        "ema_9": ema(9),
+        "ema_21": ema(21),
+        "ema_50": ema(50),
+        "ema_200": ema(200),
+        "sma_20": sma_20,
+        "vol_ratio": vol_ratio,
+        "vol_spike": (vol_ratio > 2.0).astype(np.float64),
+        "mom_5": momentum(5),
+        "mom_7": momentum(7),
+        "mom_10": momentum(10),
+        "mom_30": momentum(30),
+        "roc_14": momentum(14),
+        "atr_14": atr,
+        "vol_10": volatility(10),
+        "vol_30": volatility(30),
+        "support": support,
+        "resist": resist,
+    }
+
+
+def _assemble_matrix(ind):
+    """``ta_utils.assemble_features`` over whole columns (fallback context)."""
+    import numpy as np
+
+    close_i = ind["close"]
+    where = np.where
+
+    prev_diff = ind["macd_prev_hist"]
+    curr_diff = ind["macd_line"] - ind["macd_signal"]
+    macd_cross = where((prev_diff <= 0) & (curr_diff > 0), 1.0,
+                       where((prev_diff >= 0) & (curr_diff < 0), -1.0, 0.0))
+
+    bb_mid = ind["bb_mid"]
+    bb_width_val = where(bb_mid > 0, (ind["bb_upper"] - ind["bb_lower"]) / bb_mid, 0.0)
+
+    ema_50 = ind["ema_50"]
+    ema_200 = ind["ema_200"]
+    sma_20 = ind["sma_20"]
+
+    support = ind["support"]
+    dist_support = where(support > 0, (close_i - support) / support * 100, 0.0)
+    dist_resist = where(close_i > 0, (ind["resist"] - close_i) / close_i * 100, 0.0)
+
+    mom_5 = ind["mom_5"]
+    rsi_7, rsi_14, rsi_21 = ind["rsi_7"], ind["rsi_14"], ind["rsi_21"]
+    rsi_avg = (rsi_7 + rsi_14 + rsi_21) / 3.0
+
+    close = where(close_i > 0, close_i, 1.0)
+    vol_10 = ind["vol_10"]
+    vol_30 = ind["vol_30"]
+    v10 = where(vol_10 > 0, vol_10, 1e-9)
+    v30 = where(vol_30 > 0, vol_30, 1e-9)
+
+    trend_enc = where((ema_50 > ema_200) & (close_i > ema_50), 1.0,
+                      where((ema_50 < ema_200) & (close_i < ema_50), -1.0, 0.0))
+    n = len(close_i)
+
+    return {
+        "rsi_7": rsi_7,
+        "rsi_14": rsi_14,
+        "rsi_21": rsi_21,
+        "macd_line": ind["macd_line"],
+        "macd_signal": ind["macd_signal"],
+        "macd_histogram": ind["macd_hist"],
+        "macd_crossover": macd_cross,
+        "bb_width": bb_width_val,
+        "bb_position": ind["bb_pos"],
+        "ema_9_21_cross": (ind["ema_9"] > ind["ema_21"]).astype(np.float64),
+        "ema_50_200_cross": (ema_50 > ema_200).astype(np.float64),
+        "price_above_ema200": (close_i > ema_200).astype(np.float64),
+        "volume_ratio": ind["vol_ratio"],
+        "volume_spike": ind["vol_spike"],
+        "price_momentum_5d": mom_5,
+        "price_momentum_10d": ind["mom_10"],
+        "price_momentum_30d": ind["mom_30"],
+        "rate_of_change_14": ind["roc_14"],
+        "atr_14": ind["atr_14"],
+        "volatility_10d": vol_10,
+        "volatility_30d": vol_30,
+        "dist_to_support_pct": dist_support,
+        "dist_to_resist_pct": dist_resist,
+        "price_change_24h": mom_5 / 5.0,
+        "price_change_7d": ind["mom_7"],
+        "price_change_30d": ind["mom_30"],
+        "volume_mcap_ratio": ind["vol_ratio"] * 0.02,
+        "ath_change_pct": np.full(n, -50.0),
+        "rsi_14_ma_diff": rsi_14 - rsi_avg,
+        "rsi_oversold": (rsi_14 < 30).astype(np.float64),
+        "rsi_overbought": (rsi_14 > 70).astype(np.float64),
+        "price_vs_sma20_pct": where(sma_20 > 0, (close - sma_20) / sma_20 * 100, 0.0),
+        "price_vs_ema50_pct": where(ema_50 > 0, (close - ema_50) / ema_50 * 100, 0.0),
+        "price_vs_ema200_pct": where(ema_200 > 0, (close - ema_200) / ema_200 * 100, 0.0),
+        "vol_ratio_10_30": v10 / v30,
+        "momentum_accel": mom_5 - ind["mom_10"],
+        "fear_greed_value": np.full(n, 50.0),
+        "trend_encoded": trend_enc,
+    }
@@ -0,0 +1,62 @@
+"""
+Gunicorn Deployment Profile
+============================
+Run: gunicorn -c gunicorn.conf.py app:app
+
+The app (and with it every model) is loaded once in the master before the
+workers fork, so workers share the model pages copy-on-write instead of each
+holding and loading its own copy.
+
+Sizing scales with the cores this process may use:
+  workers  - WEB_CONCURRENCY, default one per core (inference is CPU-bound)
+  threads  - GUNICORN_THREADS, default 2 (overlaps request I/O with scoring)
+  nthread  - XGB_NTHREAD, default cores // workers, so workers x nthread
+             never exceeds the core count
+
+Each worker keeps its own prediction cache (PREDICTION_CACHE_SIZE) and its
+own model registry; MODEL_WATCH_INTERVAL makes every worker reload new
+model files on its own.
+"""
+
+import gc
+import os
+
+
+def _available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+cores = _available_cores()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", cores))
+threads = int(os.environ.get("GUNICORN_THREADS", 2))
+worker_class = "gthread" if threads > 1 else "sync"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+xgb_nthread = int(os.environ.get("XGB_NTHREAD", max(1, cores // workers)))
+
+# OpenMP reads this when xgboost first starts its thread pool; setting it
+# before the app is preloaded keeps the master and all workers in budget.
+os.environ.setdefault("OMP_NUM_THREADS", str(xgb_nthread))
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (models, metadata) into the permanent
+    # generation: the collector then never writes to those pages, so they
+    # stay shared with the master after fork.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import MODEL_WATCH_INTERVAL, registry
+
+    registry.set_nthread(xgb_nthread)
+    server.log.info("Worker %s: xgboost nthread=%d", worker.pid, xgb_nthread)
+    # Threads do not survive fork, so each worker starts its own watcher
+    if MODEL_WATCH_INTERVAL > 0:
+        registry.watch(MODEL_WATCH_INTERVAL)
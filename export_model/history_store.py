@@ -0,0 +1,327 @@
+"""
+Memory-Mapped History Store
+============================
+Keeps daily OHLCV bars for many tokens on local disk so the service can
+score a token without the client uploading its history.
+
+Layout (one directory):
+    timestamp[.N].i64             bar open time, epoch seconds
+    open/high/low/close/volume[.N].f64
+                                  one float64 column file each
+    index.json                    token -> {offset, length, capacity},
+                                  plus the generation N of the columns
+
+Every token owns a contiguous block of rows in each column. Appends fill
+the block in place. A full block moves to the end of the files with
+double the capacity. ``window()`` therefore returns plain ``np.memmap``
+slices: zero-copy views that go straight into the feature engine.
+``compact()`` writes a new generation of column files without abandoned
+blocks and only then swaps the index, so a crash part-way leaves the old
+index pointing at the old, intact files.
+
+Writes are serialized with a lock file (``flock``), so several gunicorn
+workers can share one store. Readers notice other processes' appends via
+the index file's mtime.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: in-process locking only
+    fcntl = None
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+INDEX_NAME = "index.json"
+
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_.:\-]{1,128}$")
+
+
+class HistoryStore:
+    """
+    Columnar daily-bar store backed by memory-mapped files.
+
+    Parameters
+    ----------
+    root : str or Path
+        Store directory; created if missing.
+    initial_capacity : int
+        Rows reserved for a new token's first block.
+    """
+
+    def __init__(self, root, initial_capacity: int = 512):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[str, int]] = {}
+        self._rows = 0
+        self._generation = 0
+        self._index_mtime = None
+        self._maps: Dict[str, np.memmap] = {}
+        self._mapped = None
+        self._load_index()
+
+    # ── Files ───────────────────────────────────────────────────
+
+    def _column_path(self, name: str, generation: Optional[int] = None) -> Path:
+        """Column file of ``generation`` (the current one by default)."""
+        if generation is None:
+            generation = self._generation
+        suffix = "i64" if name == "timestamp" else "f64"
+        # Generation 0 keeps the unversioned names of stores written before compact()
+        stem = name if generation == 0 else f"{name}.{generation}"
+        return self.root / f"{stem}.{suffix}"
+
+    @staticmethod
+    def _dtype(name: str):
+        return np.dtype("<i8") if name == "timestamp" else np.dtype("<f8")
+
+    def _load_index(self) -> None:
+        path = self.root / INDEX_NAME
+        if not path.exists():
+            self._index, self._rows, self._generation, self._index_mtime = {}, 0, 0, None
+            return
+        stat = path.stat()
+        mtime = (stat.st_mtime_ns, stat.st_size)
+        if mtime == self._index_mtime:
+            return
+        with open(path) as f:
+            data = json.load(f)
+        self._index = data["tokens"]
+        self._rows = data["rows"]
+        self._generation = data["generation"]
+        self._index_mtime = mtime
+
+    def _save_index(self) -> None:
+        path = self.root / INDEX_NAME
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"rows": self._rows, "generation": self._generation, "tokens": self._index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        stat = path.stat()
+        self._index_mtime = (stat.st_mtime_ns, stat.st_size)
+
+    def _columns(self) -> Dict[str, np.memmap]:
+        """Maps of every column covering all ``self._rows`` rows."""
+        # Remap after growth, or after compact() replaced the files
+        if self._mapped != (self._rows, self._generation):
+            self._maps = {}
+            if self._rows:
+                try:
+                    self._map_columns()
+                except FileNotFoundError:
+                    # Another process compacted between our index read and
+                    # the mapping; its index names the files that exist now
+                    self._load_index()
+                    self._map_columns()
+            self._mapped = (self._rows, self._generation)
+        return self._maps
+
+    def _map_columns(self) -> None:
+        self._maps = {
+            name: np.memmap(
+                self._column_path(name), dtype=self._dtype(name),
+                mode="r+", shape=(self._rows,),
+            )
+            for name in ("timestamp",) + PRICE_COLUMNS
+        }
+
+    def _grow(self, rows: int) -> None:
+        """Extend every column file to ``rows`` rows."""
+        for name in ("timestamp",) + PRICE_COLUMNS:
+            path = self._column_path(name)
+            with open(path, "ab") as f:
+                f.truncate(rows * self._dtype(name).itemsize)
+        self._rows = rows
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ── Reads ───────────────────────────────────────────────────
+
+    def refresh(self) -> None:
+        """Pick up appends made by other processes."""
+        with self._lock:
+            self._load_index()
+
+    def tokens(self) -> List[str]:
+        self.refresh()
+        return sorted(self._index)
+
+    def __contains__(self, token: str) -> bool:
+        self.refresh()
+        return token in self._index
+
+    def length(self, token: str) -> int:
+        self.refresh()
+        entry = self._index.get(token)
+        return entry["length"] if entry else 0
+
+    def window(self, token: str, bars: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        The last ``bars`` bars of ``token`` (all if None) as column views.
+
+        Returns a dict with ``timestamp`` and every OHLCV column. The arrays
+        are slices of the memory maps, not copies; treat them as read-only.
+        Raises ``KeyError`` for an unknown token.
+        """
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(token)
+            if entry is None:
+                raise KeyError(token)
+            columns = self._columns()
+            stop = entry["offset"] + entry["length"]
+            start = entry["offset"] if bars is None else max(entry["offset"], stop - bars)
+            return {name: col[start:stop] for name, col in columns.items()}
+
+    # ── Writes ──────────────────────────────────────────────────
+
+    def append(
+        self,
+        token: str,
+        timestamps: Sequence[int],
+        close: Sequence[float],
+        volume: Optional[Sequence[float]] = None,
+        open: Optional[Sequence[float]] = None,
+        high: Optional[Sequence[float]] = None,
+        low: Optional[Sequence[float]] = None,
+    ) -> int:
+        """
+        Add bars for ``token`` and return its new length.
+
+        Bars must be in time order. A bar whose timestamp equals the stored
+        last bar replaces it (the current day's candle updating); older bars
+        are rejected. ``open``/``high``/``low`` default to ``close`` and
+        ``volume`` to 0.
+
+        Raises ``ValueError`` on a bad token, ragged columns or out-of-order
+        timestamps.
+        """
+        if not _TOKEN_RE.match(token):
+            raise ValueError(f"Invalid token id: {token!r}")
+
+        ts = np.asarray(timestamps, dtype=np.int64)
+        new = {"close": np.asarray(close, dtype=np.float64)}
+        new["volume"] = np.zeros(len(ts)) if volume is None else np.asarray(volume, dtype=np.float64)
+        for name, values in (("open", open), ("high", high), ("low", low)):
+            new[name] = new["close"] if values is None else np.asarray(values, dtype=np.float64)
+        if ts.ndim != 1 or any(v.shape != ts.shape for v in new.values()):
+            raise ValueError("timestamps and every bar column must be 1-D and the same length")
+        if len(ts) == 0:
+            return self.length(token)
+        if np.any(np.diff(ts) <= 0):
+            raise ValueError("timestamps must be strictly increasing")
+
+        with self._write_lock():
+            self._load_index()
+            entry = self._index.get(token)
+            if entry is None:
+                entry = self._allocate(token, max(self.initial_capacity, len(ts)))
+
+            columns = self._columns()
+            if entry["length"]:
+                last_ts = int(columns["timestamp"][entry["offset"] + entry["length"] - 1])
+                if ts[0] < last_ts:
+                    raise ValueError(
+                        f"Bar at {int(ts[0])} is older than the last stored bar ({last_ts})"
+                    )
+                if ts[0] == last_ts:
+                    entry["length"] -= 1  # replace the still-forming bar
+
+            needed = entry["length"] + len(ts)
+            if needed > entry["capacity"]:
+                entry = self._relocate(token, max(needed, 2 * entry["capacity"]))
+                columns = self._columns()
+
+            start = entry["offset"] + entry["length"]
+            stop = start + len(ts)
+            columns["timestamp"][start:stop] = ts
+            for name in PRICE_COLUMNS:
+                columns[name][start:stop] = new[name]
+            for col in columns.values():
+                col.flush()
+
+            entry["length"] = needed
+            self._save_index()
+            return needed
+
+    def _allocate(self, token: str, capacity: int) -> Dict[str, int]:
+        entry = {"offset": self._rows, "length": 0, "capacity": capacity}
+        self._grow(self._rows + capacity)
+        self._index[token] = entry
+        return entry
+
+    def _relocate(self, token: str, capacity: int) -> Dict[str, int]:
+        old = self._index[token]
+        old_cols = self._columns()
+        kept = {
+            name: np.array(col[old["offset"]: old["offset"] + old["length"]])
+            for name, col in old_cols.items()
+        }
+        entry = self._allocate(token, capacity)
+        columns = self._columns()
+        for name, values in kept.items():
+            columns[name][entry["offset"]: entry["offset"] + len(values)] = values
+        entry["length"] = old["length"]
+        return entry
+
+    def compact(self) -> None:
+        """Rewrite the columns without blocks abandoned by relocation."""
+        with self._write_lock():
+            self._load_index()
+            columns = self._columns()
+            kept = {name: [] for name in ("timestamp",) + PRICE_COLUMNS}
+            index: Dict[str, Dict[str, int]] = {}
+            offset = 0
+            for token in sorted(self._index):
+                entry = self._index[token]
+                capacity = max(self.initial_capacity, entry["length"])
+                for name, col in columns.items():
+                    block = np.zeros(capacity, dtype=self._dtype(name))
+                    block[: entry["length"]] = col[entry["offset"]: entry["offset"] + entry["length"]]
+                    kept[name].append(block)
+                index[token] = {"offset": offset, "length": entry["length"], "capacity": capacity}
+                offset += capacity
+
+            # Write the complete new generation first. Until the index is
+            # replaced it names the old files, which stay untouched.
+            old_generation = self._generation
+            new_generation = old_generation + 1
+            for name, blocks in kept.items():
+                data = np.concatenate(blocks) if blocks else np.empty(0, self._dtype(name))
+                with open(self._column_path(name, new_generation), "wb") as f:
+                    data.astype(self._dtype(name)).tofile(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            self._index, self._rows = index, offset
+            self._generation = new_generation
+            self._save_index()
+
+            # Open maps of the old files stay valid after the unlink
+            for name in kept:
+                self._column_path(name, old_generation).unlink(missing_ok=True)
@@ -0,0 +1,258 @@
+"""
+Service Metrics (Prometheus text format)
+=========================================
+Minimal in-process counters, gauges and histograms with a text exposition
+for ``GET /metrics``. No client library needed: each observation is a
+bisect plus a locked add, a few microseconds on the hot path.
+
+Shared instruments:
+    quantara_stage_seconds{stage}           parse, features, model_24h,
+                                            model_7d, model_dir, serialize
+    quantara_requests_total{route,status}   HTTP requests served
+    quantara_request_seconds{route}         end-to-end handler time
+    quantara_input_bars                     bars per scored series
+    quantara_model_info{version,format}     1 for the active model set, 0 for
+                                            loaded standby versions
+
+Values are per process; with several gunicorn workers each scrape sees
+the worker that answered it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets (seconds): 50 us .. 10 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# History lengths clients typically send
+BARS_BUCKETS = (50, 100, 200, 365, 500, 1000, 2000, 5000, 10000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_str(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        family = self._family()
+        lines = [f"# HELP {family} {self.help}", f"# TYPE {family} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _family(self) -> str:
+        return self.name
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count, exposed as ``<name>_total``."""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _family(self) -> str:
+        # Text format 0.0.4 wants TYPE on the sample name itself
+        return f"{self.name}_total"
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{self._label_str(key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Point-in-time value."""
+
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._label_str(key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram with cumulative ``_bucket``/``_sum``/``_count``."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, buckets: Sequence[float], labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.buckets = sorted(buckets)
+        # key -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> Dict[str, Any]:
+        """JSON-friendly view of one label set, with cumulative buckets."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            counts, total, count = (
+                (list(series[0]), series[1], series[2]) if series
+                else ([0] * (len(self.buckets) + 1), 0.0, 0)
+            )
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets + [math.inf], counts):
+            running += n
+            cumulative.append([_format_value(bound) if bound == math.inf else bound, running])
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "buckets": cumulative,
+        }
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            running = 0
+            for bound, n in zip(self.buckets + [math.inf], counts):
+                running += n
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{self._label_str(key, le)} {running}"
+            yield f"{self.name}_sum{self._label_str(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._label_str(key)} {count}"
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class timer:
+    """
+    ``with timer(STAGE_SECONDS, stage="features"):`` observes the block's
+    wall time in seconds.
+    """
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, **labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+# ── Shared instruments ──────────────────────────────────────────
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "quantara_stage_seconds", "Time spent per request stage.", LATENCY_BUCKETS, ("stage",),
+))
+REQUESTS = REGISTRY.register(Counter(
+    "quantara_requests", "HTTP requests served, by route and status.", ("route", "status"),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "quantara_request_seconds", "End-to-end handler time.", LATENCY_BUCKETS, ("route",),
+))
+INPUT_BARS = REGISTRY.register(Histogram(
+    "quantara_input_bars", "Bars of history per scored series.", BARS_BUCKETS,
+))
+MODEL_INFO = REGISTRY.register(Gauge(
+    "quantara_model_info", "Loaded model sets (1 = active, 0 = standby).",
+    ("version", "format"),
+))
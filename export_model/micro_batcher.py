@@ -0,0 +1,193 @@
+"""
+Micro-Batching Queue
+=====================
+Collects concurrent single-item requests for up to ``max_batch`` items or
+``max_wait_ms`` milliseconds, whichever comes first, runs one batched call
+in a thread pool and hands every caller its own result. If the batched
+call raises, its items are rerun one at a time so the error only reaches
+the caller whose item caused it.
+
+Used by ``asgi_app.py``: under bursty feed refreshes many ``/predict`` calls
+arrive together, and one ``predict_batch`` over all of them costs far less
+than one model call per request. ``max_wait_ms`` caps the extra latency a
+request can pick up while its batch fills.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from metrics import Histogram
+
+# Powers of two up to the largest batch we expect
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    """
+    Async front end that turns single submissions into batched calls.
+
+    Parameters
+    ----------
+    fn : callable
+        Batch function taking a list of items and returning a list of results
+        aligned with it (e.g. ``NexYpherPredictor.predict_batch``). Runs in
+        ``executor``.
+    executor : concurrent.futures.Executor
+        Pool the batch function runs in, keeping the event loop free.
+    max_batch : int
+        Dispatch as soon as this many items are queued.
+    max_wait_ms : float
+        Dispatch a partial batch this long after its first item arrived.
+    max_inflight : int
+        Batches allowed to run at once (normally the pool size).
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        executor: Executor,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+        max_inflight: int = 1,
+    ):
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {max_batch}")
+        self.fn = fn
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_inflight = max_inflight
+
+        self.batch_sizes = Histogram(
+            "quantara_batch_size", "Items per dispatched batch.", SIZE_BUCKETS,
+        )
+        self.queue_depths = Histogram(
+            "quantara_queue_depth", "Queued items seen on submit.", (0,) + SIZE_BUCKETS,
+        )
+        self.batches = 0
+        self.items = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        # The loop only holds weak references to tasks; keep in-flight
+        # dispatches alive until they finish
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the collector on the running loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self) -> None:
+        """
+        Stop collecting: queued items fail with ``RuntimeError`` and batches
+        already dispatched run to completion.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                _fail(future, RuntimeError("batcher stopped"))
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        self.start()
+        self.queue_depths.observe(self._queue.qsize())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch: List[tuple] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    # Take whatever is already queued without waiting
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._slots.acquire()
+                task = loop.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # A batch still being collected never reaches a dispatch
+            for _, future in batch:
+                _fail(future, RuntimeError("batcher stopped"))
+            raise
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        self.batch_sizes.observe(len(items))
+        self.batches += 1
+        self.items += len(items)
+        try:
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, items)
+                outcomes = [(True, result) for result in results]
+            except Exception as e:
+                if len(items) == 1:
+                    outcomes = [(False, e)]
+                else:
+                    # Rerun the items alone so only the one that raised fails
+                    outcomes = await loop.run_in_executor(self.executor, self._one_by_one, items)
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                if not ok:
+                    _fail(future, value)
+                elif not future.done():
+                    future.set_result(value)
+        finally:
+            self._slots.release()
+
+    def _one_by_one(self, items: List[Any]) -> List[tuple]:
+        """``(ok, result or exception)`` per item, each from its own call."""
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((True, self.fn([item])[0]))
+            except Exception as e:
+                outcomes.append((False, e))
+        return outcomes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth": self.queue_depths.snapshot(),
+        }
+
+
+def _fail(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
@@ -0,0 +1,313 @@
+"""
+Model Registry with Hot Reload
+===============================
+Holds several loaded model versions and swaps the active one without a
+restart. A new version is loaded and warmed in the background, then swapped
+in with one assignment; requests already running finish on the version they
+started with. The previous version stays loaded for rollback and for
+requests that pin it with ``model_version``.
+
+Versions on disk:
+    models/                       the default set (``*_latest`` files)
+    models/<anything>/            further sets, each with its own
+                                  model_metadata.json and model files
+
+A version is named by the ``version`` field of its model_metadata.json.
+
+Reloads are triggered by ``reload()``/``reload_async()`` (the app exposes
+them as ``POST /models/reload``) or by ``watch()``, which polls every
+model_metadata.json mtime. Under gunicorn each worker owns its registry:
+start the watcher in every worker (``MODEL_WATCH_INTERVAL``) so all of
+them pick up a deploy, since a reload route only reaches the worker that
+served it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import feature_engine
+import metrics
+from predictor import NexYpherPredictor
+
+logger = logging.getLogger(__name__)
+
+METADATA_NAME = "model_metadata.json"
+
+# Warm-up traffic: enough to touch every model and allocate scratch buffers
+_WARM_BARS = 365
+_WARM_SERIES = 8
+
+
+class ModelRegistry:
+    """
+    Loaded model versions with one active version.
+
+    Parameters
+    ----------
+    models_dir : str or Path, optional
+        Root models directory; defaults to ./models/ next to this file.
+    keep : int
+        Versions kept in memory, the active one included (default 2:
+        active plus one for rollback).
+    **predictor_kwargs
+        Passed to every ``NexYpherPredictor`` (``model_format``,
+        ``cache_size``, ``cache_ttl``, ``feature_cache_size``,
+        ``feature_cache_ttl``).
+    """
+
+    def __init__(self, models_dir=None, keep: int = 2, **predictor_kwargs):
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.models_dir = Path(models_dir) if models_dir else Path(__file__).parent / "models"
+        self.keep = keep
+        self.predictor_kwargs = predictor_kwargs
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._versions: "OrderedDict[str, NexYpherPredictor]" = OrderedDict()
+        self._active: Optional[NexYpherPredictor] = None
+        self._nthread: Optional[int] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_reload: Optional[Dict[str, Any]] = None
+
+        self.reload()
+
+    # ── Lookup ──────────────────────────────────────────────────
+
+    @property
+    def active(self) -> NexYpherPredictor:
+        return self._active
+
+    def get(self, version: Optional[str] = None) -> NexYpherPredictor:
+        """
+        The predictor for ``version``, or the active one when None.
+
+        Raises ``ValueError`` for a version that is not loaded.
+        """
+        if version is None:
+            return self._active
+        predictor = self._versions.get(str(version))
+        if predictor is None:
+            raise ValueError(
+                f"Model version not loaded: {version} (loaded: {', '.join(self.versions())})"
+            )
+        return predictor
+
+    def versions(self) -> List[str]:
+        with self._lock:
+            return list(self._versions)
+
+    def available(self) -> Dict[str, Path]:
+        """Versions on disk: metadata version -> directory."""
+        found = {}
+        if not self.models_dir.is_dir():
+            return found
+        subdirs = sorted(p for p in self.models_dir.iterdir() if p.is_dir())
+        for directory in [self.models_dir] + subdirs:
+            meta_path = directory / METADATA_NAME
+            if not meta_path.exists():
+                continue
+            try:
+                with open(meta_path) as f:
+                    version = str(json.load(f).get("version", directory.name))
+            except (OSError, ValueError):
+                continue
+            found.setdefault(version, directory)
+        return found
+
+    # ── Loading ─────────────────────────────────────────────────
+
+    def reload(self, version: Optional[str] = None, activate: bool = True) -> str:
+        """
+        Load, warm and (by default) activate a version; returns its name.
+
+        ``version`` None loads the default set in ``models_dir`` itself.
+        Loading a version that is already in memory reloads it from disk.
+        Runs in the calling thread; see ``reload_async``.
+
+        Raises ``ValueError`` for ``activate=False`` when ``keep`` is 1:
+        there is no room for a standby version next to the active one.
+        """
+        self._check_standby(activate)
+        with self._reload_lock:
+            if version is None:
+                directory = self.models_dir
+            else:
+                directory = self.available().get(str(version))
+                if directory is None:
+                    raise ValueError(f"Model version not found in {self.models_dir}: {version}")
+
+            t0 = time.perf_counter()
+            predictor = NexYpherPredictor(directory, **self.predictor_kwargs)
+            if self._nthread is not None:
+                predictor.set_nthread(self._nthread)
+            _warm(predictor)
+            name = str(predictor.metadata.get("version", "unknown"))
+
+            with self._lock:
+                replaced = self._versions.pop(name, None)
+                self._versions[name] = predictor
+                if activate or self._active is None or self._active is replaced:
+                    self._active = predictor
+                evicted = self._evict()
+            self._publish()
+
+            for old in evicted + ([replaced] if replaced is not None else []):
+                if old is not self._active:
+                    old.close()
+
+            self.last_reload = {
+                "version": name,
+                "seconds": round(time.perf_counter() - t0, 3),
+                "at": int(time.time()),
+                "error": None,
+            }
+            logger.info("Model %s loaded and warmed in %.2fs", name, self.last_reload["seconds"])
+            return name
+
+    def reload_async(self, version: Optional[str] = None, activate: bool = True) -> threading.Thread:
+        """
+        ``reload`` in a background thread; failures land in ``last_reload``.
+
+        Invalid arguments raise ``ValueError`` here, before the thread starts.
+        """
+        self._check_standby(activate)
+
+        def run():
+            try:
+                self.reload(version, activate)
+            except Exception as e:
+                logger.exception("Model reload failed")
+                self.last_reload = {"version": version, "at": int(time.time()), "error": str(e)}
+
+        thread = threading.Thread(target=run, name="model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def _check_standby(self, activate: bool) -> None:
+        if not activate and self.keep == 1 and self._active is not None:
+            raise ValueError(
+                "Cannot load a standby version with keep=1; activate it or raise MODEL_KEEP"
+            )
+
+    def activate(self, version: str) -> None:
+        """Make a loaded version active (e.g. roll back)."""
+        predictor = self.get(version)
+        with self._lock:
+            self._active = predictor
+            self._versions.move_to_end(str(version))
+        self._publish()
+
+    def _evict(self) -> List[NexYpherPredictor]:
+        """Drop the least recently loaded versions beyond ``keep``."""
+        evicted = []
+        for name in list(self._versions):
+            if len(self._versions) <= self.keep:
+                break
+            if self._versions[name] is not self._active:
+                evicted.append(self._versions.pop(name))
+        return evicted
+
+    def _publish(self) -> None:
+        with self._lock:
+            loaded = [(name, p) for name, p in self._versions.items()]
+            active = self._active
+        metrics.MODEL_INFO.clear()
+        for name, predictor in loaded:
+            metrics.MODEL_INFO.set(
+                1 if predictor is active else 0, version=name, format=predictor.model_format,
+            )
+
+    def set_nthread(self, nthread: int) -> None:
+        """``NexYpherPredictor.set_nthread`` for every loaded and future version."""
+        self._nthread = nthread
+        with self._lock:
+            loaded = list(self._versions.values())
+        for predictor in loaded:
+            predictor.set_nthread(nthread)
+
+    # ── Watching ────────────────────────────────────────────────
+
+    def _stamp(self) -> Dict[str, int]:
+        stamps = {}
+        for directory in self.available().values():
+            try:
+                stamps[str(directory)] = (directory / METADATA_NAME).stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return stamps
+
+    def watch(self, interval: float = 30.0) -> None:
+        """
+        Reload the default set whenever a model_metadata.json changes.
+
+        Polls every ``interval`` seconds in a daemon thread. Write the model
+        files first and the metadata last so a reload never sees a half
+        copied set. Idempotent; ``stop()`` ends it.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        seen = self._stamp()
+
+        def run():
+            nonlocal seen
+            while not self._stop.wait(interval):
+                current = self._stamp()
+                if current != seen:
+                    seen = current
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        logger.exception("Model reload failed")
+                        self.last_reload = {"version": None, "at": int(time.time()), "error": str(e)}
+
+        self._watcher = threading.Thread(target=run, name="model-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = list(self._versions)
+            active = self._active
+        return {
+            "active": active.metadata.get("version") if active is not None else None,
+            "loaded": loaded,
+            "available": sorted(self.available()),
+            "last_reload": self.last_reload,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+
+def _warm(predictor: NexYpherPredictor) -> None:
+    """
+    Score a few synthetic series so the first real request pays no warm-up
+    cost.
+
+    Goes straight to the feature functions and the models. The prediction
+    cache, the feature cache and the metrics never see the synthetic
+    traffic.
+    """
+    rng = np.random.default_rng(0)
+    rows = []
+    for _ in range(_WARM_SERIES):
+        closes = (100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, _WARM_BARS)))).tolist()
+        volumes = rng.uniform(1e6, 1e7, _WARM_BARS).tolist()
+        features = feature_engine.compute_features(closes, volumes)
+        rows.append(feature_engine.feature_row(features, predictor.feature_columns))
+    matrix = feature_engine.compute_feature_matrix(closes, volumes, columns=predictor.feature_columns)
+    for model in (predictor.model_24h, predictor.model_7d, predictor.model_dir):
+        model.predict_proba(rows[:1])
+        model.predict_proba(rows)
+        model.predict_proba(matrix)
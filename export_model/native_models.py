@@ -0,0 +1,154 @@
+"""
+Native XGBoost Model Format
+============================
+Converts the pickled sklearn-wrapped models to XGBoost's own booster format
+(UBJSON by default, JSON optional) and loads them back with
+``xgboost.Booster`` alone, so serving never imports scikit-learn or joblib.
+
+Export (once per model release, next to the .pkl files):
+    python native_models.py [--models-dir ./models] [--format ubj|json]
+
+``--if-present`` skips the export (exit 0) when a .pkl is missing, so a
+build step never fails on an incomplete model directory; serving then
+falls back to whatever files are there.
+
+The loader returns objects with the same ``predict_proba`` / ``classes_``
+surface the predictor already uses, so either format plugs in unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+MANIFEST_NAME = "native_manifest.json"
+
+# Predictor attribute -> model file stem
+MODEL_STEMS = {
+    "model_24h": "model_24h_1d_latest",
+    "model_7d": "model_7d_1d_latest",
+    "model_dir": "model_dir_1d_latest",
+}
+LABEL_ENCODER_STEM = "label_encoder_latest"
+
+
+class NativeClassifier:
+    """``predict_proba`` over a bare ``xgboost.Booster``."""
+
+    def __init__(self, booster, n_classes: int):
+        self.booster = booster
+        self.n_classes = n_classes
+
+    def set_nthread(self, nthread: int) -> None:
+        self.booster.set_param({"nthread": nthread})
+
+    def predict_proba(self, X):
+        import numpy as np
+
+        probs = self.booster.inplace_predict(np.asarray(X, dtype=np.float64))
+        if self.n_classes <= 2:
+            probs = probs.reshape(-1)
+            return np.column_stack([1.0 - probs, probs])
+        return probs.reshape(-1, self.n_classes)
+
+
+class NativeLabelEncoder:
+    """Stand-in for the sklearn LabelEncoder: only ``classes_`` is used."""
+
+    def __init__(self, classes):
+        import numpy as np
+
+        self.classes_ = np.asarray(classes)
+
+
+def has_native(models_dir: Path) -> bool:
+    """True if ``models_dir`` holds an exported native model set."""
+    return (Path(models_dir) / MANIFEST_NAME).exists()
+
+
+def missing_pickles(models_dir: Path) -> List[Path]:
+    """The .pkl files of a full model set that ``models_dir`` lacks."""
+    stems = list(MODEL_STEMS.values()) + [LABEL_ENCODER_STEM]
+    paths = [Path(models_dir) / f"{stem}.pkl" for stem in stems]
+    return [path for path in paths if not path.exists()]
+
+
+def export_native(models_dir: Path, fmt: str = "ubj") -> Path:
+    """Convert the .pkl models in ``models_dir`` to native boosters."""
+    import joblib
+
+    if fmt not in ("ubj", "json"):
+        raise ValueError(f"Unsupported format: {fmt!r} (use 'ubj' or 'json')")
+
+    models_dir = Path(models_dir)
+    missing = missing_pickles(models_dir)
+    if missing:
+        # Checked up front so a failed export leaves no partial set behind
+        raise FileNotFoundError(f"Model file missing: {missing[0]}")
+    manifest: Dict[str, Any] = {"format": fmt, "models": {}}
+
+    for name, stem in MODEL_STEMS.items():
+        src = models_dir / f"{stem}.pkl"
+        model = joblib.load(src)
+        dst = models_dir / f"{stem}.{fmt}"
+        model.get_booster().save_model(str(dst))
+        manifest["models"][name] = {
+            "path": dst.name,
+            "n_classes": int(getattr(model, "n_classes_", 2)),
+        }
+
+    label_encoder = joblib.load(models_dir / f"{LABEL_ENCODER_STEM}.pkl")
+    manifest["label_classes"] = [str(c) for c in label_encoder.classes_]
+
+    manifest_path = models_dir / MANIFEST_NAME
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def load_native(models_dir: Path) -> Dict[str, Any]:
+    """
+    Load an exported model set with ``xgboost.Booster`` only.
+
+    Returns a dict with ``model_24h``, ``model_7d``, ``model_dir`` and
+    ``label_encoder`` entries, matching the pickle loader.
+    """
+    import xgboost
+
+    models_dir = Path(models_dir)
+    with open(models_dir / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+
+    loaded: Dict[str, Any] = {}
+    for name, entry in manifest["models"].items():
+        path = models_dir / entry["path"]
+        if not path.exists():
+            raise FileNotFoundError(f"Model file missing: {path}")
+        booster = xgboost.Booster(model_file=str(path))
+        loaded[name] = NativeClassifier(booster, entry["n_classes"])
+
+    loaded["label_encoder"] = NativeLabelEncoder(manifest["label_classes"])
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export .pkl models to native XGBoost format")
+    parser.add_argument("--models-dir", default=str(Path(__file__).parent / "models"))
+    parser.add_argument("--format", choices=["ubj", "json"], default="ubj")
+    parser.add_argument("--if-present", action="store_true",
+                        help="skip instead of failing when a .pkl is missing")
+    args = parser.parse_args()
+
+    missing = missing_pickles(Path(args.models_dir))
+    if missing and args.if_present:
+        print(f"Skipping native export; missing: {', '.join(p.name for p in missing)}")
+        return
+
+    manifest_path = export_native(Path(args.models_dir), args.format)
+    print(f"Native models written; manifest at {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
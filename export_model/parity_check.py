@@ -0,0 +1,94 @@
+"""
+Parity check: Flask predictor vs Vercel function
+================================================
+Runs ``NexYpherPredictor.predict`` and ``frontend/api/predict.py``'s
+``_predict`` on the same synthetic fixtures and reports any field that
+differs. Both entry points share ``feature_engine``, so any difference
+means one of them has drifted.
+
+Run: python parity_check.py [--models-dir ./models] [--cases 50]
+Exits non-zero on mismatch.
+"""
+
+import argparse
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+from predictor import NexYpherPredictor
+
+VERCEL_FUNCTION = Path(__file__).resolve().parent.parent / "frontend" / "api" / "predict.py"
+
+
+def load_vercel_function():
+    spec = importlib.util.spec_from_file_location("vercel_predict", VERCEL_FUNCTION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fixtures(cases, seed=42):
+    """Random-walk series of varied length, some with market context."""
+    rng = random.Random(seed)
+    for case in range(cases):
+        n = rng.choice([50, 51, 120, 199, 200, 201, 365, 1000])
+        base_price = rng.uniform(0.01, 60000)
+        closes, volumes = [], []
+        for _ in range(n):
+            base_price *= (1 + rng.uniform(-0.05, 0.05))
+            closes.append(base_price)
+            volumes.append(rng.uniform(1e6, 5e9))
+        body = {"closes": closes, "volumes": volumes}
+        if case % 3 == 0:
+            body.update(
+                price_change_24h=rng.uniform(-10, 10),
+                price_change_7d=rng.uniform(-20, 20),
+                fear_greed_value=rng.uniform(0, 100),
+            )
+        if case % 5 == 0:
+            body["volumes"] = volumes[: n - 7]  # short volumes are zero-padded
+        yield body
+    yield {"closes": [1.0] * 10, "volumes": [1.0] * 10}  # rejected by both
+
+
+def outcome(fn, body):
+    try:
+        result = fn(body)
+    except ValueError as e:
+        return {"error": str(e)}
+    if not isinstance(result, dict):
+        result = result.to_dict(features=False)
+    for key in ("features", "model_24h_accuracy", "model_7d_accuracy"):
+        result.pop(key, None)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask/Vercel prediction parity check")
+    parser.add_argument("--models-dir", default=str(Path(__file__).resolve().parent / "models"))
+    parser.add_argument("--cases", type=int, default=50)
+    args = parser.parse_args()
+
+    predictor = NexYpherPredictor(args.models_dir)
+    vercel = load_vercel_function()
+    vercel._load_models(Path(args.models_dir))
+
+    mismatches = 0
+    total = 0
+    for body in fixtures(args.cases):
+        total += 1
+        flask_result = outcome(lambda b: predictor.predict(**b), body)
+        vercel_result = outcome(vercel._predict, body)
+        if flask_result != vercel_result:
+            mismatches += 1
+            print(f"MISMATCH ({len(body['closes'])} bars)")
+            print(f"  predictor: {flask_result}")
+            print(f"  vercel:    {vercel_result}")
+
+    print(f"{total - mismatches}/{total} fixtures match")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
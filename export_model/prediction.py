@@ -0,0 +1,237 @@
+"""
+Prediction Result
+==================
+``Prediction`` is what ``NexYpherPredictor.predict`` returns: a
+``__slots__`` object instead of a dict, so a result is one small allocation.
+
+- The 38 features are not copied into a dict. The result keeps the model
+  input row it was scored from and builds the ``features`` dict only when
+  someone reads it. With ``predict(..., features=False)`` the row is not
+  kept at all.
+- ``to_json()`` writes the public response fields straight to bytes from a
+  precomputed key layout, with no intermediate dict. When a fast JSON
+  backend is installed (see json_codec.py) it encodes through that instead,
+  which is quicker still.
+- It is a read-only ``Mapping`` over the same keys the old dict had, so
+  ``result["verdict"]``, ``"error" in result`` and ``dict(result)`` keep
+  working. Instances are never mutated after construction, which is what
+  lets the prediction cache hand the same object to every caller.
+
+``verdict_for`` and ``confidence_for`` are the verdict rules themselves,
+used by the predictor, the Vercel function and the backtest.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import json_codec
+
+# Fields returned to API clients, in response order
+PUBLIC_FIELDS = (
+    "verdict",
+    "direction",
+    "prob_up_24h",
+    "prob_up_7d",
+    "confidence",
+    "direction_probs",
+    "model_version",
+)
+
+# Every key the Mapping view exposes
+FIELDS = PUBLIC_FIELDS + ("model_24h_accuracy", "model_7d_accuracy", "features")
+
+# Encoded JSON strings for values that repeat on every response
+# (verdicts, directions, class names, model versions)
+_STRING_CACHE: Dict[str, bytes] = {}
+
+
+def _json_str(value: str) -> bytes:
+    encoded = _STRING_CACHE.get(value)
+    if encoded is None:
+        encoded = json.dumps(value).encode()
+        if len(_STRING_CACHE) < 1024:
+            _STRING_CACHE[value] = encoded
+    return encoded
+
+
+def _json_num(value: float) -> bytes:
+    # float repr is what json.dumps emits for finite floats; NaN/Infinity
+    # have no JSON form and become null, as with the orjson backend
+    if not math.isfinite(value):
+        return b"null"
+    return repr(value).encode()
+
+
+# ── Verdict rules (shared by every server and the backtest) ──────
+
+def verdict_for(prob_24h: float, prob_7d: float) -> str:
+    """Verdict rule on raw up-probabilities (0-1)."""
+    if prob_7d >= 0.60 and prob_24h >= 0.55:
+        return "STRONG BUY"
+    if prob_7d >= 0.50:
+        return "BUY"
+    if prob_7d <= 0.30:
+        return "SELL"
+    if prob_7d <= 0.40 and prob_24h <= 0.40:
+        return "AVOID"
+    return "NEUTRAL"
+
+
+def confidence_for(prob_24h: float, prob_7d: float) -> float:
+    """1-10 score for how strongly both horizons agree on a direction."""
+    both_bullish = min(prob_24h, prob_7d)
+    both_bearish = min(1 - prob_24h, 1 - prob_7d)
+    directional_strength = max(both_bullish, both_bearish)
+    return round(max(1.0, min(10.0, (directional_strength - 0.5) * 20)), 1)
+
+
+class Prediction(Mapping):
+    """
+    One scored series.
+
+    Attributes
+    ----------
+    verdict, direction : str
+    prob_up_24h, prob_up_7d : float, 0-100
+    confidence : float, 1-10
+    model_version : str
+    model_24h_accuracy, model_7d_accuracy : float, cross-validated accuracy
+    direction_probs : dict, {class: %}; a fresh dict on every read
+    features : dict or None, the 38 model inputs; built on every read,
+        None when the prediction was made with ``features=False``
+    """
+
+    __slots__ = (
+        "verdict",
+        "direction",
+        "prob_up_24h",
+        "prob_up_7d",
+        "confidence",
+        "model_version",
+        "model_24h_accuracy",
+        "model_7d_accuracy",
+        "_direction_probs",
+        "_row",
+        "_columns",
+    )
+
+    def __init__(
+        self,
+        verdict: str,
+        direction: str,
+        prob_up_24h: float,
+        prob_up_7d: float,
+        confidence: float,
+        direction_probs: Tuple[Tuple[str, float], ...],
+        model_version: str,
+        model_24h_accuracy: float = 0.0,
+        model_7d_accuracy: float = 0.0,
+        row: Optional[List[float]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.verdict = verdict
+        self.direction = direction
+        self.prob_up_24h = prob_up_24h
+        self.prob_up_7d = prob_up_7d
+        self.confidence = confidence
+        self.model_version = model_version
+        self.model_24h_accuracy = model_24h_accuracy
+        self.model_7d_accuracy = model_7d_accuracy
+        self._direction_probs = direction_probs
+        self._row = row
+        self._columns = columns
+
+    @property
+    def direction_probs(self) -> Dict[str, float]:
+        return dict(self._direction_probs)
+
+    @property
+    def has_features(self) -> bool:
+        return self._row is not None
+
+    @property
+    def features(self) -> Optional[Dict[str, float]]:
+        if self._row is None:
+            return None
+        return dict(zip(self._columns, self._row))
+
+    # ── Mapping view ────────────────────────────────────────────
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in FIELDS
+
+    def __repr__(self) -> str:
+        return (
+            f"Prediction(verdict={self.verdict!r}, direction={self.direction!r}, "
+            f"prob_up_24h={self.prob_up_24h}, prob_up_7d={self.prob_up_7d}, "
+            f"confidence={self.confidence}, model_version={self.model_version!r})"
+        )
+
+    # ── Serialization ───────────────────────────────────────────
+
+    def to_dict(self, features: bool = True) -> Dict[str, Any]:
+        """Plain dict of every field (``features`` included unless False)."""
+        out = {key: getattr(self, key) for key in FIELDS[:-1]}
+        if features:
+            out["features"] = self.features
+        return out
+
+    def public(self) -> Dict[str, Any]:
+        """Dict of the fields API clients receive."""
+        return {key: getattr(self, key) for key in PUBLIC_FIELDS}
+
+    def to_json(self, features: bool = False) -> bytes:
+        """
+        The public response as compact JSON bytes; with ``features`` the
+        feature dict is appended (when the prediction kept it).
+        """
+        if json_codec.backend() != "json":
+            out = self.public()
+            if features and self._row is not None:
+                out["features"] = self.features
+            return json_codec.dumps(out)
+
+        probs = b",".join(_json_str(cls) + b":" + _json_num(p) for cls, p in self._direction_probs)
+        parts = [
+            b'{"verdict":', _json_str(self.verdict),
+            b',"direction":', _json_str(self.direction),
+            b',"prob_up_24h":', _json_num(self.prob_up_24h),
+            b',"prob_up_7d":', _json_num(self.prob_up_7d),
+            b',"confidence":', _json_num(self.confidence),
+            b',"direction_probs":{', probs,
+            b'},"model_version":', _json_str(self.model_version),
+        ]
+        if features and self._row is not None:
+            parts += [b',"features":', json_codec.dumps(self.features)]
+        parts.append(b"}")
+        return b"".join(parts)
+
+
+def encode_result(result) -> bytes:
+    """JSON bytes for a ``Prediction`` or a batch ``{"error": str}`` entry."""
+    if isinstance(result, Prediction):
+        return result.to_json()
+    return json_codec.dumps(result)
+
+
+def encode_batch(results: Sequence[Any], model_version: str) -> bytes:
+    """The ``/predict/batch`` response body as JSON bytes."""
+    return b"".join((
+        b'{"results":[', b",".join(encode_result(r) for r in results),
+        b'],"model_version":', _json_str(model_version), b"}",
+    ))
@@ -0,0 +1,114 @@
+"""
+Prediction Result Cache
+========================
+Bounded LRU cache with a TTL for prediction results. Popular tokens are
+polled by many clients with the same candle history, so caching on a
+fingerprint of the inputs turns those repeats into a dict lookup.
+
+The key is a BLAKE2b digest of the raw close/volume float64 buffers, the
+optional market-context fields and the model version, so a model release
+never serves results from the previous one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+def fingerprint(
+    closes: Sequence[float],
+    volumes: Sequence[float],
+    context: Sequence[Optional[float]],
+    model_version: str,
+) -> bytes:
+    """
+    Hash a prediction request into a 16-byte cache key.
+
+    Raises ``ValueError``/``TypeError`` when the series are not numeric,
+    exactly like feature computation would.
+    """
+    closes_buf = np.ascontiguousarray(closes, dtype=np.float64)
+    volumes_buf = np.ascontiguousarray(volumes, dtype=np.float64)
+
+    h = hashlib.blake2b(digest_size=16)
+    # Lengths first, so the closes/volumes boundary is unambiguous
+    h.update(np.array([len(closes_buf), len(volumes_buf)], dtype=np.int64).tobytes())
+    h.update(closes_buf.tobytes())
+    h.update(volumes_buf.tobytes())
+    h.update(repr(tuple(None if v is None else float(v) for v in context)).encode())
+    h.update(str(model_version).encode())
+    return h.digest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of entries; the least recently used is evicted first.
+    ttl : float
+        Seconds an entry stays valid.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 900.0):
+        if max_size <= 0:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        if ttl <= 0:
+            raise ValueError(f"ttl must be positive, got {ttl}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key``, or None if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key``, evicting the LRU entry if full."""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for /health."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -16,18 +16,19 @@ from __future__ import annotations
 
 import json
 import logging
-import math
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from ta_utils import (
-    ema_series,
-    rsi_series,
-    macd_series,
-    bollinger_series,
-    bollinger_position,
-)
+import numpy as np
+
+import feature_engine
+import metrics
+import native_models
+import tree_ensemble
+from feature_cache import FeatureStateCache
+from prediction import PUBLIC_FIELDS, Prediction, confidence_for, verdict_for
+from prediction_cache import PredictionCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -41,15 +42,45 @@ class NexYpherPredictor:
     models_dir : str or Path, optional
         Path to the directory containing .pkl model files and model_metadata.json.
         Defaults to ./models/ relative to this file.
+    model_format : str, optional
+        "pickle" loads the sklearn-wrapped .pkl files with joblib; "native"
+        loads boosters exported by ``native_models.py`` with xgboost only;
+        "compiled" loads the NumPy arrays written by ``tree_ensemble.py`` and
+        needs neither xgboost nor scikit-learn; "auto" (default) prefers
+        compiled, then native files when present.
+    cache_size : int, optional
+        Number of results kept in the LRU prediction cache. 0 (default)
+        disables caching.
+    cache_ttl : float, optional
+        Seconds a cached result stays valid, default 900 (15 minutes).
+    feature_cache_size : int, optional
+        Number of history prefixes kept in the incremental feature cache
+        (see feature_cache.py), so a request whose only change is the last
+        bar skips the full indicator pass. 0 (default) disables it.
+    feature_cache_ttl : float, optional
+        Seconds a prefix state stays valid, default 86400 (one day).
+
+    One instance can serve several threads at once: feature computation is
+    pure, model calls do not mutate the models and the cache is locked.
+    Call ``set_nthread`` before serving, not while requests are in flight.
     """
 
-    def __init__(self, models_dir: Optional[str] = None):
+    def __init__(
+        self,
+        models_dir: Optional[str] = None,
+        model_format: str = "auto",
+        cache_size: int = 0,
+        cache_ttl: float = 900.0,
+        feature_cache_size: int = 0,
+        feature_cache_ttl: float = 86400.0,
+    ):
         if models_dir is None:
             models_dir = Path(__file__).parent / "models"
         else:
             models_dir = Path(models_dir)
 
         self.models_dir = models_dir
+        self.model_format = model_format
         self.model_24h = None
         self.model_7d = None
         self.model_dir = None
@@ -57,15 +88,19 @@ class NexYpherPredictor:
         self.metadata: Dict[str, Any] = {}
         self.feature_columns: List[str] = []
         self._loaded = False
+        self.cache = PredictionCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.feature_cache = (
+            FeatureStateCache(feature_cache_size, feature_cache_ttl) if feature_cache_size > 0 else None
+        )
+        self._pool = None
+        self._pool_workers = 0
 
         self._load_models()
 
     def _load_models(self):
         """Load pretrained models from disk."""
-        try:
-            import joblib
-        except ImportError:
-            raise ImportError("joblib is required. Run: pip install joblib")
+        if self.model_format not in ("auto", "pickle", "native", "compiled"):
+            raise ValueError(f"Unknown model format: {self.model_format!r}")
 
         meta_path = self.models_dir / "model_metadata.json"
         if not meta_path.exists():
@@ -74,21 +109,28 @@ class NexYpherPredictor:
         with open(meta_path) as f:
             self.metadata = json.load(f)
 
-        paths = {
-            "24h": self.models_dir / "model_24h_1d_latest.pkl",
-            "7d":  self.models_dir / "model_7d_1d_latest.pkl",
-            "dir": self.models_dir / "model_dir_1d_latest.pkl",
-            "le":  self.models_dir / "label_encoder_latest.pkl",
-        }
-
-        for name, path in paths.items():
-            if not path.exists():
-                raise FileNotFoundError(f"Model file missing: {path}")
+        auto = self.model_format == "auto"
+        use_compiled = self.model_format == "compiled" or (
+            auto and tree_ensemble.has_compiled(self.models_dir)
+        )
+        use_native = self.model_format == "native" or (
+            auto and native_models.has_native(self.models_dir)
+        )
+        if use_compiled:
+            models = tree_ensemble.load_compiled(self.models_dir)
+            self.model_format = "compiled"
+        elif use_native:
+            models = native_models.load_native(self.models_dir)
+            self.model_format = "native"
+        else:
+            models = self._load_pickles()
+            self.model_format = "pickle"
 
-        self.model_24h = joblib.load(paths["24h"])
-        self.model_7d = joblib.load(paths["7d"])
-        self.model_dir = joblib.load(paths["dir"])
-        self.label_encoder = joblib.load(paths["le"])
+        self.model_24h = models["model_24h"]
+        self.model_7d = models["model_7d"]
+        self.model_dir = models["model_dir"]
+        self.label_encoder = models["label_encoder"]
+        self._classes = tuple(str(cls) for cls in self.label_encoder.classes_)
 
         self.feature_columns = self.metadata.get("feature_columns", [])
         expected = self.metadata.get("n_features", 38)
@@ -99,87 +141,46 @@ class NexYpherPredictor:
 
         self._loaded = True
         logger.info(
-            "Models loaded (v%s): 24h CV=%.1f%%, 7d CV=%.1f%%",
+            "Models loaded (v%s, %s): 24h CV=%.1f%%, 7d CV=%.1f%%",
             self.metadata.get("version", "?"),
+            self.model_format,
             self.metadata.get("model_24h", {}).get("cv_mean", 0) * 100,
             self.metadata.get("model_7d", {}).get("cv_mean", 0) * 100,
         )
 
-    # ── Internal TA helpers ──────────────────────────────────────
+    def _load_pickles(self) -> Dict[str, Any]:
+        """Load the sklearn-wrapped .pkl models with joblib."""
+        try:
+            import joblib
+        except ImportError:
+            raise ImportError("joblib is required. Run: pip install joblib")
 
-    @staticmethod
-    def _sma_series(values: List[float], period: int) -> List[float]:
-        n = len(values)
-        result = list(values)
-        for i in range(period - 1, n):
-            result[i] = sum(values[i - period + 1: i + 1]) / period
-        return result
+        paths = {
+            "model_24h": self.models_dir / "model_24h_1d_latest.pkl",
+            "model_7d": self.models_dir / "model_7d_1d_latest.pkl",
+            "model_dir": self.models_dir / "model_dir_1d_latest.pkl",
+            "label_encoder": self.models_dir / "label_encoder_latest.pkl",
+        }
 
-    @staticmethod
-    def _atr_series(closes: List[float], period: int = 14) -> List[float]:
-        n = len(closes)
-        tr = [0.0] * n
-        for i in range(1, n):
-            tr[i] = abs(closes[i] - closes[i - 1])
-        atr = [0.0] * n
-        if n > period:
-            atr[period] = sum(tr[1:period + 1]) / period
-            for i in range(period + 1, n):
-                atr[i] = (atr[i - 1] * (period - 1) + tr[i]) / period
-        return atr
-
-    @staticmethod
-    def _volatility_series(closes: List[float], period: int) -> List[float]:
-        n = len(closes)
-        vol = [0.0] * n
-        returns = [0.0] * n
-        for i in range(1, n):
-            if closes[i - 1] > 0:
-                returns[i] = (closes[i] - closes[i - 1]) / closes[i - 1]
-        for i in range(period, n):
-            window = returns[i - period + 1: i + 1]
-            mean = sum(window) / len(window)
-            var = sum((r - mean) ** 2 for r in window) / len(window)
-            vol[i] = math.sqrt(var)
-        return vol
-
-    @staticmethod
-    def _momentum_series(closes: List[float], period: int) -> List[float]:
-        n = len(closes)
-        mom = [0.0] * n
-        for i in range(period, n):
-            if closes[i - period] > 0:
-                mom[i] = (closes[i] / closes[i - period] - 1.0) * 100.0
-        return mom
-
-    @staticmethod
-    def _volume_ratio_series(volumes: List[float], period: int = 20) -> List[float]:
-        n = len(volumes)
-        ratio = [1.0] * n
-        for i in range(period, n):
-            ma = sum(volumes[i - period: i]) / period
-            ratio[i] = volumes[i] / ma if ma > 0 else 1.0
-        return ratio
-
-    @staticmethod
-    def _volume_spike(volumes: List[float], period: int = 20, threshold: float = 2.0) -> List[float]:
-        n = len(volumes)
-        ratio = [1.0] * n
-        for i in range(period, n):
-            ma = sum(volumes[i - period: i]) / period
-            ratio[i] = volumes[i] / ma if ma > 0 else 1.0
-        return [1.0 if v > threshold else 0.0 for v in ratio]
-
-    @staticmethod
-    def _support_resistance(closes: List[float], window: int = 20):
-        n = len(closes)
-        support = list(closes)
-        resist = list(closes)
-        for i in range(window, n):
-            w = closes[i - window: i]
-            support[i] = min(w)
-            resist[i] = max(w)
-        return support, resist
+        for name, path in paths.items():
+            if not path.exists():
+                raise FileNotFoundError(f"Model file missing: {path}")
+
+        return {name: joblib.load(path) for name, path in paths.items()}
+
+    def set_nthread(self, nthread: int) -> None:
+        """
+        Cap the threads each model call may use.
+
+        Multi-worker servers call this once per process so the workers do not
+        oversubscribe the CPU. Compiled models are single-threaded NumPy and
+        ignore it.
+        """
+        for model in (self.model_24h, self.model_7d, self.model_dir):
+            if hasattr(model, "set_nthread"):
+                model.set_nthread(nthread)
+            elif hasattr(model, "get_booster"):
+                model.set_params(n_jobs=nthread)
 
     # ── Feature computation ──────────────────────────────────────
 
@@ -193,159 +194,81 @@ class NexYpherPredictor:
         volume_mcap_ratio: Optional[float] = None,
         ath_change_pct: Optional[float] = None,
         fear_greed_value: float = 50.0,
+        mode: str = "tail",
     ) -> Dict[str, float]:
         """
         Compute all 38 features from price/volume history.
 
+        Thin wrapper over ``feature_engine.compute_features`` (shared with the
+        Vercel function); see there for parameters.
+        """
+        return feature_engine.compute_features(
+            closes, volumes,
+            price_change_24h, price_change_7d, price_change_30d,
+            volume_mcap_ratio, ath_change_pct, fear_greed_value,
+            mode=mode,
+        )
+
+    def _features(self, closes, volumes, context) -> Dict[str, float]:
+        """Features for one prepared series, through the feature cache when enabled."""
+        if self.feature_cache is not None:
+            return self.feature_cache.compute(closes, volumes, *context)
+        return self.compute_features(closes, volumes, *context)
+
+    # ── Prediction ───────────────────────────────────────────────
+
+    def score_matrix(self, X):
+        """
+        Run all three models once over a feature matrix.
+
         Parameters
         ----------
-        closes : list of daily close prices (oldest -> newest, >=100 points recommended)
-        volumes : list of daily volumes (same length as closes)
-        price_change_24h : optional, % price change in last 24h (computed from closes if None)
-        price_change_7d : optional, % price change in last 7d (computed from closes if None)
-        price_change_30d : optional, % price change in last 30d (computed from closes if None)
-        volume_mcap_ratio : optional, 24h volume / market cap ratio
-        ath_change_pct : optional, % distance from all-time high
-        fear_greed_value : Fear & Greed index (0-100), default 50
+        X : rows of model inputs in ``feature_columns`` order (list of
+            lists or a 2-D array, e.g. from ``compute_feature_matrix``)
 
         Returns
         -------
-        dict with 38 feature keys matching model's expected columns
+        (probs_24h, probs_7d, dir_probs): up-probabilities (0-1) per row for
+        each horizon, and a (rows, classes) array of direction
+        probabilities in ``label_encoder.classes_`` order.
         """
-        n = len(closes)
-        i = n - 1
-
-        # RSI
-        rsi_7 = rsi_series(closes, 7)
-        rsi_14 = rsi_series(closes, 14)
-        rsi_21 = rsi_series(closes, 21)
-
-        # MACD
-        macd_line, macd_signal, macd_hist = macd_series(closes, 12, 26, 9)
-        macd_cross = 0.0
-        if i >= 1:
-            prev_diff = macd_line[i - 1] - macd_signal[i - 1]
-            curr_diff = macd_line[i] - macd_signal[i]
-            if prev_diff <= 0 and curr_diff > 0:
-                macd_cross = 1.0
-            elif prev_diff >= 0 and curr_diff < 0:
-                macd_cross = -1.0
-
-        # Bollinger Bands
-        bb_upper, bb_mid, bb_lower = bollinger_series(closes, 20, 2.0)
-        bb_width_val = (bb_upper[i] - bb_lower[i]) / bb_mid[i] if bb_mid[i] > 0 else 0.0
-        bb_pos = bollinger_position(closes, 20, 2.0)
-
-        # Moving averages
-        ema_9 = ema_series(closes, 9)
-        ema_21 = ema_series(closes, 21)
-        ema_50 = ema_series(closes, 50)
-        ema_200 = ema_series(closes, 200)
-        sma_20 = self._sma_series(closes, 20)
-
-        ema_9_21_cross = 1.0 if ema_9[i] > ema_21[i] else 0.0
-        ema_50_200_cross = 1.0 if ema_50[i] > ema_200[i] else 0.0
-        price_above_ema200 = 1.0 if closes[i] > ema_200[i] else 0.0
-
-        # Volume
-        vol_ratio = self._volume_ratio_series(volumes, 20)
-        vol_spike = self._volume_spike(volumes, 20, 2.0)
-
-        # Momentum
-        mom_5 = self._momentum_series(closes, 5)
-        mom_10 = self._momentum_series(closes, 10)
-        mom_30 = self._momentum_series(closes, 30)
-        roc_14 = self._momentum_series(closes, 14)
-
-        # Volatility & ATR
-        atr_14 = self._atr_series(closes, 14)
-        vol_10 = self._volatility_series(closes, 10)
-        vol_30 = self._volatility_series(closes, 30)
-
-        # Support / Resistance
-        support, resist = self._support_resistance(closes, 20)
-        dist_support = (closes[i] - support[i]) / support[i] * 100 if support[i] > 0 else 0.0
-        dist_resist = (resist[i] - closes[i]) / closes[i] * 100 if closes[i] > 0 else 0.0
-
-        # Market-data features (use provided values or fallback)
-        if price_change_24h is None:
-            price_change_24h = mom_5[i] / 5.0 if i >= 5 else 0.0
-        if price_change_7d is None:
-            price_change_7d = self._momentum_series(closes, 7)[i] if n > 7 else 0.0
-        if price_change_30d is None:
-            price_change_30d = mom_30[i]
-        if volume_mcap_ratio is None:
-            volume_mcap_ratio = vol_ratio[i] * 0.02
-        if ath_change_pct is None:
-            ath_change_pct = -50.0
-
-        # Engineered features
-        rsi_avg = (rsi_7[i] + rsi_14[i] + rsi_21[i]) / 3.0
-        rsi_14_ma_diff = rsi_14[i] - rsi_avg
-        rsi_oversold = 1.0 if rsi_14[i] < 30 else 0.0
-        rsi_overbought = 1.0 if rsi_14[i] > 70 else 0.0
-
-        close = closes[i] if closes[i] > 0 else 1.0
-        price_vs_sma20 = (close - sma_20[i]) / sma_20[i] * 100 if sma_20[i] > 0 else 0.0
-        price_vs_ema50 = (close - ema_50[i]) / ema_50[i] * 100 if ema_50[i] > 0 else 0.0
-        price_vs_ema200 = (close - ema_200[i]) / ema_200[i] * 100 if ema_200[i] > 0 else 0.0
-
-        v10 = vol_10[i] if vol_10[i] > 0 else 1e-9
-        v30 = vol_30[i] if vol_30[i] > 0 else 1e-9
-        vol_ratio_10_30 = v10 / v30
-
-        mom_accel = mom_5[i] - mom_10[i]
-
-        if ema_50[i] > ema_200[i] and closes[i] > ema_50[i]:
-            trend_enc = 1.0
-        elif ema_50[i] < ema_200[i] and closes[i] < ema_50[i]:
-            trend_enc = -1.0
-        else:
-            trend_enc = 0.0
-
-        features = {
-            "rsi_7": rsi_7[i],
-            "rsi_14": rsi_14[i],
-            "rsi_21": rsi_21[i],
-            "macd_line": macd_line[i],
-            "macd_signal": macd_signal[i],
-            "macd_histogram": macd_hist[i],
-            "macd_crossover": macd_cross,
-            "bb_width": bb_width_val,
-            "bb_position": bb_pos[i],
-            "ema_9_21_cross": ema_9_21_cross,
-            "ema_50_200_cross": ema_50_200_cross,
-            "price_above_ema200": price_above_ema200,
-            "volume_ratio": vol_ratio[i],
-            "volume_spike": vol_spike[i],
-            "price_momentum_5d": mom_5[i],
-            "price_momentum_10d": mom_10[i],
-            "price_momentum_30d": mom_30[i],
-            "rate_of_change_14": roc_14[i],
-            "atr_14": atr_14[i],
-            "volatility_10d": vol_10[i],
-            "volatility_30d": vol_30[i],
-            "dist_to_support_pct": dist_support,
-            "dist_to_resist_pct": dist_resist,
-            "price_change_24h": price_change_24h,
-            "price_change_7d": price_change_7d,
-            "price_change_30d": price_change_30d,
-            "volume_mcap_ratio": volume_mcap_ratio,
-            "ath_change_pct": ath_change_pct,
-            "rsi_14_ma_diff": rsi_14_ma_diff,
-            "rsi_oversold": rsi_oversold,
-            "rsi_overbought": rsi_overbought,
-            "price_vs_sma20_pct": price_vs_sma20,
-            "price_vs_ema50_pct": price_vs_ema50,
-            "price_vs_ema200_pct": price_vs_ema200,
-            "vol_ratio_10_30": vol_ratio_10_30,
-            "momentum_accel": mom_accel,
-            "fear_greed_value": fear_greed_value,
-            "trend_encoded": trend_enc,
-        }
-        return features
+        stage = metrics.STAGE_SECONDS
+        with metrics.timer(stage, stage="model_24h"):
+            probs_24h = self.model_24h.predict_proba(X)[:, 1]
+        with metrics.timer(stage, stage="model_7d"):
+            probs_7d = self.model_7d.predict_proba(X)[:, 1]
+        with metrics.timer(stage, stage="model_dir"):
+            dir_probs = self.model_dir.predict_proba(X)
+        return probs_24h, probs_7d, dir_probs
+
+    def _build_result(
+        self,
+        prob_24h: float,
+        prob_7d: float,
+        dir_probs,
+        row: Optional[List[float]],
+    ) -> Prediction:
+        """Turn raw model probabilities into a ``Prediction``."""
+        return Prediction(
+            verdict=verdict_for(prob_24h, prob_7d),
+            direction=self._classes[int(dir_probs.argmax())],
+            prob_up_24h=round(prob_24h * 100, 1),
+            prob_up_7d=round(prob_7d * 100, 1),
+            confidence=confidence_for(prob_24h, prob_7d),
+            direction_probs=tuple(
+                (cls, round(prob * 100, 1)) for cls, prob in zip(self._classes, dir_probs.tolist())
+            ),
+            model_version=self.metadata.get("version", "unknown"),
+            model_24h_accuracy=self.metadata.get("model_24h", {}).get("cv_mean", 0),
+            model_7d_accuracy=self.metadata.get("model_7d", {}).get("cv_mean", 0),
+            row=row,
+            columns=self.feature_columns,
+        )
 
-    # ── Prediction ───────────────────────────────────────────────
+    def _cache_key(self, closes, volumes, context) -> Optional[bytes]:
+        if self.cache is None:
+            return None
+        return fingerprint(closes, volumes, context, self.metadata.get("version", "unknown"))
 
     def predict(
         self,
@@ -357,7 +280,8 @@ class NexYpherPredictor:
         volume_mcap_ratio: Optional[float] = None,
         ath_change_pct: Optional[float] = None,
         fear_greed_value: float = 50.0,
-    ) -> Dict[str, Any]:
+        features: bool = True,
+    ) -> Prediction:
         """
         Predict using the pretrained XGBoost models.
 
@@ -371,10 +295,12 @@ class NexYpherPredictor:
         volume_mcap_ratio : optional volume/market-cap ratio
         ath_change_pct : optional % from all-time high (e.g., -50.0)
         fear_greed_value : Fear & Greed index 0-100, default 50
+        features : keep the model inputs for ``result.features`` (default
+            True); False skips them for callers that only need the verdict
 
         Returns
         -------
-        dict with keys:
+        ``Prediction`` (read-only; also usable as a mapping) with:
             verdict        : STRONG BUY | BUY | NEUTRAL | AVOID | SELL
             direction      : UP | DOWN | SIDEWAYS
             prob_up_24h    : float (0-100)
@@ -382,75 +308,352 @@ class NexYpherPredictor:
             confidence     : float (1-10)
             direction_probs: {UP: %, DOWN: %, SIDEWAYS: %}
             model_version  : str
-            features       : dict of all 38 computed features
+            features       : dict of all 38 computed features, or None
         """
         if not self._loaded:
             raise RuntimeError("Models not loaded")
 
-        if len(closes) < 50:
-            raise ValueError(f"Need at least 50 close prices, got {len(closes)}")
-
-        if len(volumes) < len(closes):
-            volumes = volumes + [0.0] * (len(closes) - len(volumes))
-
-        # Compute features
-        features = self.compute_features(
-            closes, volumes,
+        closes, volumes = feature_engine.prepare_series(closes, volumes)
+        context = (
             price_change_24h, price_change_7d, price_change_30d,
             volume_mcap_ratio, ath_change_pct, fear_greed_value,
         )
 
+        key = self._cache_key(closes, volumes, context)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None and (cached.has_features or not features):
+                return cached
+
+        # Compute features
+        metrics.INPUT_BARS.observe(len(closes))
+        with metrics.timer(metrics.STAGE_SECONDS, stage="features"):
+            feature_dict = self._features(closes, volumes, context)
+
         # Build feature vector in model's column order
-        X = [[features.get(col, 0.0) for col in self.feature_columns]]
-
-        # Predictions
-        prob_24h = float(self.model_24h.predict_proba(X)[0][1])
-        prob_7d = float(self.model_7d.predict_proba(X)[0][1])
-        dir_probs = self.model_dir.predict_proba(X)[0]
-        dir_pred = str(self.label_encoder.classes_[dir_probs.argmax()])
-
-        # Confidence
-        both_bullish = min(prob_24h, prob_7d)
-        both_bearish = min(1 - prob_24h, 1 - prob_7d)
-        directional_strength = max(both_bullish, both_bearish)
-        confidence = round(max(1.0, min(10.0, (directional_strength - 0.5) * 20)), 1)
-
-        # Verdict
-        if prob_7d >= 0.60 and prob_24h >= 0.55:
-            verdict = "STRONG BUY"
-        elif prob_7d >= 0.50:
-            verdict = "BUY"
-        elif prob_7d <= 0.30:
-            verdict = "SELL"
-        elif prob_7d <= 0.40 and prob_24h <= 0.40:
-            verdict = "AVOID"
-        else:
-            verdict = "NEUTRAL"
+        row = feature_engine.feature_row(feature_dict, self.feature_columns)
 
-        return {
-            "verdict": verdict,
-            "direction": dir_pred,
-            "prob_up_24h": round(prob_24h * 100, 1),
-            "prob_up_7d": round(prob_7d * 100, 1),
-            "confidence": confidence,
-            "direction_probs": {
-                str(cls): round(float(prob) * 100, 1)
-                for cls, prob in zip(self.label_encoder.classes_, dir_probs)
-            },
-            "model_version": self.metadata.get("version", "unknown"),
-            "model_24h_accuracy": self.metadata.get("model_24h", {}).get("cv_mean", 0),
-            "model_7d_accuracy": self.metadata.get("model_7d", {}).get("cv_mean", 0),
-            "features": features,
-        }
+        probs_24h, probs_7d, dir_probs = self.score_matrix([row])
+        result = self._build_result(
+            float(probs_24h[0]), float(probs_7d[0]), dir_probs[0], row if features else None,
+        )
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def predict_batch(
+        self,
+        series: List[Dict[str, Any]],
+        features: bool = True,
+    ) -> List[Any]:
+        """
+        Predict for many series with one model call per batch.
+
+        Parameters
+        ----------
+        series : list of dicts, each holding the keyword arguments accepted by
+            ``predict`` (``closes``, ``volumes`` and the optional market fields).
+        features : as in ``predict``
+
+        Returns
+        -------
+        list aligned with ``series``. Each entry is either the ``Prediction``
+        that ``predict`` returns, or ``{"error": str}`` when that item was
+        invalid.
+        Invalid items never fail the rest of the batch.
+        """
+        if not self._loaded:
+            raise RuntimeError("Models not loaded")
+
+        results: List[Any] = [None] * len(series)
+        rows: List[List[float]] = []
+        row_index: List[int] = []
+        row_keys: List[Optional[bytes]] = []
+
+        for idx, item in enumerate(series):
+            try:
+                closes, volumes, context = _parse_item(item)
+
+                key = self._cache_key(closes, volumes, context)
+                if key is not None:
+                    cached = self.cache.get(key)
+                    if cached is not None and (cached.has_features or not features):
+                        results[idx] = cached
+                        continue
+
+                metrics.INPUT_BARS.observe(len(closes))
+                with metrics.timer(metrics.STAGE_SECONDS, stage="features"):
+                    feature_dict = self._features(closes, volumes, context)
+            except (ValueError, TypeError, ArithmeticError) as e:
+                results[idx] = {"error": str(e)}
+                continue
+
+            rows.append(feature_engine.feature_row(feature_dict, self.feature_columns))
+            row_index.append(idx)
+            row_keys.append(key)
+
+        if rows:
+            probs_24h, probs_7d, dir_probs = self.score_matrix(rows)
+            for j, idx in enumerate(row_index):
+                results[idx] = self._build_result(
+                    float(probs_24h[j]), float(probs_7d[j]), dir_probs[j],
+                    rows[j] if features else None,
+                )
+                if row_keys[j] is not None:
+                    self.cache.put(row_keys[j], results[idx])
+
+        return results
+
+    def predict_series(
+        self,
+        closes: List[float],
+        volumes: List[float],
+        price_change_24h: Optional[float] = None,
+        price_change_7d: Optional[float] = None,
+        price_change_30d: Optional[float] = None,
+        volume_mcap_ratio: Optional[float] = None,
+        ath_change_pct: Optional[float] = None,
+        fear_greed_value: float = 50.0,
+        start: Optional[int] = None,
+        features: bool = True,
+    ) -> List[Prediction]:
+        """
+        Point-in-time predictions for every bar of a history, e.g. for a
+        chart or a backtest.
+
+        Features for all bars come from one ``compute_feature_matrix`` pass
+        and all rows are scored in one batch, instead of one ``predict``
+        per growing prefix.
+
+        Parameters
+        ----------
+        closes, volumes, and the optional market fields : as in ``predict``;
+            the market fields may also be per-bar arrays.
+        start : int, optional
+            First bar to score, default ``MIN_HISTORY - 1`` (the first bar
+            with a full minimum history).
+        features : as in ``predict``
+
+        Returns
+        -------
+        list with one ``Prediction`` per bar from ``start`` on:
+        entry ``k`` is the prediction ``predict`` would have made with
+        ``closes[:start + k + 1]``.
+        """
+        if not self._loaded:
+            raise RuntimeError("Models not loaded")
+
+        closes, volumes = feature_engine.prepare_series(closes, volumes)
+        n = len(closes)
+        if start is None:
+            start = feature_engine.MIN_HISTORY - 1
+        if not feature_engine.MIN_HISTORY - 1 <= start < n:
+            raise ValueError(
+                f"start must be between {feature_engine.MIN_HISTORY - 1} and {n - 1}, got {start}"
+            )
+
+        metrics.INPUT_BARS.observe(n)
+        with metrics.timer(metrics.STAGE_SECONDS, stage="features"):
+            matrix = feature_engine.compute_feature_matrix(
+                closes, volumes,
+                price_change_24h, price_change_7d, price_change_30d,
+                volume_mcap_ratio, ath_change_pct, fear_greed_value,
+                columns=self.feature_columns,
+            )[start:]
+
+        probs_24h, probs_7d, dir_probs = self.score_matrix(matrix)
+        rows = matrix.tolist() if features else [None] * len(matrix)
+        return [
+            self._build_result(float(probs_24h[j]), float(probs_7d[j]), dir_probs[j], row)
+            for j, row in enumerate(rows)
+        ]
+
+    def predict_many(
+        self,
+        series: List[Dict[str, Any]],
+        workers: Optional[int] = None,
+        features: bool = True,
+    ) -> List[Any]:
+        """
+        ``predict_batch`` with feature computation spread over processes.
+
+        Feature extraction is pure Python and GIL-bound, so large batches use
+        one core under ``predict_batch``. Here every series is copied once
+        into a shared-memory block, shards of it are featurized by a
+        ``ProcessPoolExecutor`` (no per-series pickling of the price data),
+        and the parent runs one batched model call over the collected rows.
+
+        Parameters
+        ----------
+        series : same items as ``predict_batch``
+        workers : int, optional
+            Worker processes. None or 1 falls back to ``predict_batch``.
+            The pool is kept for later calls; ``close()`` shuts it down.
+        features : as in ``predict``
+
+        Returns
+        -------
+        list aligned with ``series``, exactly as ``predict_batch``. The
+        prediction cache is not consulted.
+        """
+        if not workers or workers <= 1 or len(series) < 2:
+            return self.predict_batch(series, features=features)
+        if not self._loaded:
+            raise RuntimeError("Models not loaded")
+
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        results: List[Any] = [None] * len(series)
+        parsed = []
+        for idx, item in enumerate(series):
+            try:
+                closes, volumes, context = _parse_item(item)
+            except (ValueError, TypeError, ArithmeticError) as e:
+                results[idx] = {"error": str(e)}
+                continue
+            parsed.append((idx, closes, volumes, context))
+
+        total = sum(len(closes) for _, closes, _, _ in parsed)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 16 * total))
+        try:
+            packed = np.ndarray((2, total), dtype=np.float64, buffer=shm.buf)
+            tasks = []
+            offset = 0
+            for idx, closes, volumes, context in parsed:
+                n = len(closes)
+                try:
+                    packed[0, offset: offset + n] = closes
+                    packed[1, offset: offset + n] = volumes
+                except (ValueError, TypeError, ArithmeticError) as e:
+                    results[idx] = {"error": str(e)}
+                    continue
+                tasks.append((idx, offset, n, context))
+                offset += n
+            del packed
+
+            if self._pool is None or self._pool_workers != workers:
+                self.close()
+                self._pool = ProcessPoolExecutor(max_workers=workers)
+                self._pool_workers = workers
+
+            # A few shards per worker evens out series of different lengths
+            n_shards = min(len(tasks), workers * 4) or 1
+            shards = [tasks[k::n_shards] for k in range(n_shards)]
+            futures = [
+                self._pool.submit(_featurize_shard, shm.name, total, shard)
+                for shard in shards if shard
+            ]
+            featurized = [out for future in futures for out in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        rows: List[List[float]] = []
+        row_index: List[int] = []
+        for idx, feature_dict in sorted(featurized, key=lambda pair: pair[0]):
+            if "error" in feature_dict:
+                results[idx] = feature_dict
+                continue
+            rows.append(feature_engine.feature_row(feature_dict, self.feature_columns))
+            row_index.append(idx)
+
+        if rows:
+            probs_24h, probs_7d, dir_probs = self.score_matrix(rows)
+            for j, idx in enumerate(row_index):
+                results[idx] = self._build_result(
+                    float(probs_24h[j]), float(probs_7d[j]), dir_probs[j],
+                    rows[j] if features else None,
+                )
+
+        return results
+
+    def close(self) -> None:
+        """Shut down the ``predict_many`` worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
 
     def info(self) -> Dict[str, Any]:
         """Return model metadata."""
         return {
             "loaded": self._loaded,
+            "model_format": self.model_format,
             "version": self.metadata.get("version"),
             "n_features": self.metadata.get("n_features"),
             "model_24h_accuracy": self.metadata.get("model_24h", {}).get("cv_mean"),
             "model_7d_accuracy": self.metadata.get("model_7d", {}).get("cv_mean"),
             "model_dir_accuracy": self.metadata.get("model_dir", {}).get("cv_mean"),
             "direction_classes": self.metadata.get("model_dir", {}).get("direction_classes"),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "feature_cache": self.feature_cache.stats() if self.feature_cache is not None else None,
         }
+
+
+def public_result(result) -> Dict[str, Any]:
+    """Strip a predictor result down to the fields API clients need."""
+    if isinstance(result, Prediction):
+        return result.public()
+    if "error" in result:
+        return {"error": result["error"]}
+    return {key: result[key] for key in PUBLIC_FIELDS}
+
+
+def _parse_item(item: Any):
+    """Validate one batch item; returns (closes, volumes, context)."""
+    if not isinstance(item, dict):
+        raise ValueError("Each series must be an object")
+    closes = item.get("closes")
+    volumes = item.get("volumes")
+    if not _is_series(closes):
+        raise ValueError("Missing or invalid 'closes' array")
+    if not _is_series(volumes):
+        raise ValueError("Missing or invalid 'volumes' array")
+
+    closes, volumes = feature_engine.prepare_series(closes, volumes)
+    fear_greed = item.get("fear_greed_value")
+    context = (
+        item.get("price_change_24h"),
+        item.get("price_change_7d"),
+        item.get("price_change_30d"),
+        item.get("volume_mcap_ratio"),
+        item.get("ath_change_pct"),
+        50.0 if fear_greed is None else fear_greed,
+    )
+    return closes, volumes, context
+
+
+def _featurize_shard(shm_name: str, total: int, tasks) -> List[tuple]:
+    """
+    ``predict_many`` worker: features for series packed in shared memory.
+
+    ``tasks`` holds ``(index, offset, length, context)`` tuples; returns
+    ``(index, features)`` pairs, with ``{"error": str}`` for bad series.
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        packed = np.ndarray((2, total), dtype=np.float64, buffer=shm.buf)
+        out = []
+        for idx, offset, n, context in tasks:
+            try:
+                features = feature_engine.compute_features(
+                    packed[0, offset: offset + n], packed[1, offset: offset + n], *context,
+                )
+            except (ValueError, TypeError, ArithmeticError) as e:
+                features = {"error": str(e)}
+            out.append((idx, features))
+        del packed
+        return out
+    finally:
+        shm.close()
+
+
+def _is_series(values) -> bool:
+    """Non-empty list, or non-empty 1-D array from the binary wire format."""
+    if isinstance(values, np.ndarray):
+        return values.ndim == 1 and values.size > 0
+    return isinstance(values, list) and len(values) > 0
+
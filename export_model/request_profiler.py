@@ -0,0 +1,170 @@
+"""
+Opt-in Request Profiling
+=========================
+Wraps selected requests in ``cProfile`` and keeps the results in a bounded
+ring of ``.prof`` files, so a latency regression can be profiled on the live
+service rather than reproduced locally.
+
+A request is profiled when:
+  - a random draw falls under ``PROFILE_SAMPLE_RATE`` (0 disables), or
+  - it carries ``X-Profile: <PROFILE_TOKEN>`` (only when a token is set).
+
+Environment:
+    PROFILE_SAMPLE_RATE   fraction of requests to profile, default 0
+    PROFILE_TOKEN         enables the header trigger and the debug routes;
+                          without it the routes refuse every request
+    PROFILE_DIR           ring directory, default <tmp>/quantara-profiles
+    PROFILE_KEEP          profiles kept (oldest deleted first), default 50
+
+The files are standard pstats dumps: ``python -m pstats``, snakeviz or
+flameprof open them directly. ``ProfileRing.stats_text`` renders the top
+functions as text, which is enough to see whether ``ta_utils`` or
+``compute_features`` dominates.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+HEADER = "X-Profile"
+
+# <epoch ms>_<pid>_<duration us>_<route slug>.prof
+_NAME_RE = re.compile(r"^(\d+)_(\d+)_(\d+)_([A-Za-z0-9_\-]*)\.prof$")
+
+
+class ProfileRing:
+    """
+    Directory holding at most ``keep`` profiles, newest first when listed.
+
+    Run metadata lives in the file name, so several gunicorn workers can
+    share one directory without a separate index.
+    """
+
+    def __init__(self, directory, keep: int = 50):
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+
+    def save(self, profile: cProfile.Profile, route: str, seconds: float) -> str:
+        """Write ``profile`` into the ring and return its file name."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        name = f"{int(time.time() * 1000)}_{os.getpid()}_{int(seconds * 1e6)}_{slug}.prof"
+        path = self.directory / name
+        tmp = path.with_suffix(".tmp")
+        profile.dump_stats(str(tmp))
+        os.replace(tmp, path)
+        self._trim()
+        return name
+
+    def _trim(self) -> None:
+        names = sorted(self._names(), reverse=True)
+        for name in names[self.keep:]:
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass  # another worker trimmed it first
+
+    def _names(self) -> List[str]:
+        return [p.name for p in self.directory.iterdir() if _NAME_RE.match(p.name)]
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Captured profiles, newest first."""
+        entries = []
+        for name in sorted(self._names(), reverse=True):
+            created_ms, pid, duration_us, route = _NAME_RE.match(name).groups()
+            try:
+                size = (self.directory / name).stat().st_size
+            except FileNotFoundError:
+                continue
+            entries.append({
+                "name": name,
+                "created": int(created_ms) / 1000.0,
+                "pid": int(pid),
+                "duration_ms": int(duration_us) / 1000.0,
+                "route": route,
+                "bytes": size,
+            })
+        return entries
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a captured profile, or None for unknown or unsafe names."""
+        if not _NAME_RE.match(name):
+            return None
+        path = self.directory / name
+        return path if path.exists() else None
+
+    def stats_text(self, name: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """The top ``limit`` functions of one profile as pstats text."""
+        path = self.path(name)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(str(path), stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and files the results.
+
+    Parameters
+    ----------
+    ring : ProfileRing
+    sample_rate : float
+        Fraction of requests profiled at random, 0 to 1.
+    token : str, optional
+        Secret that triggers profiling via the ``X-Profile`` header.
+    """
+
+    def __init__(self, ring: ProfileRing, sample_rate: float = 0.0, token: Optional[str] = None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.token = token or None
+
+    @classmethod
+    def from_env(cls) -> Optional["RequestProfiler"]:
+        """Profiler configured from ``PROFILE_*`` variables, or None when off."""
+        sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+        token = os.environ.get("PROFILE_TOKEN")
+        if sample_rate <= 0 and not token:
+            return None
+        directory = os.environ.get("PROFILE_DIR") or Path(tempfile.gettempdir()) / "quantara-profiles"
+        ring = ProfileRing(directory, keep=int(os.environ.get("PROFILE_KEEP", 50)))
+        return cls(ring, sample_rate=sample_rate, token=token)
+
+    def authorized(self, header_value: Optional[str]) -> bool:
+        """Whether a request may use the debug routes (never without a token)."""
+        if self.token is None or header_value is None:
+            return False
+        return hmac.compare_digest(header_value.encode(), self.token.encode())
+
+    def wants(self, header_value: Optional[str]) -> bool:
+        """Whether to profile a request carrying this ``X-Profile`` value."""
+        if self.authorized(header_value):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, route: str, seconds: float) -> str:
+        """Stop ``profile`` and save it; returns the ring file name."""
+        profile.disable()
+        return self.ring.save(profile, route, seconds)
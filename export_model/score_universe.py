@@ -0,0 +1,158 @@
+"""
+Whole-Universe Scoring Job
+===========================
+Scores every tracked token in one batch and writes a ranked leaderboard
+snapshot. ``app.py`` serves the snapshot at ``GET /leaderboard``, so feed
+and recommendation pages read one precomputed file instead of firing one
+inference per token.
+
+Run (e.g. from cron after the daily candle closes):
+    python score_universe.py --history-dir ./history [--bars 365]
+    python score_universe.py --input universe.json
+
+``universe.json`` holds ``{"series": [{"token": ..., "closes": [...],
+"volumes": [...], <optional /predict fields>}, ...]}``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from predictor import NexYpherPredictor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT = Path(__file__).parent / "leaderboard.json"
+
+# Fields copied from each prediction into the leaderboard
+ENTRY_FIELDS = ("prob_up_24h", "prob_up_7d", "verdict", "confidence", "direction")
+
+
+def load_universe_file(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        data = json.load(f)
+    series = data.get("series") if isinstance(data, dict) else None
+    if not isinstance(series, list):
+        raise ValueError(f"{path}: expected an object with a 'series' array")
+    return series
+
+
+def load_universe_store(history_dir: Path, bars: int) -> List[Dict[str, Any]]:
+    from history_store import HistoryStore
+
+    store = HistoryStore(history_dir)
+    series = []
+    for token in store.tokens():
+        window = store.window(token, bars)
+        series.append({"token": token, "closes": window["close"], "volumes": window["volume"]})
+    return series
+
+
+def score_universe(predictor: NexYpherPredictor, series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Score every series with one batched model call and rank the results.
+
+    Entries are ordered by ``prob_up_7d`` then ``prob_up_24h``, highest
+    first. Series that cannot be scored are listed under ``errors``.
+    """
+    results = predictor.predict_batch(series, features=False)
+
+    entries = []
+    errors = []
+    for item, result in zip(series, results):
+        token = str(item.get("token", ""))
+        if "error" in result:
+            errors.append({"token": token, "error": result["error"]})
+            continue
+        entry = {"token": token}
+        entry.update({key: result[key] for key in ENTRY_FIELDS})
+        entries.append(entry)
+
+    entries.sort(key=lambda e: (e["prob_up_7d"], e["prob_up_24h"]), reverse=True)
+    for rank, entry in enumerate(entries, start=1):
+        entry["rank"] = rank
+
+    return {
+        "generated_at": int(time.time()),
+        "model_version": predictor.metadata.get("version", "unknown"),
+        "count": len(entries),
+        "entries": entries,
+        "errors": errors,
+    }
+
+
+def write_snapshot(snapshot: Dict[str, Any], path: Path) -> None:
+    """Write atomically so readers never see a partial file."""
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class SnapshotReader:
+    """
+    Serves the snapshot as pre-encoded bytes.
+
+    The file is re-read only when its mtime changes, so a request costs one
+    ``stat`` plus returning the cached body.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._body: Optional[bytes] = None
+
+    def body(self) -> Optional[bytes]:
+        """The snapshot's JSON bytes, or None if no snapshot exists yet."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                self._body = self.path.read_bytes()
+                self._stamp = stamp
+            return self._body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the token universe into a leaderboard")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--history-dir", help="HistoryStore directory")
+    source.add_argument("--input", help="JSON file with a 'series' array")
+    parser.add_argument("--bars", type=int, default=365, help="bars per token from the store")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--output", default=str(DEFAULT_SNAPSHOT))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    predictor = NexYpherPredictor(args.models_dir)
+
+    t0 = time.perf_counter()
+    if args.history_dir:
+        series = load_universe_store(Path(args.history_dir), args.bars)
+    else:
+        series = load_universe_file(Path(args.input))
+    t1 = time.perf_counter()
+    snapshot = score_universe(predictor, series)
+    t2 = time.perf_counter()
+    write_snapshot(snapshot, Path(args.output))
+
+    print(
+        f"Scored {snapshot['count']} tokens ({len(snapshot['errors'])} errors): "
+        f"load {t1 - t0:.2f}s, score {t2 - t1:.2f}s -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
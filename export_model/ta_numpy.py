@@ -0,0 +1,210 @@
+"""
+Technical Analysis Utilities (NumPy backend)
+=============================================
+Vectorized versions of the indicators in ``ta_utils``. ``ta_utils`` picks
+these up automatically when NumPy is importable, so callers never import this
+module directly unless they want the ``*_array`` variants, which take and
+return ``numpy.ndarray`` instead of lists.
+
+Recurrences (EMA, Wilder smoothing) are evaluated block-wise: each block is
+solved in closed form with a cumulative sum and the blocks are chained with a
+short scalar loop. Rolling windows (SMA, Bollinger) use shifted cumulative
+sums, so every indicator costs O(n) regardless of the window length.
+
+Tolerance
+---------
+Results match the list implementations to ``rtol=1e-9`` for EMA, RSI and
+MACD, and to ``rtol=1e-7`` of the price scale for the Bollinger bands
+(rolling variance from cumulative sums loses a few more digits than the
+direct two-pass formula).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Largest factor a block's closed-form solution may grow by before it is
+# rescaled. 1e3 keeps the recurrence error around 1e-12 relative.
+_MAX_BLOCK_GROWTH = 1e3
+
+# Points per block when building rolling sums; bounds cumulative-sum drift.
+_ROLLING_BLOCK = 1024
+
+
+def _linear_filter(x: np.ndarray, a: float, b: float, y0: float) -> np.ndarray:
+    """Solve ``y[t] = a * y[t-1] + b * x[t]`` with ``y[-1] = y0``."""
+    m = len(x)
+    if m == 0:
+        return np.empty(0, dtype=np.float64)
+    if a <= 0.0:
+        return b * x
+
+    block = int(math.log(_MAX_BLOCK_GROWTH) / -math.log(a)) if a < 1.0 else m
+    block = max(1, min(block, m))
+    n_blocks = -(-m // block)
+
+    padded = np.zeros(n_blocks * block, dtype=np.float64)
+    padded[:m] = x
+    steps = np.arange(block, dtype=np.float64)
+    grow = a ** -steps
+    decay = a ** steps
+
+    # Zero-start solution inside every block, all blocks at once
+    local = np.cumsum(padded.reshape(n_blocks, block) * (b * grow), axis=1) * decay
+
+    # Chain blocks: each starts from the previous block's last value
+    carry_in = np.empty(n_blocks, dtype=np.float64)
+    a_block = a ** block
+    carry = y0
+    last = local[:, -1]
+    for k in range(n_blocks):
+        carry_in[k] = carry
+        carry = last[k] + a_block * carry
+
+    y = local + np.outer(carry_in, decay * a)
+    return y.reshape(-1)[:m]
+
+
+def _rolling_sums(x: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(mean, variance)`` of every full ``period`` window of ``x``."""
+    n_out = len(x) - period + 1
+    means = np.empty(n_out, dtype=np.float64)
+    variances = np.empty(n_out, dtype=np.float64)
+
+    for start in range(0, n_out, _ROLLING_BLOCK):
+        stop = min(start + _ROLLING_BLOCK, n_out)
+        chunk = x[start: stop + period - 1]
+        shift = chunk.mean()
+        centred = chunk - shift
+        c1 = np.concatenate(([0.0], np.cumsum(centred)))
+        c2 = np.concatenate(([0.0], np.cumsum(centred * centred)))
+        s1 = (c1[period:] - c1[:-period]) / period
+        s2 = (c2[period:] - c2[:-period]) / period
+        means[start:stop] = s1 + shift
+        variances[start:stop] = np.maximum(s2 - s1 * s1, 0.0)
+
+    return means, variances
+
+
+# ── EMA ─────────────────────────────────────────────────────────
+
+def ema_array(values: Sequence[float], period: int) -> np.ndarray:
+    """Compute a full EMA series as an array."""
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n == 0 or period <= 0:
+        return np.empty(0, dtype=np.float64)
+    if period > n:
+        period = n
+
+    k = 2.0 / (period + 1)
+    out = x.copy()
+    seed = float(x[:period].sum()) / period
+    out[period - 1] = seed
+    if n > period:
+        out[period:] = _linear_filter(x[period:], 1.0 - k, k, seed)
+    return out
+
+
+def ema_series(values: Sequence[float], period: int) -> List[float]:
+    """Compute a full EMA series."""
+    return ema_array(values, period).tolist()
+
+
+# ── RSI (Wilder-smoothed) ──────────────────────────────────────
+
+def rsi_array(closes: Sequence[float], period: int = 14) -> np.ndarray:
+    """Compute a full RSI series as an array using Wilder smoothing."""
+    x = np.asarray(closes, dtype=np.float64)
+    n = len(x)
+    if n < period + 1:
+        return np.full(n, 50.0)
+
+    delta = np.diff(x)
+    gains = np.maximum(delta, 0.0)
+    losses = np.maximum(-delta, 0.0)
+
+    a = (period - 1) / period
+    gain_seed = float(gains[:period].sum()) / period
+    loss_seed = float(losses[:period].sum()) / period
+    avg_gain = np.concatenate(([gain_seed], _linear_filter(gains[period:], a, 1.0 / period, gain_seed)))
+    avg_loss = np.concatenate(([loss_seed], _linear_filter(losses[period:], a, 1.0 / period, loss_seed)))
+
+    zero_loss = avg_loss == 0
+    rs = avg_gain / np.where(zero_loss, 1.0, avg_loss)
+    values = np.where(zero_loss, 100.0, 100.0 - (100.0 / (1.0 + rs)))
+
+    out = np.full(n, 50.0)
+    out[period:] = values
+    return out
+
+
+def rsi_series(closes: Sequence[float], period: int = 14) -> List[float]:
+    """Compute a full RSI series using Wilder smoothing."""
+    return rsi_array(closes, period).tolist()
+
+
+# ── MACD ────────────────────────────────────────────────────────
+
+def macd_arrays(
+    closes: Sequence[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute full MACD arrays. Returns (macd_line, signal_line, histogram)."""
+    x = np.asarray(closes, dtype=np.float64)
+    if len(x) < slow:
+        zeros = np.zeros(len(x))
+        return zeros, zeros.copy(), zeros.copy()
+
+    macd_line = ema_array(x, fast) - ema_array(x, slow)
+    sig_line = ema_array(macd_line, signal)
+    return macd_line, sig_line, macd_line - sig_line
+
+
+def macd_series(
+    closes: Sequence[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> Tuple[List[float], List[float], List[float]]:
+    """Compute full MACD series. Returns (macd_line, signal_line, histogram)."""
+    macd_line, sig_line, histogram = macd_arrays(closes, fast, slow, signal)
+    return macd_line.tolist(), sig_line.tolist(), histogram.tolist()
+
+
+# ── Bollinger Bands ─────────────────────────────────────────────
+
+def bollinger_arrays(
+    closes: Sequence[float],
+    period: int = 20,
+    std_mult: float = 2.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute Bollinger Band arrays. Returns (upper, middle, lower)."""
+    x = np.asarray(closes, dtype=np.float64)
+    upper = x.copy()
+    middle = x.copy()
+    lower = x.copy()
+    if period <= 0 or len(x) < period:
+        return upper, middle, lower
+
+    sma, variance = _rolling_sums(x, period)
+    std = np.sqrt(variance)
+    middle[period - 1:] = sma
+    upper[period - 1:] = sma + std_mult * std
+    lower[period - 1:] = sma - std_mult * std
+    return upper, middle, lower
+
+
+def bollinger_series(
+    closes: Sequence[float],
+    period: int = 20,
+    std_mult: float = 2.0,
+) -> Tuple[List[float], List[float], List[float]]:
+    """Compute Bollinger Bands. Returns (upper, middle, lower)."""
+    upper, middle, lower = bollinger_arrays(closes, period, std_mult)
+    return upper.tolist(), middle.tolist(), lower.tolist()
@@ -1,27 +1,45 @@
 """
 Technical Analysis Utilities (Standalone)
 ==========================================
-Dependency-free implementations of RSI, EMA, MACD, and Bollinger Bands.
-All functions operate on plain Python lists (no NumPy required).
+RSI, EMA, MACD, and Bollinger Bands, plus the streaming ``FeatureState``.
+Everything has a pure-Python implementation on plain lists, so the module
+works without NumPy.
+
+The series functions have two backends, chosen at import by ``TA_BACKEND``.
+By default (``auto``), ``ema_series``, ``rsi_series``, ``macd_series`` and
+``bollinger_series`` are served by the vectorized versions in ``ta_numpy``
+when NumPy is importable (same signatures, same list return types; see
+that module for tolerances). ``TA_BACKEND=python`` forces the list
+implementations. The list versions stay reachable as ``_ema_series_py``
+etc. and ``BACKEND`` names the active one.
 """
 
 from __future__ import annotations
 
 import math
-from typing import List, Tuple
+import os
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 
 
 # ── EMA ─────────────────────────────────────────────────────────
 
 def ema(values: List[float], period: int) -> float:
-    """Return the current (last) EMA value."""
+    """Return the current (last) EMA value without building the series."""
     if not values or period <= 0:
         return 0.0
-    series = ema_series(values, period)
-    return series[-1] if series else 0.0
+    n = len(values)
+    if period > n:
+        period = n
+
+    k = 2.0 / (period + 1)
+    value = sum(values[:period]) / period
+    for i in range(period, n):
+        value = values[i] * k + value * (1 - k)
+    return value
 
 
-def ema_series(values: List[float], period: int) -> List[float]:
+def _ema_series_py(values: List[float], period: int) -> List[float]:
     """Compute a full EMA series."""
     if not values or period <= 0:
         return []
@@ -41,7 +59,7 @@ def ema_series(values: List[float], period: int) -> List[float]:
 
 # ── RSI (Wilder-smoothed) ──────────────────────────────────────
 
-def rsi_series(closes: List[float], period: int = 14) -> List[float]:
+def _rsi_series_py(closes: List[float], period: int = 14) -> List[float]:
     """Compute a full RSI series using Wilder smoothing."""
     n = len(closes)
     if n < period + 1:
@@ -81,14 +99,34 @@ def rsi_series(closes: List[float], period: int = 14) -> List[float]:
 
 
 def rsi(closes: List[float], period: int = 14) -> float:
-    """Return the current (last) RSI value."""
-    series = rsi_series(closes, period)
-    return series[-1] if series else 50.0
+    """Return the current (last) RSI value without building the series."""
+    n = len(closes)
+    if n < period + 1:
+        return 50.0
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = closes[i] - closes[i - 1]
+        avg_gain += max(delta, 0.0)
+        avg_loss += max(-delta, 0.0)
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period + 1, n):
+        delta = closes[i] - closes[i - 1]
+        avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+
+    if avg_loss == 0:
+        return 100.0
+    rs = avg_gain / avg_loss
+    return 100.0 - (100.0 / (1.0 + rs))
 
 
 # ── MACD ────────────────────────────────────────────────────────
 
-def macd_series(
+def _macd_series_py(
     closes: List[float],
     fast: int = 12,
     slow: int = 26,
@@ -99,11 +137,11 @@ def macd_series(
         n = len(closes)
         return [0.0] * n, [0.0] * n, [0.0] * n
 
-    fast_ema = ema_series(closes, fast)
-    slow_ema = ema_series(closes, slow)
+    fast_ema = _ema_series_py(closes, fast)
+    slow_ema = _ema_series_py(closes, slow)
 
     macd_line = [f - s for f, s in zip(fast_ema, slow_ema)]
-    sig_line = ema_series(macd_line, signal)
+    sig_line = _ema_series_py(macd_line, signal)
     histogram = [m - s for m, s in zip(macd_line, sig_line)]
 
     return macd_line, sig_line, histogram
@@ -124,9 +162,56 @@ def macd(
     )
 
 
+def macd_tail(
+    closes: List[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> Tuple[float, float, float, float]:
+    """
+    Return (macd_line, signal_line, histogram, previous_histogram) at the
+    last bar in one pass, without building any series.
+    """
+    n = len(closes)
+    if n < slow:
+        return 0.0, 0.0, 0.0, 0.0
+
+    k_fast = 2.0 / (fast + 1)
+    k_slow = 2.0 / (slow + 1)
+    k_sig = 2.0 / (signal + 1)
+    fast_sum = slow_sum = sig_sum = 0.0
+    fast_ema = slow_ema = line = sig = 0.0
+    prev_hist = hist = 0.0
+
+    # Before its seed index an EMA series holds the raw input value
+    for i, close in enumerate(closes):
+        if i < fast:
+            fast_sum += close
+            fast_ema = fast_sum / fast if i == fast - 1 else close
+        else:
+            fast_ema = close * k_fast + fast_ema * (1 - k_fast)
+        if i < slow:
+            slow_sum += close
+            slow_ema = slow_sum / slow if i == slow - 1 else close
+        else:
+            slow_ema = close * k_slow + slow_ema * (1 - k_slow)
+
+        line = fast_ema - slow_ema
+        if i < signal:
+            sig_sum += line
+            sig = sig_sum / signal if i == signal - 1 else line
+        else:
+            sig = line * k_sig + sig * (1 - k_sig)
+
+        prev_hist = hist
+        hist = line - sig
+
+    return line, sig, hist, prev_hist
+
+
 # ── Bollinger Bands ─────────────────────────────────────────────
 
-def bollinger_series(
+def _bollinger_series_py(
     closes: List[float],
     period: int = 20,
     std_mult: float = 2.0,
@@ -149,6 +234,26 @@ def bollinger_series(
     return upper, middle, lower
 
 
+def bollinger_last(
+    closes: List[float],
+    period: int = 20,
+    std_mult: float = 2.0,
+) -> Tuple[float, float, float]:
+    """Return (upper, middle, lower) at the last bar using only the last window."""
+    n = len(closes)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    if n < period:
+        close = closes[-1]
+        return close, close, close
+
+    window = closes[n - period:]
+    sma = sum(window) / period
+    variance = sum((x - sma) ** 2 for x in window) / period
+    std = math.sqrt(variance)
+    return sma + std_mult * std, sma, sma - std_mult * std
+
+
 def bollinger_position(
     closes: List[float],
     period: int = 20,
@@ -164,3 +269,616 @@ def bollinger_position(
         else:
             result.append(0.5)
     return result
+
+
+# ── Feature assembly ────────────────────────────────────────────
+
+def assemble_features(
+    ind: Dict[str, float],
+    price_change_24h: Optional[float] = None,
+    price_change_7d: Optional[float] = None,
+    price_change_30d: Optional[float] = None,
+    volume_mcap_ratio: Optional[float] = None,
+    ath_change_pct: Optional[float] = None,
+    fear_greed_value: float = 50.0,
+) -> Dict[str, float]:
+    """
+    Build the 38 model features from last-bar indicator values.
+
+    ``ind`` holds the keys produced by the indicator passes in
+    ``feature_engine`` and by ``FeatureState.indicators()``.
+    """
+    close_i = ind["close"]
+
+    # MACD crossover (MACD is all zeros until the slow period, so a
+    # one-bar history can never register a cross)
+    macd_cross = 0.0
+    prev_diff = ind["macd_prev_hist"]
+    curr_diff = ind["macd_line"] - ind["macd_signal"]
+    if prev_diff <= 0 and curr_diff > 0:
+        macd_cross = 1.0
+    elif prev_diff >= 0 and curr_diff < 0:
+        macd_cross = -1.0
+
+    # Bollinger Bands
+    bb_mid = ind["bb_mid"]
+    bb_width_val = (ind["bb_upper"] - ind["bb_lower"]) / bb_mid if bb_mid > 0 else 0.0
+
+    # Moving averages
+    ema_50 = ind["ema_50"]
+    ema_200 = ind["ema_200"]
+    sma_20 = ind["sma_20"]
+    ema_9_21_cross = 1.0 if ind["ema_9"] > ind["ema_21"] else 0.0
+    ema_50_200_cross = 1.0 if ema_50 > ema_200 else 0.0
+    price_above_ema200 = 1.0 if close_i > ema_200 else 0.0
+
+    # Support / Resistance
+    support = ind["support"]
+    dist_support = (close_i - support) / support * 100 if support > 0 else 0.0
+    dist_resist = (ind["resist"] - close_i) / close_i * 100 if close_i > 0 else 0.0
+
+    # Market-data features (use provided values or fallback; momentum
+    # is already 0.0 while the history is shorter than its period)
+    mom_5 = ind["mom_5"]
+    mom_30 = ind["mom_30"]
+    if price_change_24h is None:
+        price_change_24h = mom_5 / 5.0
+    if price_change_7d is None:
+        price_change_7d = ind["mom_7"]
+    if price_change_30d is None:
+        price_change_30d = mom_30
+    if volume_mcap_ratio is None:
+        volume_mcap_ratio = ind["vol_ratio"] * 0.02
+    if ath_change_pct is None:
+        ath_change_pct = -50.0
+
+    # Engineered features
+    rsi_7 = ind["rsi_7"]
+    rsi_14 = ind["rsi_14"]
+    rsi_21 = ind["rsi_21"]
+    rsi_avg = (rsi_7 + rsi_14 + rsi_21) / 3.0
+    rsi_14_ma_diff = rsi_14 - rsi_avg
+    rsi_oversold = 1.0 if rsi_14 < 30 else 0.0
+    rsi_overbought = 1.0 if rsi_14 > 70 else 0.0
+
+    close = close_i if close_i > 0 else 1.0
+    price_vs_sma20 = (close - sma_20) / sma_20 * 100 if sma_20 > 0 else 0.0
+    price_vs_ema50 = (close - ema_50) / ema_50 * 100 if ema_50 > 0 else 0.0
+    price_vs_ema200 = (close - ema_200) / ema_200 * 100 if ema_200 > 0 else 0.0
+
+    vol_10 = ind["vol_10"]
+    vol_30 = ind["vol_30"]
+    v10 = vol_10 if vol_10 > 0 else 1e-9
+    v30 = vol_30 if vol_30 > 0 else 1e-9
+    vol_ratio_10_30 = v10 / v30
+
+    mom_accel = mom_5 - ind["mom_10"]
+
+    if ema_50 > ema_200 and close_i > ema_50:
+        trend_enc = 1.0
+    elif ema_50 < ema_200 and close_i < ema_50:
+        trend_enc = -1.0
+    else:
+        trend_enc = 0.0
+
+    return {
+        "rsi_7": rsi_7,
+        "rsi_14": rsi_14,
+        "rsi_21": rsi_21,
+        "macd_line": ind["macd_line"],
+        "macd_signal": ind["macd_signal"],
+        "macd_histogram": ind["macd_hist"],
+        "macd_crossover": macd_cross,
+        "bb_width": bb_width_val,
+        "bb_position": ind["bb_pos"],
+        "ema_9_21_cross": ema_9_21_cross,
+        "ema_50_200_cross": ema_50_200_cross,
+        "price_above_ema200": price_above_ema200,
+        "volume_ratio": ind["vol_ratio"],
+        "volume_spike": ind["vol_spike"],
+        "price_momentum_5d": mom_5,
+        "price_momentum_10d": ind["mom_10"],
+        "price_momentum_30d": mom_30,
+        "rate_of_change_14": ind["roc_14"],
+        "atr_14": ind["atr_14"],
+        "volatility_10d": vol_10,
+        "volatility_30d": vol_30,
+        "dist_to_support_pct": dist_support,
+        "dist_to_resist_pct": dist_resist,
+        "price_change_24h": price_change_24h,
+        "price_change_7d": price_change_7d,
+        "price_change_30d": price_change_30d,
+        "volume_mcap_ratio": volume_mcap_ratio,
+        "ath_change_pct": ath_change_pct,
+        "rsi_14_ma_diff": rsi_14_ma_diff,
+        "rsi_oversold": rsi_oversold,
+        "rsi_overbought": rsi_overbought,
+        "price_vs_sma20_pct": price_vs_sma20,
+        "price_vs_ema50_pct": price_vs_ema50,
+        "price_vs_ema200_pct": price_vs_ema200,
+        "vol_ratio_10_30": vol_ratio_10_30,
+        "momentum_accel": mom_accel,
+        "fear_greed_value": fear_greed_value,
+        "trend_encoded": trend_enc,
+    }
+
+
+# ── Streaming state ─────────────────────────────────────────────
+#
+# Incremental versions of the indicators above for live candles. Each
+# ``update`` is O(1) (amortized for the rolling window) and every state can
+# be saved with ``to_dict()`` and restored with ``from_dict()``; the dicts
+# are JSON-serializable.
+#
+# EMA, RSI, MACD and ATR reproduce the list implementations exactly.
+# Rolling mean/std use sliding sums and agree with the two-pass formulas to
+# about 1e-12 relative; min/max are exact.
+
+
+class _State:
+    """Shared save/restore plumbing for the streaming states."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of this state."""
+        out: Dict[str, Any] = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _State):
+                value = value.to_dict()
+            elif isinstance(value, deque):
+                value = [list(v) if isinstance(v, tuple) else v for v in value]
+            out[name] = value
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Rebuild a state from ``to_dict()`` output."""
+        state = cls.__new__(cls)
+        state._restore(data)
+        return state
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        for name in self.__slots__:
+            setattr(self, name, data[name])
+
+    def copy(self):
+        """Return an independent copy of this state."""
+        # Deques only hold floats and (index, value) tuples, so shallow
+        # deque copies are independent; much cheaper than a to_dict round trip
+        state = self.__class__.__new__(self.__class__)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _State):
+                value = value.copy()
+            elif isinstance(value, deque):
+                value = value.copy()
+            setattr(state, name, value)
+        return state
+
+
+class EMAState(_State):
+    """
+    Streaming EMA.
+
+    ``value`` follows ``ema()`` on the history so far: while fewer than
+    ``period`` values have arrived it is their mean. With ``raw_warmup`` it
+    follows ``ema_series()`` instead, which holds the raw input until the
+    seed index (this is what MACD builds on).
+    """
+
+    __slots__ = ("period", "raw_warmup", "count", "seed_sum", "value")
+
+    def __init__(self, period: int, raw_warmup: bool = False):
+        self.period = period
+        self.raw_warmup = raw_warmup
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = 0.0
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += x
+            self.value = x if self.raw_warmup else self.seed_sum / self.count
+        elif self.count == self.period:
+            self.seed_sum += x
+            self.value = self.seed_sum / self.period
+        else:
+            k = 2.0 / (self.period + 1)
+            self.value = x * k + self.value * (1 - k)
+        return self.value
+
+
+class WilderRSIState(_State):
+    """Streaming RSI with Wilder smoothing; matches ``rsi()``."""
+
+    __slots__ = ("period", "count", "prev_close", "avg_gain", "avg_loss")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_close = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        self.count += 1
+        if self.count > 1:
+            delta = close - self.prev_close
+            gain = max(delta, 0.0)
+            loss = max(-delta, 0.0)
+            period = self.period
+            if self.count <= period + 1:
+                self.avg_gain += gain
+                self.avg_loss += loss
+                if self.count == period + 1:
+                    self.avg_gain /= period
+                    self.avg_loss /= period
+            else:
+                self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+                self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period + 1:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        rs = self.avg_gain / self.avg_loss
+        return 100.0 - (100.0 / (1.0 + rs))
+
+
+class MACDState(_State):
+    """Streaming MACD; ``value`` matches ``macd_tail()``."""
+
+    __slots__ = ("slow", "count", "fast_ema", "slow_ema", "signal_ema", "hist", "prev_hist")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.slow = slow
+        self.count = 0
+        self.fast_ema = EMAState(fast, raw_warmup=True)
+        self.slow_ema = EMAState(slow, raw_warmup=True)
+        self.signal_ema = EMAState(signal, raw_warmup=True)
+        self.hist = 0.0
+        self.prev_hist = 0.0
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        super()._restore(data)
+        self.fast_ema = EMAState.from_dict(data["fast_ema"])
+        self.slow_ema = EMAState.from_dict(data["slow_ema"])
+        self.signal_ema = EMAState.from_dict(data["signal_ema"])
+
+    def update(self, close: float) -> Tuple[float, float, float, float]:
+        self.count += 1
+        line = self.fast_ema.update(close) - self.slow_ema.update(close)
+        sig = self.signal_ema.update(line)
+        self.prev_hist = self.hist
+        self.hist = line - sig
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float, float]:
+        """(macd_line, signal_line, histogram, previous_histogram)."""
+        if self.count < self.slow:
+            return 0.0, 0.0, 0.0, 0.0
+        line = self.fast_ema.value - self.slow_ema.value
+        return line, self.signal_ema.value, self.hist, self.prev_hist
+
+
+class RollingWindowStats(_State):
+    """
+    Fixed-size sliding window with O(1) mean/std and amortized O(1) min/max.
+
+    The mean and population variance are updated with a sliding Welford
+    step and recomputed exactly every ``_RESYNC_EVERY`` updates so rounding
+    drift cannot accumulate on long-running streams.
+    """
+
+    __slots__ = ("period", "window", "mean", "m2", "since_resync", "index", "min_q", "max_q")
+
+    _RESYNC_EVERY = 512
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window: deque = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.since_resync = 0
+        self.index = 0
+        self.min_q: deque = deque()  # (index, value), values increasing
+        self.max_q: deque = deque()  # (index, value), values decreasing
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        super()._restore(data)
+        self.window = deque(data["window"])
+        self.min_q = deque(tuple(v) for v in data["min_q"])
+        self.max_q = deque(tuple(v) for v in data["max_q"])
+
+    def update(self, x: float) -> None:
+        window = self.window
+        window.append(x)
+        if len(window) > self.period:
+            old = window.popleft()
+            new_mean = self.mean + (x - old) / self.period
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            delta = x - self.mean
+            self.mean += delta / len(window)
+            self.m2 += delta * (x - self.mean)
+
+        self.since_resync += 1
+        if self.since_resync >= self._RESYNC_EVERY:
+            self._resync()
+
+        idx = self.index
+        self.index += 1
+        start = idx - self.period + 1
+        while self.min_q and self.min_q[-1][1] >= x:
+            self.min_q.pop()
+        self.min_q.append((idx, x))
+        while self.min_q[0][0] < start:
+            self.min_q.popleft()
+        while self.max_q and self.max_q[-1][1] <= x:
+            self.max_q.pop()
+        self.max_q.append((idx, x))
+        while self.max_q[0][0] < start:
+            self.max_q.popleft()
+
+    def _resync(self) -> None:
+        n = len(self.window)
+        self.mean = sum(self.window) / n
+        self.m2 = sum((v - self.mean) ** 2 for v in self.window)
+        self.since_resync = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def std(self) -> float:
+        n = len(self.window)
+        return math.sqrt(max(self.m2, 0.0) / n) if n else 0.0
+
+    @property
+    def min(self) -> float:
+        return self.min_q[0][1]
+
+    @property
+    def max(self) -> float:
+        return self.max_q[0][1]
+
+
+class ATRState(_State):
+    """Streaming close-to-close ATR with Wilder smoothing."""
+
+    __slots__ = ("period", "count", "prev_close", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_close = 0.0
+        self.value = 0.0
+
+    def update(self, close: float) -> float:
+        self.count += 1
+        if self.count > 1:
+            tr = abs(close - self.prev_close)
+            period = self.period
+            if self.count <= period + 1:
+                self.value += tr
+                if self.count == period + 1:
+                    self.value /= period
+            else:
+                self.value = (self.value * (period - 1) + tr) / period
+        self.prev_close = close
+        return self.value if self.count > self.period else 0.0
+
+
+class FeatureState(_State):
+    """
+    Per-token streaming state for the 38 model features.
+
+    Feed one candle at a time with ``update(close, volume)``; ``features()``
+    then returns what ``NexYpherPredictor.compute_features`` would return for
+    the whole history seen so far.
+    """
+
+    __slots__ = (
+        "count", "close", "recent_closes",
+        "rsi_7", "rsi_14", "rsi_21", "macd",
+        "ema_9", "ema_21", "ema_50", "ema_200",
+        "closes_20", "prev_closes_20", "prev_volumes_20",
+        "returns_10", "returns_30", "atr_14", "vol_ratio",
+    )
+
+    _STATE_TYPES = {
+        "rsi_7": WilderRSIState,
+        "rsi_14": WilderRSIState,
+        "rsi_21": WilderRSIState,
+        "macd": MACDState,
+        "ema_9": EMAState,
+        "ema_21": EMAState,
+        "ema_50": EMAState,
+        "ema_200": EMAState,
+        "closes_20": RollingWindowStats,
+        "prev_closes_20": RollingWindowStats,
+        "prev_volumes_20": RollingWindowStats,
+        "returns_10": RollingWindowStats,
+        "returns_30": RollingWindowStats,
+        "atr_14": ATRState,
+    }
+
+    def __init__(self):
+        self.count = 0
+        self.close = 0.0
+        self.recent_closes: deque = deque(maxlen=31)
+        self.rsi_7 = WilderRSIState(7)
+        self.rsi_14 = WilderRSIState(14)
+        self.rsi_21 = WilderRSIState(21)
+        self.macd = MACDState(12, 26, 9)
+        self.ema_9 = EMAState(9)
+        self.ema_21 = EMAState(21)
+        self.ema_50 = EMAState(50)
+        self.ema_200 = EMAState(200)
+        self.closes_20 = RollingWindowStats(20)
+        self.prev_closes_20 = RollingWindowStats(20)
+        self.prev_volumes_20 = RollingWindowStats(20)
+        self.returns_10 = RollingWindowStats(10)
+        self.returns_30 = RollingWindowStats(30)
+        self.atr_14 = ATRState(14)
+        self.vol_ratio = 1.0
+
+    @classmethod
+    def from_history(cls, closes: List[float], volumes: List[float]) -> "FeatureState":
+        """Warm a new state up from a full close/volume history."""
+        state = cls()
+        for close, volume in zip(closes, volumes):
+            state.update(close, volume)
+        return state
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        super()._restore(data)
+        self.recent_closes = deque(data["recent_closes"], maxlen=31)
+        for name, state_type in self._STATE_TYPES.items():
+            setattr(self, name, state_type.from_dict(data[name]))
+
+    def update(self, close: float, volume: float) -> None:
+        """Consume one candle."""
+        if self.count > 0:
+            # Windows that end at the previous bar
+            self.prev_closes_20.update(self.close)
+            prev = self.close
+            ret = (close - prev) / prev if prev > 0 else 0.0
+            self.returns_10.update(ret)
+            self.returns_30.update(ret)
+
+        volumes = self.prev_volumes_20
+        if volumes.full:
+            ma = volumes.mean
+            self.vol_ratio = volume / ma if ma > 0 else 1.0
+        else:
+            self.vol_ratio = 1.0
+        volumes.update(volume)
+
+        self.count += 1
+        self.close = close
+        self.recent_closes.append(close)
+        self.rsi_7.update(close)
+        self.rsi_14.update(close)
+        self.rsi_21.update(close)
+        self.macd.update(close)
+        self.ema_9.update(close)
+        self.ema_21.update(close)
+        self.ema_50.update(close)
+        self.ema_200.update(close)
+        self.closes_20.update(close)
+        self.atr_14.update(close)
+
+    def _momentum(self, period: int) -> float:
+        if self.count <= period:
+            return 0.0
+        base = self.recent_closes[-1 - period]
+        if base <= 0:
+            return 0.0
+        return (self.close / base - 1.0) * 100.0
+
+    def indicators(self) -> Dict[str, float]:
+        """Last-bar indicator values, keyed like ``assemble_features`` expects."""
+        if self.count == 0:
+            raise ValueError("FeatureState has not seen any candles")
+
+        close = self.close
+        macd_line, macd_signal, macd_hist, macd_prev_hist = self.macd.value
+
+        window = self.closes_20
+        if window.full:
+            bb_mid = window.mean
+            std = window.std
+            bb_upper = bb_mid + 2.0 * std
+            bb_lower = bb_mid - 2.0 * std
+        else:
+            bb_upper = bb_mid = bb_lower = close
+        band_width = bb_upper - bb_lower
+
+        if self.prev_closes_20.full:
+            support = self.prev_closes_20.min
+            resist = self.prev_closes_20.max
+        else:
+            support = resist = close
+
+        i = self.count - 1
+        return {
+            "close": close,
+            "rsi_7": self.rsi_7.value,
+            "rsi_14": self.rsi_14.value,
+            "rsi_21": self.rsi_21.value,
+            "macd_line": macd_line,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "macd_prev_hist": macd_prev_hist,
+            "bb_upper": bb_upper,
+            "bb_mid": bb_mid,
+            "bb_lower": bb_lower,
+            "bb_pos": (close - bb_lower) / band_width if band_width > 0 else 0.5,
+            "ema_9": self.ema_9.value,
+            "ema_21": self.ema_21.value,
+            "ema_50": self.ema_50.value,
+            "ema_200": self.ema_200.value,
+            "sma_20": bb_mid,
+            "vol_ratio": self.vol_ratio,
+            "vol_spike": 1.0 if self.vol_ratio > 2.0 else 0.0,
+            "mom_5": self._momentum(5),
+            "mom_7": self._momentum(7),
+            "mom_10": self._momentum(10),
+            "mom_30": self._momentum(30),
+            "roc_14": self._momentum(14),
+            "atr_14": self.atr_14.value if self.atr_14.count > self.atr_14.period else 0.0,
+            "vol_10": self.returns_10.std if i >= 10 else 0.0,
+            "vol_30": self.returns_30.std if i >= 30 else 0.0,
+            "support": support,
+            "resist": resist,
+        }
+
+    def features(
+        self,
+        price_change_24h: Optional[float] = None,
+        price_change_7d: Optional[float] = None,
+        price_change_30d: Optional[float] = None,
+        volume_mcap_ratio: Optional[float] = None,
+        ath_change_pct: Optional[float] = None,
+        fear_greed_value: float = 50.0,
+    ) -> Dict[str, float]:
+        """Return the 38 model features for the history seen so far."""
+        return assemble_features(
+            self.indicators(),
+            price_change_24h, price_change_7d, price_change_30d,
+            volume_mcap_ratio, ath_change_pct, fear_greed_value,
+        )
+
+
+# ── Backend selection ───────────────────────────────────────────
+
+_ta_numpy = None
+if os.environ.get("TA_BACKEND", "auto").lower() != "python":
+    try:
+        import ta_numpy as _ta_numpy
+    except ImportError:
+        _ta_numpy = None
+
+if _ta_numpy is not None:
+    BACKEND = "numpy"
+    ema_series = _ta_numpy.ema_series
+    rsi_series = _ta_numpy.rsi_series
+    macd_series = _ta_numpy.macd_series
+    bollinger_series = _ta_numpy.bollinger_series
+else:
+    BACKEND = "python"
+    ema_series = _ema_series_py
+    rsi_series = _rsi_series_py
+    macd_series = _macd_series_py
+    bollinger_series = _bollinger_series_py
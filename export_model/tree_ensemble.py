@@ -0,0 +1,321 @@
+"""
+Compiled Tree Ensembles (NumPy-only inference)
+===============================================
+Flattens each XGBoost booster into padded NumPy arrays (split feature,
+threshold, left/right child, default direction, leaf value) and scores
+batches with a vectorized evaluator: every row advances through every tree
+one level at a time, so a depth-6 ensemble takes six array steps no matter
+how many trees or rows there are.
+
+Serving with compiled models needs NumPy only -- no xgboost, scikit-learn or
+joblib. Probabilities match ``predict_proba`` to within 1e-6.
+
+Compile (once per model release, next to the .pkl or native files):
+    python tree_ensemble.py [--models-dir ./models] [--if-present]
+
+``--if-present`` skips (exit 0) when there is no complete set to compile.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+import native_models
+from native_models import LABEL_ENCODER_STEM, MODEL_STEMS, NativeLabelEncoder
+
+MANIFEST_NAME = "compiled_manifest.json"
+
+# Rows scored per step; bounds the (rows x trees) working arrays
+_ROW_CHUNK = 256
+
+
+class CompiledEnsemble:
+    """
+    A gradient-boosted tree ensemble as flat arrays.
+
+    Node arrays have shape (n_trees, max_nodes). Leaves point to themselves
+    and carry their value in ``leaf_value``, so advancing past a leaf is a
+    no-op and the evaluator needs no per-row branching.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        leaf_value: np.ndarray,
+        tree_class: np.ndarray,
+        base_margin: np.ndarray,
+        depth: int,
+        objective: str,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.tree_class = tree_class
+        self.base_margin = base_margin
+        self.depth = depth
+        self.objective = objective
+        self.n_classes = len(base_margin) if objective.startswith("multi:") else 2
+
+    # ── Compilation ──────────────────────────────────────────────
+
+    @classmethod
+    def from_booster(cls, booster) -> "CompiledEnsemble":
+        """Compile an ``xgboost.Booster`` (only needed at compile time)."""
+        return cls.from_json_model(json.loads(booster.save_raw("json")))
+
+    @classmethod
+    def from_json_model(cls, model: Dict[str, Any]) -> "CompiledEnsemble":
+        """Compile XGBoost's JSON model schema."""
+        learner = model["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in ("binary:logistic", "multi:softprob", "multi:softmax"):
+            raise ValueError(f"Unsupported objective: {objective}")
+        booster = learner["gradient_booster"]
+        if booster["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {booster['name']}")
+
+        trees = booster["model"]["trees"]
+        n_trees = len(trees)
+        max_nodes = max(len(t["left_children"]) for t in trees)
+
+        feature = np.zeros((n_trees, max_nodes), dtype=np.int32)
+        threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+        left = np.zeros((n_trees, max_nodes), dtype=np.int32)
+        right = np.zeros((n_trees, max_nodes), dtype=np.int32)
+        default_left = np.zeros((n_trees, max_nodes), dtype=bool)
+        leaf_value = np.zeros((n_trees, max_nodes), dtype=np.float32)
+        depth = 0
+
+        for t, tree in enumerate(trees):
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported")
+            lc = np.asarray(tree["left_children"], dtype=np.int32)
+            rc = np.asarray(tree["right_children"], dtype=np.int32)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            n = len(lc)
+            nodes = np.arange(n, dtype=np.int32)
+            is_leaf = lc == -1
+
+            feature[t, :n] = np.where(is_leaf, 0, tree["split_indices"])
+            threshold[t, :n] = np.where(is_leaf, 0.0, cond)
+            left[t, :n] = np.where(is_leaf, nodes, lc)
+            right[t, :n] = np.where(is_leaf, nodes, rc)
+            default_left[t, :n] = np.asarray(tree["default_left"], dtype=bool)
+            leaf_value[t, :n] = np.where(is_leaf, cond, 0.0)
+            depth = max(depth, _tree_depth(lc, rc))
+
+        base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+        if objective == "binary:logistic":
+            p = float(base_score[0])
+            base_margin = np.array([math.log(p / (1.0 - p))])
+        else:
+            n_class = int(learner["learner_model_param"]["num_class"])
+            base_margin = np.resize(base_score, n_class).astype(np.float64)
+
+        tree_class = np.asarray(booster["model"]["tree_info"], dtype=np.int32)
+        return cls(
+            feature, threshold, left, right, default_left, leaf_value,
+            tree_class, base_margin, depth, objective,
+        )
+
+    # ── Persistence ──────────────────────────────────────────────
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            leaf_value=self.leaf_value,
+            tree_class=self.tree_class,
+            base_margin=self.base_margin,
+            depth=np.array(self.depth),
+            objective=np.array(self.objective),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledEnsemble":
+        with np.load(path) as data:
+            return cls(
+                data["feature"], data["threshold"], data["left"], data["right"],
+                data["default_left"], data["leaf_value"], data["tree_class"],
+                data["base_margin"], int(data["depth"]), str(data["objective"]),
+            )
+
+    # ── Evaluation ───────────────────────────────────────────────
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree leaf value for every row: shape (rows, n_trees)."""
+        n_rows, n_cols = X.shape
+        n_trees, max_nodes = self.feature.shape
+        feature = self.feature.ravel()
+        threshold = self.threshold.ravel()
+        left = self.left.ravel()
+        right = self.right.ravel()
+        default_left = self.default_left.ravel()
+
+        # Flat node ids: tree t's root is t * max_nodes, children are offset
+        # the same way, so each level is a handful of 1-D gathers
+        tree_base = np.arange(n_trees, dtype=np.int64) * max_nodes
+        row_base = (np.arange(n_rows, dtype=np.int64) * n_cols)[:, None]
+        x_flat = X.ravel()
+        node = np.broadcast_to(tree_base, (n_rows, n_trees)).copy()
+
+        for _ in range(self.depth):
+            x = x_flat.take(row_base + feature.take(node))
+            go_left = x < threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, default_left.take(node), go_left)
+            node = tree_base + np.where(go_left, left.take(node), right.take(node))
+
+        return self.leaf_value.ravel().take(node)
+
+    def margin(self, X) -> np.ndarray:
+        """Raw margins: shape (rows,) for binary, (rows, n_classes) otherwise."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = []
+        for start in range(0, X.shape[0], _ROW_CHUNK):
+            leaves = self.leaf_values(X[start: start + _ROW_CHUNK]).astype(np.float64)
+            if self.n_classes == 2:
+                out.append(leaves.sum(axis=1) + self.base_margin[0])
+            else:
+                per_class = np.stack(
+                    [leaves[:, self.tree_class == k].sum(axis=1) for k in range(self.n_classes)],
+                    axis=1,
+                )
+                out.append(per_class + self.base_margin)
+        return np.concatenate(out) if out else np.empty(0)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, shaped like the sklearn wrapper's output."""
+        margin = self.margin(X)
+        if self.n_classes == 2:
+            p = 1.0 / (1.0 + np.exp(-margin))
+            return np.column_stack([1.0 - p, p])
+        shifted = np.exp(margin - margin.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, d = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, d)
+        else:
+            stack.append((int(left[node]), d + 1))
+            stack.append((int(right[node]), d + 1))
+    return depth
+
+
+def _parse_base_score(raw) -> np.ndarray:
+    """XGBoost stores base_score as "0.5" or, since 2.x, "[5E-1,...]"."""
+    if isinstance(raw, (int, float)):
+        return np.array([float(raw)])
+    values = str(raw).strip("[]").split(",")
+    return np.array([float(v) for v in values])
+
+
+# ── Model set compile / load ────────────────────────────────────
+
+def has_compiled(models_dir: Path) -> bool:
+    """True if ``models_dir`` holds a compiled model set."""
+    return (Path(models_dir) / MANIFEST_NAME).exists()
+
+
+def compile_models(models_dir: Path) -> Path:
+    """Compile the model set in ``models_dir`` (native files or .pkl)."""
+    models_dir = Path(models_dir)
+    if native_models.has_native(models_dir):
+        import xgboost
+
+        with open(models_dir / native_models.MANIFEST_NAME) as f:
+            native_manifest = json.load(f)
+        boosters = {
+            name: xgboost.Booster(model_file=str(models_dir / entry["path"]))
+            for name, entry in native_manifest["models"].items()
+        }
+        classes: List[str] = native_manifest["label_classes"]
+    else:
+        import joblib
+
+        boosters = {
+            name: joblib.load(models_dir / f"{stem}.pkl").get_booster()
+            for name, stem in MODEL_STEMS.items()
+        }
+        label_encoder = joblib.load(models_dir / f"{LABEL_ENCODER_STEM}.pkl")
+        classes = [str(c) for c in label_encoder.classes_]
+
+    manifest: Dict[str, Any] = {"models": {}, "label_classes": classes}
+    for name, booster in boosters.items():
+        path = models_dir / f"{MODEL_STEMS[name]}.npz"
+        CompiledEnsemble.from_booster(booster).save(path)
+        manifest["models"][name] = {"path": path.name}
+
+    manifest_path = models_dir / MANIFEST_NAME
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def load_compiled(models_dir: Path) -> Dict[str, Any]:
+    """
+    Load a compiled model set with NumPy only.
+
+    Returns a dict with ``model_24h``, ``model_7d``, ``model_dir`` and
+    ``label_encoder`` entries, matching the other loaders.
+    """
+    models_dir = Path(models_dir)
+    with open(models_dir / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+
+    loaded: Dict[str, Any] = {}
+    for name, entry in manifest["models"].items():
+        path = models_dir / entry["path"]
+        if not path.exists():
+            raise FileNotFoundError(f"Model file missing: {path}")
+        loaded[name] = CompiledEnsemble.load(path)
+
+    loaded["label_encoder"] = NativeLabelEncoder(manifest["label_classes"])
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile XGBoost models to NumPy arrays")
+    parser.add_argument("--models-dir", default=str(Path(__file__).parent / "models"))
+    parser.add_argument("--if-present", action="store_true",
+                        help="skip instead of failing when the model set is incomplete")
+    args = parser.parse_args()
+
+    models_dir = Path(args.models_dir)
+    if args.if_present and not native_models.has_native(models_dir):
+        missing = native_models.missing_pickles(models_dir)
+        if missing:
+            print(f"Skipping compile; missing: {', '.join(p.name for p in missing)}")
+            return
+
+    manifest_path = compile_models(models_dir)
+    print(f"Compiled models written; manifest at {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Binary Series Wire Format
+==========================
+Compact alternative to JSON for ``/predict`` and ``/predict/batch``, sent
+with ``Content-Type: application/x-quantara-series``. Every number is a
+little-endian float64 laid out column by column, so the server reads the
+request with ``np.frombuffer`` and never builds per-value Python objects.
+
+Layout (all little-endian, offsets in bytes)::
+
+    header    16   magic b"QSR1", n_series u32, n_context u32 (= 6), reserved u32
+    lengths   4*n  bars per series (u32), zero-padded to a multiple of 8
+    context   8*6n per series: price_change_24h, price_change_7d,
+                   price_change_30d, volume_mcap_ratio, ath_change_pct,
+                   fear_greed_value (NaN = not provided)
+    closes    8*N  every series' closes back to back (N = sum of lengths)
+    volumes   8*N  every series' volumes, same order
+
+``decode_series`` returns the same item dicts the JSON routes build, with
+``closes``/``volumes`` as read-only array views into the request body.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+CONTENT_TYPE = "application/x-quantara-series"
+
+MAGIC = b"QSR1"
+_HEADER = struct.Struct("<4sIII")
+
+CONTEXT_FIELDS = (
+    "price_change_24h",
+    "price_change_7d",
+    "price_change_30d",
+    "volume_mcap_ratio",
+    "ath_change_pct",
+    "fear_greed_value",
+)
+
+_F64 = np.dtype("<f8")
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def decode_series(body) -> List[Dict[str, Any]]:
+    """
+    Parse a binary request body without copying the price data.
+
+    Raises ``ValueError`` on a malformed body.
+    """
+    buf = memoryview(body)
+    if len(buf) < _HEADER.size:
+        raise ValueError("Binary body too short for header")
+    magic, n_series, n_context, _ = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError("Bad binary body magic (expected QSR1)")
+    if n_context != len(CONTEXT_FIELDS):
+        raise ValueError(f"Expected {len(CONTEXT_FIELDS)} context fields, got {n_context}")
+
+    offset = _HEADER.size
+    lengths_end = offset + 4 * n_series
+    if len(buf) < lengths_end:
+        raise ValueError("Binary body too short for series lengths")
+    lengths = np.frombuffer(buf, dtype="<u4", count=n_series, offset=offset).astype(np.int64)
+    offset = _pad8(lengths_end)
+
+    total = int(lengths.sum())
+    expected = offset + 8 * (n_series * n_context + 2 * total)
+    if len(buf) != expected:
+        raise ValueError(f"Binary body is {len(buf)} bytes, header implies {expected}")
+
+    context = np.frombuffer(buf, dtype=_F64, count=n_series * n_context, offset=offset)
+    context = context.reshape(n_series, n_context)
+    offset += 8 * n_series * n_context
+    closes = np.frombuffer(buf, dtype=_F64, count=total, offset=offset)
+    volumes = np.frombuffer(buf, dtype=_F64, count=total, offset=offset + 8 * total)
+
+    items: List[Dict[str, Any]] = []
+    bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+    for k in range(n_series):
+        start, stop = bounds[k], bounds[k + 1]
+        item: Dict[str, Any] = {"closes": closes[start:stop], "volumes": volumes[start:stop]}
+        for name, value in zip(CONTEXT_FIELDS, context[k].tolist()):
+            if not math.isnan(value):
+                item[name] = value
+        items.append(item)
+    return items
+
+
+def encode_series(series: Sequence[Dict[str, Any]]) -> bytes:
+    """Build a binary request body (for clients, tests and benchmarks)."""
+    closes = [np.asarray(item["closes"], dtype=_F64) for item in series]
+    volumes = [np.asarray(item["volumes"], dtype=_F64) for item in series]
+    for c, v in zip(closes, volumes):
+        if len(c) != len(v):
+            raise ValueError("closes and volumes must have the same length")
+
+    lengths = np.array([len(c) for c in closes], dtype="<u4")
+    context = np.array(
+        [
+            [np.nan if item.get(name) is None else float(item[name]) for name in CONTEXT_FIELDS]
+            for item in series
+        ],
+        dtype=_F64,
+    ).reshape(len(series), len(CONTEXT_FIELDS))
+
+    header = _HEADER.pack(MAGIC, len(series), len(CONTEXT_FIELDS), 0)
+    lengths_bytes = lengths.tobytes()
+    padding = b"\0" * (_pad8(_HEADER.size + len(lengths_bytes)) - _HEADER.size - len(lengths_bytes))
+    empty = np.empty(0, dtype=_F64)
+    return b"".join([
+        header,
+        lengths_bytes,
+        padding,
+        context.tobytes(),
+        np.concatenate(closes or [empty]).tobytes(),
+        np.concatenate(volumes or [empty]).tobytes(),
+    ])
@@ -6,27 +6,49 @@ Serves on http://localhost:3001/api/predict
 
 This mirrors the Vercel serverless function locally.
 The Vite dev proxy forwards /api/predict -> http://localhost:3001/api/predict.
+
+Environment:
+    ML_PORT        - port (default 3001)
+    ML_SERVER_MODE - "threaded" (default): one thread per request, so a slow
+                     request no longer blocks the others; "single": the old
+                     one-request-at-a-time server
+    ML_NTHREAD     - threads each XGBoost call may use (default: xgboost's)
+    MODELS_DIR     - model directory (default ../export_model/models)
+
+SIGINT/SIGTERM stop accepting connections and let in-flight requests finish.
 """
 
-import json
+import signal
 import sys
 import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 
 # Add parent directory to path so we can import from export_model
 sys.path.insert(0, str(Path(__file__).parent.parent / "export_model"))
 
+import json_codec
 from predictor import NexYpherPredictor
 
 # Load models once at startup
 print("Loading XGBoost models...")
 predictor = NexYpherPredictor(
-    models_dir=str(Path(__file__).parent.parent / "export_model" / "models")
+    models_dir=os.environ.get(
+        "MODELS_DIR", str(Path(__file__).parent.parent / "export_model" / "models")
+    )
 )
+if os.environ.get("ML_NTHREAD"):
+    predictor.set_nthread(int(os.environ["ML_NTHREAD"]))
 print(f"Models loaded: {predictor.info()}")
 
 
+class ConcurrentHTTPServer(ThreadingHTTPServer):
+    # Non-daemon handler threads: server_close() waits for in-flight requests
+    daemon_threads = False
+    block_on_close = True
+
+
 class PredictHandler(BaseHTTPRequestHandler):
     def do_POST(self):
         if self.path != "/api/predict":
@@ -37,7 +59,7 @@ class PredictHandler(BaseHTTPRequestHandler):
         try:
             content_length = int(self.headers.get("Content-Length", 0))
             raw = self.rfile.read(content_length)
-            body = json.loads(raw) if raw else {}
+            body = json_codec.loads(raw) if raw else {}
 
             result = predictor.predict(
                 closes=body.get("closes", []),
@@ -48,28 +70,26 @@ class PredictHandler(BaseHTTPRequestHandler):
                 volume_mcap_ratio=body.get("volume_mcap_ratio"),
                 ath_change_pct=body.get("ath_change_pct"),
                 fear_greed_value=body.get("fear_greed_value", 50.0),
+                features=False,  # too large for the frontend; left out of the result
             )
 
-            # Remove features dict (too large for frontend)
-            result.pop("features", None)
-
             self.send_response(200)
             self.send_header("Content-Type", "application/json")
             self.send_header("Access-Control-Allow-Origin", "*")
             self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self.wfile.write(result.to_json())
 
         except ValueError as e:
             self.send_response(400)
             self.send_header("Content-Type", "application/json")
             self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+            self.wfile.write(json_codec.dumps({"error": str(e)}))
 
         except Exception as e:
             self.send_response(500)
             self.send_header("Content-Type", "application/json")
             self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+            self.wfile.write(json_codec.dumps({"error": str(e)}))
 
     def do_OPTIONS(self):
         self.send_response(200)
@@ -82,12 +102,23 @@ class PredictHandler(BaseHTTPRequestHandler):
         print(f"[ML API] {args[0]}")
 
 
+def _install_shutdown_handlers(server):
+    """Stop serve_forever() on SIGINT/SIGTERM; it must be called off-thread."""
+    def handle(signum, frame):
+        print("\nShutting down, finishing in-flight requests...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, handle)
+    signal.signal(signal.SIGTERM, handle)
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("ML_PORT", 3001))
-    server = HTTPServer(("0.0.0.0", port), PredictHandler)
-    print(f"ML prediction server running at http://localhost:{port}/api/predict")
-    try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\nShutting down.")
-        server.server_close()
+    mode = os.environ.get("ML_SERVER_MODE", "threaded")
+    server_cls = HTTPServer if mode == "single" else ConcurrentHTTPServer
+    server = server_cls(("0.0.0.0", port), PredictHandler)
+    _install_shutdown_handlers(server)
+    print(f"ML prediction server ({mode}) running at http://localhost:{port}/api/predict")
+    server.serve_forever()
+    server.server_close()
+    print("Stopped.")